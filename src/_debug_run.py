@@ -103,10 +103,13 @@ def _after_all_started(logger: Logger) -> None:
 
 #####################################################################################################
 
-def _run_translation_server(port: int, logger: Logger | None = None) -> None:
+def _run_translation_server(port: int, logger: Logger | None = None, *, simulate_translation: bool = True, simulate_recognizer: bool = False) -> None:
     ctx: Final = _multiprocess_default_context.get_context('spawn')
 
-    environ['L7X_TRANSLATE_API_URL'] = f'http://0.0.0.0:{port}/'
+    if simulate_translation:
+        environ['L7X_TRANSLATE_API_URL'] = f'http://0.0.0.0:{port}/'
+    if simulate_recognizer:
+        environ['L7X_RECOGNIZER_API_URL'] = f'http://0.0.0.0:{port}/'
 
     process = ctx.Process(target=run_mock_translation_server, args=(port, logger))
     process.start()
@@ -122,8 +125,15 @@ def shutdown(*_args: Any) -> None:
 #####################################################################################################
 
 def _main(argv_list: Sequence[str]) -> None:
-    if convert_str_to_bool(getenv('L7X_RUN_TRANSLATION_SERVER', 'false')):
-        _run_translation_server(DEFAULT_TRANSLATION_SERVER_PORT, _LOGGER)
+    simulate_translation: Final = convert_str_to_bool(getenv('L7X_RUN_TRANSLATION_SERVER', 'false'))
+    simulate_recognizer: Final = convert_str_to_bool(getenv('L7X_RUN_RECOGNIZER_SIMULATOR', 'false'))
+    if simulate_translation or simulate_recognizer:
+        _run_translation_server(
+            DEFAULT_TRANSLATION_SERVER_PORT,
+            _LOGGER,
+            simulate_translation=simulate_translation,
+            simulate_recognizer=simulate_recognizer,
+        )
 
     if not is_all_containers_running():
         up_environment(_LOGGER, detached=True)
@@ -1,11 +1,17 @@
 #####################################################################################################
 
 import argparse
-from asyncio import run
+from asyncio import run, sleep
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, fields, replace
+from hashlib import sha256
 from logging import Logger
+from random import Random
 from typing import Final, cast
 
-from fastapi import FastAPI, HTTPException, status
+from environs import Env
+from fastapi import FastAPI, File, Form, HTTPException, UploadFile, status
 from fastapi.responses import JSONResponse
 from hypercorn.asyncio import serve
 from hypercorn.config import Config as _HypercornConfig
@@ -29,6 +35,127 @@
 
 _SUPPORTED_LANGS_CODES: Final = tuple(lang[_LANG_CODE] for lang in _SUPPORTED_LANGS)
 
+_UPLOAD_READ_CHUNK_SIZE_IN_BYTE: Final = 1024 * 1024
+_AUDIO_BYTES_PER_WORD: Final = 4096
+_MAX_RECOGNIZED_WORDS: Final = 2000
+_RECOGNIZED_WORDS: Final = (
+    'meeting', 'project', 'deadline', 'budget', 'customer', 'release', 'team', 'report',
+    'plan', 'question', 'decision', 'review', 'risk', 'task', 'next', 'week',
+)
+_INJECTED_ERROR_STATUSES: Final = (
+    status.HTTP_500_INTERNAL_SERVER_ERROR,
+    status.HTTP_502_BAD_GATEWAY,
+    status.HTTP_503_SERVICE_UNAVAILABLE,
+)
+
+#####################################################################################################
+
+@dataclass(frozen=True, kw_only=True)
+class UpstreamSimulatorConfig:
+    base_latency_sec: float = 0.0
+    latency_per_mib_sec: float = 0.0
+    latency_sigma: float = 0.0
+    error_rate: float = 0.0
+    timeout_rate: float = 0.0
+    # per segment of a bulk request, the request itself succeeds
+    item_error_rate: float = 0.0
+    timeout_sec: float = 300.0
+    max_concurrency: int = 0
+    seed: int | None = None
+
+    #####################################################################################################
+
+    @classmethod
+    def from_env(cls) -> 'UpstreamSimulatorConfig':
+        env: Final = Env()
+        seed: Final = env.str('L7X_SIMULATOR_SEED', '').strip()
+        return cls(
+            base_latency_sec=env.float('L7X_SIMULATOR_BASE_LATENCY_SEC', 0.0),
+            latency_per_mib_sec=env.float('L7X_SIMULATOR_LATENCY_PER_MIB_SEC', 0.0),
+            latency_sigma=env.float('L7X_SIMULATOR_LATENCY_SIGMA', 0.0),
+            error_rate=env.float('L7X_SIMULATOR_ERROR_RATE', 0.0),
+            timeout_rate=env.float('L7X_SIMULATOR_TIMEOUT_RATE', 0.0),
+            item_error_rate=env.float('L7X_SIMULATOR_ITEM_ERROR_RATE', 0.0),
+            timeout_sec=env.float('L7X_SIMULATOR_TIMEOUT_SEC', 300.0),  # noqa: WPS432
+            max_concurrency=env.int('L7X_SIMULATOR_MAX_CONCURRENCY', 0),
+            seed=int(seed) if seed else None,
+        )
+
+#####################################################################################################
+
+class _UpstreamSimulator:
+    #####################################################################################################
+
+    def __init__(self, config: UpstreamSimulatorConfig) -> None:
+        self._config: Final = config
+        self._random: Final = Random(config.seed)  # noqa: S311
+        self._in_flight_count = 0
+        self._stats: Final = {'requests': 0, 'rejected': 0, 'errors': 0, 'timeouts': 0, 'item_errors': 0, 'max_in_flight': 0}
+
+    #####################################################################################################
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {**self._stats, 'in_flight': self._in_flight_count}
+
+    #####################################################################################################
+
+    def get_latency_sec(self, payload_size_in_byte: int) -> float:
+        config: Final = self._config
+        latency_sec: Final = config.base_latency_sec + config.latency_per_mib_sec * payload_size_in_byte / (1024 * 1024)
+        if config.latency_sigma <= 0:
+            return latency_sec
+        # log-normal noise keeps the latency positive and gives the long tail real services have
+        return latency_sec * self._random.lognormvariate(0, config.latency_sigma)
+
+    #####################################################################################################
+
+    def is_item_failed(self) -> bool:
+        if self._random.random() >= self._config.item_error_rate:
+            return False
+        self._stats['item_errors'] += 1
+        return True
+
+    #####################################################################################################
+
+    @asynccontextmanager
+    async def handle(self, payload_size_in_byte: int) -> AsyncIterator[None]:
+        config: Final = self._config
+        stats: Final = self._stats
+        stats['requests'] += 1
+        if 0 < config.max_concurrency <= self._in_flight_count:
+            stats['rejected'] += 1
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail='Too many requests in flight')
+
+        self._in_flight_count += 1
+        stats['max_in_flight'] = max(stats['max_in_flight'], self._in_flight_count)
+        try:
+            failure_roll = self._random.random()
+            if failure_roll < config.timeout_rate:
+                stats['timeouts'] += 1
+                # hangs longer than any sane client timeout
+                await sleep(config.timeout_sec)
+                raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT)
+            if failure_roll < config.timeout_rate + config.error_rate:
+                stats['errors'] += 1
+                raise HTTPException(status_code=self._random.choice(_INJECTED_ERROR_STATUSES), detail='Injected error')
+
+            await sleep(self.get_latency_sec(payload_size_in_byte))
+            yield
+        finally:
+            self._in_flight_count -= 1
+
+#####################################################################################################
+
+def _create_recognized_text(content_hash: bytes, size_in_byte: int, lang: str | None) -> str:
+    # the same audio always gives the same text and different audio a different one, whatever the file names,
+    # so the cache keys in front of the recognizer can be checked
+    words_count: Final = min(max(size_in_byte // _AUDIO_BYTES_PER_WORD, 1), _MAX_RECOGNIZED_WORDS)
+    text_seed: Final = int.from_bytes(content_hash[:8], 'big')
+    text_random: Final = Random(text_seed)  # noqa: S311
+    words: Final = ' '.join(text_random.choice(_RECOGNIZED_WORDS) for _ in range(words_count))
+    return f'[{lang}] {words}' if lang else words
+
 #####################################################################################################
 
 class _TranslationRequest(BaseModel):
@@ -46,40 +173,96 @@ class _TranslationResponse(BaseModel):
 
 #####################################################################################################
 
+class _BulkTranslationRequest(BaseModel):
+    translateMode: str  # noqa: N815
+    q: list[str]  # noqa: VNE001, WPS111
+    source: str | None = None
+    target: str
+
+#####################################################################################################
+
 class _DetectLanguageRequest(BaseModel):
     q: str  # noqa: VNE001, WPS111
 
 #####################################################################################################
 
-class TranslationApp(FastAPI):
-    def __init__(self) -> None:
+class UpstreamSimulatorApp(FastAPI):
+    def __init__(self, config: UpstreamSimulatorConfig | None = None) -> None:
         super().__init__()
 
+        simulator: Final = _UpstreamSimulator(config or UpstreamSimulatorConfig())
+        self.simulator = simulator
+
         async def _get_languages() -> JSONResponse:
-            return JSONResponse(_SUPPORTED_LANGS)
+            async with simulator.handle(0):
+                return JSONResponse(_SUPPORTED_LANGS)
         self.get('/api/get-languages')(_get_languages)
 
         async def _translate(req: _TranslationRequest) -> _TranslationResponse:
-            if req.source is None:
-                req.source = 'en'
-
-            if not (req.source in _SUPPORTED_LANGS_CODES and req.target in _SUPPORTED_LANGS_CODES):
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST)
-
-            return _TranslationResponse(
-                translatedText=f'[{req.target}] {req.q}',
-                detectedSourceLanguage=req.source,
-                sourceText=req.q,
-            )
+            async with simulator.handle(len(req.q.encode('utf-8'))):
+                if req.source is None:
+                    req.source = 'en'
+
+                if not (req.source in _SUPPORTED_LANGS_CODES and req.target in _SUPPORTED_LANGS_CODES):
+                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST)
+
+                return _TranslationResponse(
+                    translatedText=f'[{req.target}] {req.q}',
+                    detectedSourceLanguage=req.source,
+                    sourceText=req.q,
+                )
         self.post('/api/translate')(_translate)
 
-        async def _detect_language(req: _DetectLanguageRequest) -> JSONResponse:  # pylint: disable=unused-argument
-            return JSONResponse({'result': [[{'language_code': 'en'}]]})
+        async def _translate_bulk(req: _BulkTranslationRequest) -> JSONResponse:
+            async with simulator.handle(sum(len(text.encode('utf-8')) for text in req.q)):
+                source: Final = req.source or 'en'
+                if not (source in _SUPPORTED_LANGS_CODES and req.target in _SUPPORTED_LANGS_CODES):
+                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST)
+
+                # the same order as in the request, a failed segment does not fail the others
+                return JSONResponse({'translations': [
+                    {'error': 'Injected segment error'}
+                    if simulator.is_item_failed()
+                    else {'translatedText': f'[{req.target}] {text}', 'detectedSourceLanguage': source, 'sourceText': text}
+                    for text in req.q
+                ]})
+        self.post('/api/translate-bulk')(_translate_bulk)
+
+        async def _detect_language(req: _DetectLanguageRequest) -> JSONResponse:
+            async with simulator.handle(len(req.q.encode('utf-8'))):
+                return JSONResponse({'result': [[{'language_code': 'en'}]]})
         self.post('/api/detect-language')(_detect_language)
 
+        async def _get_speech_to_text_languages() -> JSONResponse:
+            async with simulator.handle(0):
+                return JSONResponse(_SUPPORTED_LANGS)
+        self.get('/get-speech-to-text-languages')(_get_speech_to_text_languages)
+
+        async def _speech_to_text(
+            file: UploadFile = File(...),  # noqa: B008, WPS404
+            lang: str | None = Form(None),  # noqa: B008, WPS404
+            output_native: str = Form('false'),  # noqa: B008, WPS404 # pylint: disable=unused-argument
+            denoise: str = Form('false'),  # noqa: B008, WPS404 # pylint: disable=unused-argument
+        ) -> JSONResponse:
+            content_hash = sha256()
+            size_in_byte = 0
+            while chunk := await file.read(_UPLOAD_READ_CHUNK_SIZE_IN_BYTE):
+                content_hash.update(chunk)
+                size_in_byte += len(chunk)
+
+            async with simulator.handle(size_in_byte):
+                if lang is not None and lang not in _SUPPORTED_LANGS_CODES:
+                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST)
+                return JSONResponse({'result': _create_recognized_text(content_hash.digest(), size_in_byte, lang)})
+        self.post('/speech-to-text')(_speech_to_text)
+
+        async def _get_stats() -> JSONResponse:
+            return JSONResponse(simulator.stats)
+        self.get('/simulator/stats')(_get_stats)
+
 #####################################################################################################
 
-def run_mock_translation_server(port: int, logger: Logger | None = None) -> None:
+def run_mock_translation_server(port: int, logger: Logger | None = None, config: UpstreamSimulatorConfig | None = None) -> None:
     setproctitle('translation_server')
     setthreadtitle('translation_server')
 
@@ -89,7 +272,10 @@ def run_mock_translation_server(port: int, logger: Logger | None = None) -> None
     hypercorn_config: Final = _HypercornConfig()
     hypercorn_config.bind = [f'0.0.0.0:{port}']
 
-    translator: Final = TranslationApp()
+    simulator_config: Final = config or UpstreamSimulatorConfig.from_env()
+    if logger is not None:
+        logger.info(f'Upstream simulator config: {simulator_config}')
+    translator: Final = UpstreamSimulatorApp(simulator_config)
     translator_wrapper: Final = cast(ASGIFramework, translator)
 
     run(serve(translator_wrapper, hypercorn_config))
@@ -99,9 +285,17 @@ def run_mock_translation_server(port: int, logger: Logger | None = None) -> None
 def main() -> None:
     parser: Final = argparse.ArgumentParser()
     parser.add_argument('--port', type=int, default=DEFAULT_TRANSLATION_SERVER_PORT)
-    args: Final = parser.parse_args()
-
-    run_mock_translation_server(port=args.port)
+    env_config: Final = UpstreamSimulatorConfig.from_env()
+    for config_field in fields(UpstreamSimulatorConfig):
+        parser.add_argument(
+            f'--{config_field.name.replace("_", "-")}',
+            type=int if config_field.name in ('max_concurrency', 'seed') else float,
+            default=getattr(env_config, config_field.name),
+        )
+    args: Final = vars(parser.parse_args())
+    port: Final = args.pop('port')
+
+    run_mock_translation_server(port=port, config=replace(env_config, **args))
 
 #####################################################################################################
 
@@ -1,19 +1,26 @@
 #####################################################################################################
 
+from asyncio import CancelledError, Task, create_task, sleep
+from collections.abc import Mapping
+from contextlib import suppress
 from logging import Logger
 from multiprocessing.managers import SyncManager
 from typing import Final
 
 from nicegui.core import app as _nicegui_app
 
+from l7x.configs.constants import RECOGNIZER_LANGS_CATALOG
 from l7x.configs.settings import AppSettings
-from l7x.services.langs_service import PrivateLangsService
+from l7x.services.autodetect_lang_service import PrivateAutodetectLanguageService
+from l7x.services.langs_service import LangOptionsCatalog, PrivateLangsService, decode_lang_options
 from l7x.services.recognize_langs_service import PrivateRecognizerLangsService
 from l7x.services.recognize_service import PrivateRecognizeService
 from l7x.services.translation_service import PrivateTranslationService
-from l7x.utils.aiohttp_utils import create_aiohttp_client
+from l7x.utils.aiohttp_utils import ConnectionPoolSettings, create_aiohttp_client
 from l7x.utils.fastapi_utils import AppFastAPI
 from l7x.utils.loop_utils import AfterAllStartedFunc
+from l7x.utils.shared_catalog_utils import SharedCatalog, SharedCatalogRef
+from l7x.utils.upload_utils import ResumableUploadStore
 
 #####################################################################################################
 
@@ -26,22 +33,100 @@ def __init__(
         app_settings: AppSettings,
         func_after_all_started: AfterAllStartedFunc | None = None,
         cmd_manager: SyncManager | None = None,
+        lang_catalog_refs: Mapping[str, SharedCatalogRef] | None = None,
+        is_lang_catalog_publisher: bool = False,
     ) -> None:
         def on_startup() -> None:
             if func_after_all_started is not None:
                 func_after_all_started(logger)
+            if is_lang_catalog_publisher:
+                self._lang_catalog_publish_task = create_task(self._publish_lang_catalogs())
 
-        super().__init__(logger, app_settings, on_startup=[on_startup])
+        async def on_shutdown() -> None:
+            publish_task: Final = self._lang_catalog_publish_task
+            if publish_task is not None:
+                publish_task.cancel()
+                with suppress(CancelledError):
+                    await publish_task
+            for lang_catalog in self._lang_catalogs:
+                lang_catalog.close()
 
-        self._aiohttp_client: Final = create_aiohttp_client()
+        super().__init__(logger, app_settings, on_startup=[on_startup], on_shutdown=[on_shutdown])
+
+        self._aiohttp_client: Final = create_aiohttp_client(ConnectionPoolSettings.from_settings(app_settings))
+        self._cmd_manager: Final = cmd_manager
+        self._lang_catalog_refs: Final = lang_catalog_refs or {}
+        self._is_lang_catalog_publisher: Final = is_lang_catalog_publisher
+        self._lang_catalogs: Final[list[LangOptionsCatalog]] = []
+        self._lang_catalog_publish_task: Task[None] | None = None
+        self._upload_store: Final = ResumableUploadStore(
+            upload_dir=app_settings.resumable_upload_dir,
+            max_size_in_byte=app_settings.resumable_upload_max_size_in_byte,
+            expire_sec=app_settings.resumable_upload_expire_sec,
+            max_pending_count=app_settings.resumable_upload_max_pending_count,
+            max_pending_size_in_byte=app_settings.resumable_upload_max_pending_size_in_byte,
+            spool_dir=app_settings.upload_spool_dir,
+        )
 
         _nicegui_app.logger = self.logger
         # _nicegui_app.languages_service = PrivateLangsService(app_settings, self._aiohttp_client, logger)
         # _nicegui_app.translation_service = PrivateTranslationService(app_settings, self._aiohttp_client, logger)
-        _nicegui_app.recognize_service = PrivateRecognizeService(app_settings, self._aiohttp_client, logger)
-        _nicegui_app.rec_languages_service = PrivateRecognizerLangsService(app_settings, self._aiohttp_client, logger)
+        self._recognize_service: Final = PrivateRecognizeService(app_settings, self._aiohttp_client, logger)
+        _nicegui_app.recognize_service = self._recognize_service
+        self._rec_languages_service: Final = PrivateRecognizerLangsService(
+            app_settings,
+            self._aiohttp_client,
+            logger,
+            self._attach_lang_catalog(RECOGNIZER_LANGS_CATALOG),
+        )
+        _nicegui_app.rec_languages_service = self._rec_languages_service
+        _nicegui_app.autodetect_language_service = PrivateAutodetectLanguageService(app_settings, self._aiohttp_client, logger)
         _nicegui_app.add_static_files(url_path='/static', local_directory='./static')
         _nicegui_app.settings = app_settings
         _nicegui_app.cmd_manager = cmd_manager
+        _nicegui_app.upload_store = self._upload_store
+
+    #####################################################################################################
+
+    @property
+    def cmd_manager(self, /) -> SyncManager | None:
+        return self._cmd_manager
+
+    #####################################################################################################
+
+    @property
+    def upload_store(self, /) -> ResumableUploadStore:
+        return self._upload_store
+
+    #####################################################################################################
+
+    @property
+    def recognize_service(self, /) -> PrivateRecognizeService:
+        return self._recognize_service
+
+    #####################################################################################################
+
+    def _attach_lang_catalog(self, catalog_name: str, /) -> LangOptionsCatalog | None:
+        catalog_ref: Final = self._lang_catalog_refs.get(catalog_name)
+        if catalog_ref is None:
+            return None
+        lang_catalog: Final = SharedCatalog.attach(
+            catalog_ref,
+            decode=decode_lang_options,
+            is_publisher=self._is_lang_catalog_publisher,
+        )
+        self._lang_catalogs.append(lang_catalog)
+        return lang_catalog
+
+    #####################################################################################################
+
+    async def _publish_lang_catalogs(self, /) -> None:
+        # the cache ttl decides when the upstream is really asked, the loop only gives it the chance
+        while True:
+            try:
+                await self._rec_languages_service.refresh_lang_options()
+            except Exception as err:  # pylint: disable=broad-except
+                self.logger.warning(f'Language catalogs publishing failed: {err!r}')
+            await sleep(self.app_settings.lang_catalog_publish_interval_sec)
 
 #####################################################################################################
@@ -1,28 +1,37 @@
+from contextlib import AbstractContextManager
 from logging import Logger
-from typing import Final
+from types import TracebackType
+from typing import Any, Final
 
-from tokenizers import Tokenizer
-from torch import float16 as _torch_float16
-from transformers import LlamaForCausalLM, AutoModelForCausalLM, AutoTokenizer
+from transformers import PreTrainedModel, PreTrainedTokenizer
 
+from l7x.commands.llm_memory_budget import LlmMemoryBudget
+from l7x.commands.llm_model_registry import LlmModelRegistry
 from l7x.configs.settings import AppSettings
-from l7x.utils.cmd_manager_utils import CmdGlobalContextCreatorReturn, CmdMiddlewareResults
+from l7x.utils.cmd_manager_utils import (
+    BaseCommand,
+    CmdCallState,
+    CmdGlobalContextCreatorReturn,
+    CmdMiddlewareResults,
+    CmdMiddlewares,
+)
 
+#####################################################################################################
 
-class BaseCmdGlobalContext:
+class BaseCmdGlobalContext(AbstractContextManager['BaseCmdGlobalContext']):
     #####################################################################################################
 
     def __init__(
         self,
         logger: Logger,
         app_settings: AppSettings,
-        llm_model: LlamaForCausalLM,
-        llm_tokenizer: Tokenizer,
+        llm_model_registry: LlmModelRegistry,
+        llm_memory_budget: LlmMemoryBudget,
     ) -> None:
         self._logger = logger
         self._app_settings = app_settings
-        self._llm_model = llm_model
-        self._llm_tokenizer = llm_tokenizer
+        self._llm_model_registry = llm_model_registry
+        self._llm_memory_budget = llm_memory_budget
 
     #####################################################################################################
 
@@ -39,22 +48,66 @@ def app_settings(self) -> AppSettings:
     #####################################################################################################
 
     @property
-    def model(self) -> LlamaForCausalLM:
-        return self._llm_model
+    def model_registry(self) -> LlmModelRegistry:
+        return self._llm_model_registry
+
+    #####################################################################################################
+
+    @property
+    def memory_budget(self) -> LlmMemoryBudget:
+        return self._llm_memory_budget
+
+    #####################################################################################################
+
+    @property
+    def model(self) -> PreTrainedModel:
+        registry: Final = self._llm_model_registry
+        return registry.get(registry.default_model_id).model
 
     #####################################################################################################
 
     @property
-    def tokenizer(self) -> Tokenizer:
-        return self._llm_tokenizer
+    def tokenizer(self) -> PreTrainedTokenizer:
+        registry: Final = self._llm_model_registry
+        return registry.get(registry.default_model_id).tokenizer
+
+    #####################################################################################################
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self._llm_model_registry.close()
 
 #####################################################################################################
 
 class BaseCmdLocalContext:
     #####################################################################################################
 
-    def __init__(self, global_context: BaseCmdGlobalContext) -> None:
+    def __init__(self, global_context: BaseCmdGlobalContext, call_state: CmdCallState) -> None:
         self._global_context: Final = global_context
+        self._call_state: Final = call_state
+
+    #####################################################################################################
+
+    def is_cancelled(self) -> bool:
+        return self._call_state.is_cancelled()
+
+#####################################################################################################
+
+async def _apply_pending_model_swap(
+    global_context: BaseCmdGlobalContext,
+    _cmd: BaseCommand[BaseCmdGlobalContext, Any, Any],
+    _middleware_results: CmdMiddlewareResults,
+) -> None:
+    global_context.model_registry.apply_pending_swap()
+
+#####################################################################################################
+
+def _select_middlewares(_cmd_type: type[BaseCommand[BaseCmdGlobalContext, Any, Any]]) -> CmdMiddlewares[BaseCmdGlobalContext]:
+    return (_apply_pending_model_swap,)
 
 #####################################################################################################
 
@@ -63,28 +116,23 @@ async def creator_base_global_cmd_context(
     app_settings: AppSettings,
     _additional_params: None,
 ) -> CmdGlobalContextCreatorReturn:
-    model_id: Final = app_settings.llm_model_id
-    cache_dir: Final = app_settings.models_cache_dir
+    llm_model_registry: Final = LlmModelRegistry(logger, app_settings)
+    # the default model serves every task without a dedicated route, so load it before accepting commands
+    llm_model_registry.get(llm_model_registry.default_model_id)
 
-    model = AutoModelForCausalLM.from_pretrained(
-        model_id,
-        device_map='auto',
-        cache_dir=cache_dir,
-        torch_dtype=_torch_float16,
-    )
-
-    tokenizer = AutoTokenizer.from_pretrained(model_id, cache_dir=cache_dir)
-    tokenizer.pad_token = tokenizer.eos_token
-    tokenizer.padding_side = "right"
-
-    return BaseCmdGlobalContext(logger, app_settings, llm_model=model, llm_tokenizer=tokenizer), None
+    return BaseCmdGlobalContext(
+        logger,
+        app_settings,
+        llm_model_registry=llm_model_registry,
+        llm_memory_budget=LlmMemoryBudget(app_settings),
+    ), _select_middlewares
 
 #####################################################################################################
 
 async def creator_local_tokens_cmd_context(
     global_context: BaseCmdGlobalContext,
-    _middleware_results: CmdMiddlewareResults,
+    middleware_results: CmdMiddlewareResults,
 ) -> BaseCmdLocalContext:
-    return BaseCmdLocalContext(global_context)
+    return BaseCmdLocalContext(global_context, middleware_results.get(CmdCallState))
 
 #####################################################################################################
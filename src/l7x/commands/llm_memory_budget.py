@@ -0,0 +1,79 @@
+#####################################################################################################
+
+from collections.abc import Mapping, Sequence
+from typing import Final
+
+from starlette import status
+
+from l7x.commands.llm_model_registry import LoadedLlmModel
+from l7x.configs.settings import AppSettings
+from l7x.types.errors import AppException
+
+#####################################################################################################
+
+MIN_NEW_TOKENS: Final = 64
+
+#####################################################################################################
+
+class LlmRequestRefusedException(AppException):
+    #####################################################################################################
+
+    def __init__(self, detail: str) -> None:
+        super().__init__(detail=detail, err_code='LLM_REQUEST_REFUSED', status_code=status.HTTP_507_INSUFFICIENT_STORAGE)
+
+#####################################################################################################
+
+def estimate_kv_cache_bytes_per_token(loaded_model: LoadedLlmModel) -> int:
+    config: Final = loaded_model.model.config
+    attention_heads_count: Final = int(config.num_attention_heads)
+    kv_heads_count: Final = int(getattr(config, 'num_key_value_heads', None) or attention_heads_count)
+    head_dim: Final = int(getattr(config, 'head_dim', None) or (config.hidden_size // attention_heads_count))
+    dtype_size: Final = loaded_model.model.dtype.itemsize
+    # key and value tensors for every layer
+    return 2 * int(config.num_hidden_layers) * kv_heads_count * head_dim * dtype_size
+
+#####################################################################################################
+
+def count_prompt_tokens(loaded_model: LoadedLlmModel, messages: Sequence[Mapping[str, str]]) -> int:
+    prompt_token_ids: Final = loaded_model.tokenizer.apply_chat_template(messages, tokenize=True, add_generation_prompt=True)
+    return len(prompt_token_ids)
+
+#####################################################################################################
+
+class LlmMemoryBudget:
+    #####################################################################################################
+
+    def __init__(self, app_settings: AppSettings) -> None:
+        self._is_enabled: Final = app_settings.llm_low_memory_mode
+        self._max_kv_cache_tokens: Final = app_settings.llm_max_kv_cache_tokens
+        self._kv_cache_memory_budget_in_byte: Final = app_settings.llm_kv_cache_memory_budget_in_byte
+
+    #####################################################################################################
+
+    def get_tokens_limit(self, loaded_model: LoadedLlmModel) -> int | None:
+        if not self._is_enabled:
+            return None
+
+        tokens_limits: Final[list[int]] = []
+        if self._max_kv_cache_tokens > 0:
+            tokens_limits.append(self._max_kv_cache_tokens)
+        if self._kv_cache_memory_budget_in_byte > 0:
+            tokens_limits.append(self._kv_cache_memory_budget_in_byte // estimate_kv_cache_bytes_per_token(loaded_model))
+        return min(tokens_limits) if tokens_limits else None
+
+    #####################################################################################################
+
+    def fit_max_new_tokens(self, loaded_model: LoadedLlmModel, prompt_tokens_count: int, max_new_tokens: int) -> int:
+        tokens_limit: Final = self.get_tokens_limit(loaded_model)
+        if tokens_limit is None:
+            return max_new_tokens
+
+        available_tokens: Final = tokens_limit - prompt_tokens_count
+        if available_tokens < MIN_NEW_TOKENS:
+            estimated_bytes: Final = (prompt_tokens_count + MIN_NEW_TOKENS) * estimate_kv_cache_bytes_per_token(loaded_model)
+            raise LlmRequestRefusedException(
+                f'Prompt with {prompt_tokens_count} tokens needs ~{estimated_bytes} bytes of KV cache, limit is {tokens_limit} tokens',
+            )
+        return min(max_new_tokens, available_tokens)
+
+#####################################################################################################
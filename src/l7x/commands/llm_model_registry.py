@@ -0,0 +1,231 @@
+#####################################################################################################
+
+from collections import OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import StrEnum
+from gc import collect as _gc_collect
+from logging import Logger
+from threading import RLock
+from typing import Any, Final
+
+from torch import cuda as _torch_cuda, float16 as _torch_float16
+from transformers import AutoModelForCausalLM, AutoTokenizer, PreTrainedModel, PreTrainedTokenizer
+
+from l7x.configs.settings import AppSettings
+
+#####################################################################################################
+
+class LlmTask(StrEnum):
+    SUMMARY = 'summary'
+    STYLE = 'style'
+    DRAFT = 'draft'
+
+#####################################################################################################
+
+_BASE_ROUTING_KEY: Final = 'base'
+
+#####################################################################################################
+
+@dataclass(frozen=True, kw_only=True)
+class LoadedLlmModel:
+    model_id: str
+    model: PreTrainedModel
+    tokenizer: PreTrainedTokenizer
+    memory_footprint_in_byte: int
+
+#####################################################################################################
+
+def _get_low_memory_model_kwargs(app_settings: AppSettings) -> dict[str, Any]:
+    model_kwargs: Final[dict[str, Any]] = {
+        'low_cpu_mem_usage': True,
+        'offload_state_dict': True,
+    }
+
+    offload_dir: Final = app_settings.llm_offload_dir
+    if offload_dir is not None:
+        offload_dir.mkdir(parents=True, exist_ok=True)
+        model_kwargs['offload_folder'] = str(offload_dir)
+
+    max_memory_in_byte: Final = app_settings.llm_max_memory_in_byte
+    if max_memory_in_byte > 0:
+        # accelerate places the layers that do not fit into the limits to the offload folder
+        max_memory: Final[dict[int | str, int]] = {'cpu': max_memory_in_byte}
+        if _torch_cuda.is_available():
+            for device_index in range(_torch_cuda.device_count()):
+                max_memory[device_index] = _torch_cuda.mem_get_info(device_index)[0]
+        model_kwargs['max_memory'] = max_memory
+
+    return model_kwargs
+
+#####################################################################################################
+
+def load_llm_model(model_id: str, app_settings: AppSettings) -> LoadedLlmModel:
+    cache_dir: Final = app_settings.models_cache_dir
+    model_kwargs: Final = _get_low_memory_model_kwargs(app_settings) if app_settings.llm_low_memory_mode else {}
+
+    model = AutoModelForCausalLM.from_pretrained(
+        model_id,
+        device_map='auto',
+        cache_dir=cache_dir,
+        torch_dtype=_torch_float16,
+        **model_kwargs,
+    )
+
+    tokenizer = AutoTokenizer.from_pretrained(model_id, cache_dir=cache_dir)
+    tokenizer.pad_token = tokenizer.eos_token
+    tokenizer.padding_side = 'right'
+
+    return LoadedLlmModel(
+        model_id=model_id,
+        model=model,
+        tokenizer=tokenizer,
+        memory_footprint_in_byte=int(model.get_memory_footprint()),
+    )
+
+#####################################################################################################
+
+def free_llm_memory() -> None:
+    _gc_collect()
+    if _torch_cuda.is_available():
+        _torch_cuda.empty_cache()
+
+#####################################################################################################
+
+class LlmModelRegistry:
+    #####################################################################################################
+
+    def __init__(self, logger: Logger, app_settings: AppSettings) -> None:
+        self._logger: Final = logger
+        self._default_model_id = app_settings.llm_model_id
+        self._routing: Final[Mapping[str, Any]] = app_settings.llm_models_routing
+        self._memory_budget_in_byte: Final = app_settings.llm_models_memory_budget_in_byte
+        self._app_settings: Final = app_settings
+        self._loaded_models: Final[OrderedDict[str, LoadedLlmModel]] = OrderedDict()
+        self._lock: Final = RLock()
+        self._swap_executor: Final = ThreadPoolExecutor(max_workers=1, thread_name_prefix='llm_model_swap')
+        self._pending_swap: Future[LoadedLlmModel] | None = None
+
+    #####################################################################################################
+
+    @property
+    def default_model_id(self) -> str:
+        return self._default_model_id
+
+    #####################################################################################################
+
+    def resolve_model_id(self, language: str | None, task: LlmTask) -> str:
+        routing: Final = self._routing
+        for routing_key in (language, _BASE_ROUTING_KEY):
+            if routing_key is None:
+                continue
+            task_models = routing.get(routing_key)
+            if not isinstance(task_models, Mapping):
+                continue
+            model_id = task_models.get(task.value)
+            if isinstance(model_id, str) and model_id:
+                return model_id
+        return self._default_model_id
+
+    #####################################################################################################
+
+    def get_for(self, language: str | None, task: LlmTask) -> LoadedLlmModel:
+        return self.get(self.resolve_model_id(language, task))
+
+    #####################################################################################################
+
+    def get(self, model_id: str) -> LoadedLlmModel:
+        with self._lock:
+            loaded_models: Final = self._loaded_models
+            loaded_model = loaded_models.get(model_id)
+            if loaded_model is not None:
+                loaded_models.move_to_end(model_id)
+                return loaded_model
+
+            self._logger.info(f'Loading LLM model "{model_id}"...')
+            loaded_model = load_llm_model(model_id, self._app_settings)
+            loaded_models[model_id] = loaded_model
+            self._logger.info(f'LLM model "{model_id}" loaded ({loaded_model.memory_footprint_in_byte} bytes)')
+
+            self._evict_over_budget(keep_model_id=model_id)
+            return loaded_model
+
+    #####################################################################################################
+
+    def start_default_model_swap(self, model_id: str) -> bool:
+        with self._lock:
+            if self._pending_swap is not None:
+                return False
+            self._logger.info(f'Loading LLM model "{model_id}" in background for swap...')
+            self._pending_swap = self._swap_executor.submit(load_llm_model, model_id, self._app_settings)
+            return True
+
+    #####################################################################################################
+
+    def apply_pending_swap(self) -> None:
+        pending_swap: Final = self._pending_swap
+        if pending_swap is None or not pending_swap.done():
+            return
+
+        with self._lock:
+            self._pending_swap = None
+            try:
+                new_model = pending_swap.result()
+            except Exception as err:  # noqa: PIE786 # pylint: disable=broad-except
+                self._logger.error(f'LLM model swap failed: {err}', exc_info=err)
+                return
+
+            loaded_models: Final = self._loaded_models
+            old_model_id: Final = self._default_model_id
+            # a task route may still point at the old default: it stays loaded, the memory budget evicts it when unused
+            if not self._is_routed(old_model_id):
+                loaded_models.pop(old_model_id, None)
+            # the same id is swapped when the weights were updated, so the old instance is replaced in place
+            loaded_models.pop(new_model.model_id, None)
+            loaded_models[new_model.model_id] = new_model
+            self._default_model_id = new_model.model_id
+            free_llm_memory()
+            self._logger.info(f'Default LLM model swapped from "{old_model_id}" to "{self._default_model_id}"')
+
+            self._evict_over_budget(keep_model_id=self._default_model_id)
+
+    #####################################################################################################
+
+    def close(self) -> None:
+        self._swap_executor.shutdown(wait=False, cancel_futures=True)
+
+    #####################################################################################################
+
+    def _is_routed(self, model_id: str) -> bool:
+        return any(
+            isinstance(task_models, Mapping) and model_id in task_models.values()
+            for task_models in self._routing.values()
+        )
+
+    #####################################################################################################
+
+    def _evict_over_budget(self, *, keep_model_id: str) -> None:
+        memory_budget_in_byte: Final = self._memory_budget_in_byte
+        if memory_budget_in_byte <= 0:
+            return
+
+        loaded_models: Final = self._loaded_models
+        used_memory_in_byte = sum(loaded_model.memory_footprint_in_byte for loaded_model in loaded_models.values())
+        evicted_model_ids: list[str] = []
+        for model_id in tuple(loaded_models):
+            if used_memory_in_byte <= memory_budget_in_byte:
+                break
+            if model_id == keep_model_id:
+                continue
+            used_memory_in_byte -= loaded_models.pop(model_id).memory_footprint_in_byte
+            evicted_model_ids.append(model_id)
+
+        if evicted_model_ids:
+            free_llm_memory()
+            self._logger.info(f'LLM models evicted: {evicted_model_ids}')
+
+        if used_memory_in_byte > memory_budget_in_byte:
+            self._logger.warning(f'LLM models use {used_memory_in_byte} bytes, memory budget is {memory_budget_in_byte} bytes')
+
+#####################################################################################################
@@ -0,0 +1,30 @@
+#####################################################################################################
+
+from typing import Final
+
+from pydantic.dataclasses import dataclass
+
+from l7x.commands.base_context_creator import BaseCmdGlobalContext, BaseCmdLocalContext
+from l7x.utils.cmd_manager_utils import BaseCommand
+
+#####################################################################################################
+
+@dataclass(kw_only=True, frozen=True)
+class LlmModelSwapCommand(BaseCommand[BaseCmdGlobalContext, BaseCmdLocalContext, bool]):
+    model_id: str
+
+    #####################################################################################################
+
+    async def execute(
+        self,
+        *,
+        global_context: BaseCmdGlobalContext,
+        local_context: BaseCmdLocalContext,
+    ) -> bool:
+        # loading runs in background, the worker switches to the new model between the next commands
+        is_started: Final = global_context.model_registry.start_default_model_swap(self.model_id)
+        if not is_started:
+            global_context.logger.warning(f'LLM model swap to "{self.model_id}" rejected, other swap in progress')
+        return is_started
+
+#####################################################################################################
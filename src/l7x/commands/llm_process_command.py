@@ -0,0 +1,178 @@
+#####################################################################################################
+
+from collections.abc import Callable
+from typing import Any, Final
+
+from pydantic.dataclasses import dataclass
+from torch import BoolTensor, LongTensor, bool as _torch_bool, float16 as _torch_float16, full as _torch_full
+from transformers import StoppingCriteria, StoppingCriteriaList, pipeline
+
+from l7x.commands.base_context_creator import BaseCmdGlobalContext, BaseCmdLocalContext
+from l7x.commands.llm_memory_budget import MIN_NEW_TOKENS, LlmMemoryBudget, count_prompt_tokens
+from l7x.commands.llm_model_registry import LlmTask, LoadedLlmModel
+from l7x.utils.cmd_manager_utils import BaseCommand, CmdCancelledException
+
+#####################################################################################################
+
+_MAX_NEW_TOKENS: Final = 10000
+_CANCEL_CHECK_EVERY_TOKENS: Final = 16
+_MAX_CHUNKED_SUMMARY_DEPTH: Final = 3
+
+#####################################################################################################
+
+class _CancelStoppingCriteria(StoppingCriteria):
+    #####################################################################################################
+
+    def __init__(self, is_cancelled: Callable[[], bool]) -> None:
+        self._is_cancelled: Final = is_cancelled
+        self._calls_count = 0
+        self.cancelled = False
+
+    #####################################################################################################
+
+    def __call__(self, input_ids: LongTensor, scores: Any, **kwargs: Any) -> BoolTensor:
+        self._calls_count += 1
+        if self._calls_count % _CANCEL_CHECK_EVERY_TOKENS == 0 and self._is_cancelled():
+            self.cancelled = True
+        return _torch_full((input_ids.shape[0],), self.cancelled, dtype=_torch_bool, device=input_ids.device)
+
+#####################################################################################################
+
+def _create_messages(system_prompt: str, text: str) -> list[dict[str, str]]:
+    return [
+        {'role': 'system', 'content': system_prompt},
+        {'role': 'user', 'content': text},
+    ]
+
+#####################################################################################################
+
+def _generate(
+    loaded_model: LoadedLlmModel,
+    system_prompt: str,
+    text: str,
+    local_context: BaseCmdLocalContext,
+    memory_budget: LlmMemoryBudget,
+    max_new_tokens: int = _MAX_NEW_TOKENS,
+) -> str:
+    if local_context.is_cancelled():
+        raise CmdCancelledException('Cmd cancelled')
+
+    messages: Final = _create_messages(system_prompt, text)
+    if memory_budget.get_tokens_limit(loaded_model) is not None:
+        max_new_tokens = memory_budget.fit_max_new_tokens(loaded_model, count_prompt_tokens(loaded_model, messages), max_new_tokens)
+
+    llm_pipeline = pipeline(
+        'text-generation',
+        model=loaded_model.model,
+        tokenizer=loaded_model.tokenizer,
+        model_kwargs={'torch_dtype': _torch_float16},
+        device_map='auto',
+    )
+
+    cancel_criteria: Final = _CancelStoppingCriteria(local_context.is_cancelled)
+    outputs = llm_pipeline(
+        messages,
+        max_new_tokens=max_new_tokens,
+        do_sample=False,
+        temperature=0,
+        pad_token_id=loaded_model.tokenizer.eos_token_id,
+        stopping_criteria=StoppingCriteriaList([cancel_criteria]),
+    )
+    if cancel_criteria.cancelled:
+        raise CmdCancelledException('Cmd cancelled')
+    return outputs[0]['generated_text'][-1]['content'].strip()
+
+#####################################################################################################
+
+def _split_text_by_tokens(loaded_model: LoadedLlmModel, text: str, chunk_tokens_count: int) -> list[str]:
+    tokenizer: Final = loaded_model.tokenizer
+    token_ids: Final = tokenizer.encode(text, add_special_tokens=False)
+    return [
+        tokenizer.decode(token_ids[chunk_start:chunk_start + chunk_tokens_count], skip_special_tokens=True)
+        for chunk_start in range(0, len(token_ids), chunk_tokens_count)
+    ]
+
+#####################################################################################################
+
+def _summarize_within_budget(
+    loaded_model: LoadedLlmModel,
+    system_prompt: str,
+    text: str,
+    local_context: BaseCmdLocalContext,
+    memory_budget: LlmMemoryBudget,
+    depth: int = 0,
+) -> str:
+    tokens_limit: Final = memory_budget.get_tokens_limit(loaded_model)
+    if tokens_limit is None or depth >= _MAX_CHUNKED_SUMMARY_DEPTH:
+        return _generate(loaded_model, system_prompt, text, local_context, memory_budget)
+
+    prompt_tokens_count: Final = count_prompt_tokens(loaded_model, _create_messages(system_prompt, text))
+    if prompt_tokens_count + MIN_NEW_TOKENS <= tokens_limit:
+        return _generate(loaded_model, system_prompt, text, local_context, memory_budget)
+
+    # the text does not fit into the KV cache limit: summarize it chunk by chunk, then summarize the joined parts
+    overhead_tokens_count: Final = count_prompt_tokens(loaded_model, _create_messages(system_prompt, ''))
+    chunk_tokens_count: Final = max((tokens_limit - overhead_tokens_count) // 2, MIN_NEW_TOKENS)
+    partial_summaries: Final = [
+        _generate(loaded_model, system_prompt, text_chunk, local_context, memory_budget)
+        for text_chunk in _split_text_by_tokens(loaded_model, text, chunk_tokens_count)
+    ]
+    return _summarize_within_budget(loaded_model, system_prompt, '\n\n'.join(partial_summaries), local_context, memory_budget, depth + 1)
+
+#####################################################################################################
+
+@dataclass(kw_only=True, frozen=True)
+class LlmProcessCommand(BaseCommand[BaseCmdGlobalContext, BaseCmdLocalContext, str]):
+    text: str
+    language: str | None
+    convert_to: str | None
+    with_summary: bool = True
+    draft: bool = False
+    previous_summary: str | None = None
+
+    #####################################################################################################
+
+    async def execute(
+        self,
+        *,
+        global_context: BaseCmdGlobalContext,
+        local_context: BaseCmdLocalContext,
+    ) -> str:
+        prompts_per_language: Final = global_context.app_settings.prompts_per_language
+        prompts: Final = prompts_per_language.get(self.language, prompts_per_language['base'])
+        if prompts is None:
+            global_context.logger.warning('Prompts not found')
+            return ''
+
+        model_registry: Final = global_context.model_registry
+        memory_budget: Final = global_context.memory_budget
+        text = self.text.strip()
+        if self.previous_summary:
+            # rolling summary: the new text is folded into the previous summary instead of the whole transcript
+            text = f'{self.previous_summary.strip()}\n\n{text}'
+
+        if self.draft:
+            # preview only: one pass of the first summary prompt on the fast model with a short output
+            draft_prompts: Final = prompts.get('summary', [])
+            if not draft_prompts:
+                return text
+            draft_model: Final = model_registry.get_for(self.language, LlmTask.DRAFT)
+            max_new_tokens: Final = global_context.app_settings.llm_draft_max_new_tokens
+            return _generate(draft_model, draft_prompts[0], text, local_context, memory_budget, max_new_tokens)
+
+        if self.with_summary:
+            summary_model: Final = model_registry.get_for(self.language, LlmTask.SUMMARY)
+            for sum_prompt in prompts.get('summary', []):
+                text = _summarize_within_budget(summary_model, sum_prompt, text, local_context, memory_budget)
+
+        if self.convert_to is not None:
+            style_prompt: Final = prompts.get(self.convert_to)
+            if not style_prompt:
+                global_context.logger.warning(f'Prompt for "{self.convert_to}" not found')
+                return text
+            style_model: Final = model_registry.get_for(self.language, LlmTask.STYLE)
+            text = _generate(style_model, style_prompt, text, local_context, memory_budget)
+
+        return text
+
+#####################################################################################################
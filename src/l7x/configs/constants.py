@@ -6,6 +6,11 @@
 
 DEFAULT_TRANSLATION_SERVER_PORT: Final = 8081
 TRANSLATE_API_LANGS_CACHE_EXPIRE_WHEN_LIST_EMPTY_SEC: Final[float] = 5.0
+LANGS_CACHE_RETRY_ON_ERROR_SEC: Final[float] = 10.0
+LANGS_CACHE_EXPIRE_JITTER_RATIO: Final[float] = 0.1
+# a worker waits this long for the publisher before it asks the upstream itself
+LANG_CATALOG_PUBLISH_GRACE_SEC: Final[float] = 30.0
+RECOGNIZER_LANGS_CATALOG: Final = 'recognizer_langs'
 RECONGIZER_MIME_TYPES = frozenset([
     'audio/wav',
     'audio/x-ms-wma',
@@ -19,5 +24,15 @@
     'video/quicktime',
     'video/x-matroska'
 ])
+# containers worth to re-encode locally: video and uncompressed or bulky audio
+MEDIA_PREPROCESS_MIME_TYPES = frozenset([
+    'audio/wav',
+    'audio/x-ms-wma',
+    'video/x-flv',
+    'video/x-msvideo',
+    'video/mp4',
+    'video/quicktime',
+    'video/x-matroska',
+])
 
 #####################################################################################################
@@ -5,6 +5,7 @@
 from os import getenv
 from pathlib import Path
 from sys import flags
+from tempfile import gettempdir
 from typing import Any, Final, Protocol, TypeVar
 from urllib.parse import urlparse
 
@@ -67,14 +68,80 @@ class AppSettings:  # pylint: disable=too-many-instance-attributes
 
     translate_api_url: str
     translate_api_langs_cache_expire_sec: int
+    translate_api_read_timeout_sec: float
+    translate_api_batch_max_size_in_byte: int
+    translate_api_batch_max_segments: int
+    translate_api_batch_parallelism: int
+    translation_memory_enabled: bool
+    translation_memory_max_entries: int
+    translation_memory_store_path: Path | None
+    translation_memory_store_max_entries: int
+    lang_id_min_confidence: float
+    lang_id_profiles_path: Path | None
+
+    lang_catalog_shared: bool
+    lang_catalog_dir: Path | None
+    lang_catalog_capacity_in_byte: int
+    lang_catalog_publish_interval_sec: float
 
     recognizer_api_url: str
     recognizer_api_langs_cache_expire_sec: int
+    recognizer_api_read_timeout_sec: float
+    recognizer_api_hedge_enabled: bool
+    recognizer_segmentation_enabled: bool
+    recognizer_segment_min_sec: float
+    recognizer_segment_max_sec: float
+    recognizer_segment_timeout_sec: float
+    recognizer_parallelism: int
+    recognizer_live_segment_min_sec: float
+    recognizer_live_segment_max_sec: float
+    recognizer_live_max_pending_segments: int
+    recognizer_live_max_chunk_size_in_byte: int
+    recognizer_cache_max_entries: int
+    recognizer_cache_ttl_sec: float
+    recognizer_cache_dir: Path | None
+    recognizer_cache_dir_max_size_in_byte: int
+
+    upstream_connect_timeout_sec: float
+    upstream_pool_limit: int
+    upstream_pool_limit_per_host: int
+    upstream_pool_keepalive_timeout_sec: float
+    upstream_pool_dns_ttl_sec: int
+    upstream_pool_force_close: bool
+    upstream_pools: dict[str, Any]
+    upstream_request_compression: str
+    upstream_request_compression_min_size_in_byte: int
+    upstream_accept_encoding: str
+    upstream_compression_overrides: dict[str, Any]
+    upstream_max_attempts: int
+    upstream_backoff_base_sec: float
+    upstream_backoff_max_sec: float
+    upstream_hedge_percentile: float
+    upstream_breaker_failures_threshold: int
+    upstream_breaker_reset_sec: float
+    upstream_concurrency_initial: int
+    upstream_concurrency_min: int
+    upstream_concurrency_max: int
+    upstream_concurrency_latency_tolerance: float
+
+    ffmpeg_path: str
+    media_preprocessing_enabled: bool
+    media_preprocess_parallelism: int
+    media_preprocess_bitrate: str
 
     max_upload_file_size_in_byte: int
+    upload_spool_dir: Path | None
+    resumable_upload_dir: Path
+    resumable_upload_max_size_in_byte: int
+    resumable_upload_chunk_size_in_byte: int
+    resumable_upload_expire_sec: float
+    resumable_upload_max_pending_count: int
+    resumable_upload_max_pending_size_in_byte: int
 
     storage_secret: str
 
+    admin_api_token: str
+
     certificate_path: Path | None
     private_key_path: Path | None
 
@@ -83,6 +150,18 @@ class AppSettings:  # pylint: disable=too-many-instance-attributes
     prompts_per_language: dict[str, Any]
 
     llm_model_id: str
+    llm_models_routing: dict[str, Any]
+    llm_models_memory_budget_in_byte: int
+    llm_progressive_mode: bool
+    llm_draft_max_new_tokens: int
+    llm_pipelined_mode: bool
+    llm_pipeline_chunk_chars: int
+    llm_live_summary_interval_sec: float
+    llm_low_memory_mode: bool
+    llm_offload_dir: Path | None
+    llm_max_memory_in_byte: int
+    llm_max_kv_cache_tokens: int
+    llm_kv_cache_memory_budget_in_byte: int
     models_cache_dir: Path | None
 
     #####################################################################################################
@@ -106,6 +185,7 @@ def _get_fields_for_output(self) -> Mapping[str, Any]:
             'TRANSLATE_API_LANGS_CACHE_EXPIRE_SEC': self.translate_api_langs_cache_expire_sec,
 
             'MAX_UPLOAD_FILE_SIZE_IN_BYTE': self.max_upload_file_size_in_byte,
+            'RESUMABLE_UPLOAD_MAX_SIZE_IN_BYTE': self.resumable_upload_max_size_in_byte,
         }
 
         if self.is_dev_mode:
@@ -167,6 +247,9 @@ def _app_settings(include_db_admin_credentials: bool = False) -> AppSettings:
             translate_api_url = urlparse(env.str('L7X_TRANSLATE_API_URL', '')).geturl()
 
         prompts_per_language: Final = orjson_loads(env.str('L7X_PROMPTS_PER_LANGUAGE', '{}'))
+        llm_models_routing: Final = orjson_loads(env.str('L7X_LLM_MODELS_ROUTING', '{}'))
+        upstream_pools: Final = orjson_loads(env.str('L7X_UPSTREAM_POOLS', '{}'))
+        upstream_compression_overrides: Final = orjson_loads(env.str('L7X_UPSTREAM_COMPRESSION_OVERRIDES', '{}'))
 
         app_build_info: Final = get_app_build_info()
 
@@ -202,14 +285,80 @@ def _app_settings(include_db_admin_credentials: bool = False) -> AppSettings:
 
             translate_api_url=translate_api_url,
             translate_api_langs_cache_expire_sec=env.int('L7X_TRANSLATE_API_LANGS_CACHE_EXPIRE_SEC', 60 * 60),
+            translate_api_read_timeout_sec=env.float('L7X_TRANSLATE_API_READ_TIMEOUT_SEC', 30.0),  # noqa: WPS432
+            translate_api_batch_max_size_in_byte=env.int('L7X_TRANSLATE_API_BATCH_MAX_SIZE_IN_BYTE', 16 * 1024),  # noqa: WPS432
+            translate_api_batch_max_segments=env.int('L7X_TRANSLATE_API_BATCH_MAX_SEGMENTS', 64),  # noqa: WPS432
+            translate_api_batch_parallelism=env.int('L7X_TRANSLATE_API_BATCH_PARALLELISM', 4),
+            translation_memory_enabled=env.bool('L7X_TRANSLATION_MEMORY_ENABLED', True),  # noqa: WPS425
+            translation_memory_max_entries=env.int('L7X_TRANSLATION_MEMORY_MAX_ENTRIES', 4096),  # noqa: WPS432
+            translation_memory_store_path=_resolve_path(env.str('L7X_TRANSLATION_MEMORY_STORE_PATH', '')),
+            translation_memory_store_max_entries=env.int('L7X_TRANSLATION_MEMORY_STORE_MAX_ENTRIES', 100_000),  # noqa: WPS432
+            lang_id_min_confidence=env.float('L7X_LANG_ID_MIN_CONFIDENCE', 0.15),  # noqa: WPS432
+            lang_id_profiles_path=_resolve_path(env.str('L7X_LANG_ID_PROFILES_PATH', '')),
+
+            lang_catalog_shared=env.bool('L7X_LANG_CATALOG_SHARED', True),  # noqa: WPS425
+            lang_catalog_dir=_resolve_path(env.str('L7X_LANG_CATALOG_DIR', '')) or Path(gettempdir()) / 'l7x_catalogs',
+            lang_catalog_capacity_in_byte=env.int('L7X_LANG_CATALOG_CAPACITY_IN_BYTE', 256 * 1024),  # noqa: WPS432
+            lang_catalog_publish_interval_sec=env.float('L7X_LANG_CATALOG_PUBLISH_INTERVAL_SEC', 1.0),
 
             recognizer_api_url=recognizer_api_url,
             recognizer_api_langs_cache_expire_sec=env.int('L7X_RECOGNIZER_API_LANGS_CACHE_EXPIRE_SEC', 60 * 60),
+            recognizer_api_read_timeout_sec=env.float('L7X_RECOGNIZER_API_READ_TIMEOUT_SEC', 300.0),  # noqa: WPS432
+            recognizer_api_hedge_enabled=env.bool('L7X_RECOGNIZER_API_HEDGE_ENABLED', False),  # noqa: WPS425
+            recognizer_segmentation_enabled=env.bool('L7X_RECOGNIZER_SEGMENTATION_ENABLED', False),  # noqa: WPS425
+            recognizer_segment_min_sec=env.float('L7X_RECOGNIZER_SEGMENT_MIN_SEC', 10.0),  # noqa: WPS432
+            recognizer_segment_max_sec=env.float('L7X_RECOGNIZER_SEGMENT_MAX_SEC', 60.0),  # noqa: WPS432
+            recognizer_segment_timeout_sec=env.float('L7X_RECOGNIZER_SEGMENT_TIMEOUT_SEC', 60.0),  # noqa: WPS432
+            recognizer_parallelism=env.int('L7X_RECOGNIZER_PARALLELISM', 4),
+            recognizer_live_segment_min_sec=env.float('L7X_RECOGNIZER_LIVE_SEGMENT_MIN_SEC', 3.0),
+            recognizer_live_segment_max_sec=env.float('L7X_RECOGNIZER_LIVE_SEGMENT_MAX_SEC', 15.0),  # noqa: WPS432
+            recognizer_live_max_pending_segments=env.int('L7X_RECOGNIZER_LIVE_MAX_PENDING_SEGMENTS', 4),
+            recognizer_live_max_chunk_size_in_byte=env.int('L7X_RECOGNIZER_LIVE_MAX_CHUNK_SIZE_IN_BYTE', 256 * 1024),  # noqa: WPS432
+            recognizer_cache_max_entries=env.int('L7X_RECOGNIZER_CACHE_MAX_ENTRIES', 256),  # noqa: WPS432
+            recognizer_cache_ttl_sec=env.float('L7X_RECOGNIZER_CACHE_TTL_SEC', 7 * 24 * 60 * 60.0),  # noqa: WPS432
+            recognizer_cache_dir=_resolve_path(env.str('L7X_RECOGNIZER_CACHE_DIR', '')),
+            recognizer_cache_dir_max_size_in_byte=env.int('L7X_RECOGNIZER_CACHE_DIR_MAX_SIZE_IN_BYTE', 256 * 1024 * 1024),  # noqa: WPS432
+
+            upstream_connect_timeout_sec=env.float('L7X_UPSTREAM_CONNECT_TIMEOUT_SEC', 5.0),  # noqa: WPS432
+            upstream_pool_limit=env.int('L7X_UPSTREAM_POOL_LIMIT', 100),  # noqa: WPS432
+            upstream_pool_limit_per_host=env.int('L7X_UPSTREAM_POOL_LIMIT_PER_HOST', 0),
+            upstream_pool_keepalive_timeout_sec=env.float('L7X_UPSTREAM_POOL_KEEPALIVE_TIMEOUT_SEC', 15.0),  # noqa: WPS432
+            upstream_pool_dns_ttl_sec=env.int('L7X_UPSTREAM_POOL_DNS_TTL_SEC', 10),  # noqa: WPS432
+            upstream_pool_force_close=env.bool('L7X_UPSTREAM_POOL_FORCE_CLOSE', False),  # noqa: WPS425
+            upstream_pools=upstream_pools,
+            upstream_request_compression=env.str('L7X_UPSTREAM_REQUEST_COMPRESSION', '').strip().lower(),
+            upstream_request_compression_min_size_in_byte=env.int('L7X_UPSTREAM_REQUEST_COMPRESSION_MIN_SIZE_IN_BYTE', 1024),  # noqa: WPS432
+            upstream_accept_encoding=env.str('L7X_UPSTREAM_ACCEPT_ENCODING', 'gzip, deflate').strip(),
+            upstream_compression_overrides=upstream_compression_overrides,
+            upstream_max_attempts=env.int('L7X_UPSTREAM_MAX_ATTEMPTS', 3),
+            upstream_backoff_base_sec=env.float('L7X_UPSTREAM_BACKOFF_BASE_SEC', 0.2),  # noqa: WPS432
+            upstream_backoff_max_sec=env.float('L7X_UPSTREAM_BACKOFF_MAX_SEC', 5.0),  # noqa: WPS432
+            upstream_hedge_percentile=env.float('L7X_UPSTREAM_HEDGE_PERCENTILE', 0.0),
+            upstream_breaker_failures_threshold=env.int('L7X_UPSTREAM_BREAKER_FAILURES_THRESHOLD', 5),
+            upstream_breaker_reset_sec=env.float('L7X_UPSTREAM_BREAKER_RESET_SEC', 30.0),  # noqa: WPS432
+            upstream_concurrency_initial=env.int('L7X_UPSTREAM_CONCURRENCY_INITIAL', 8),
+            upstream_concurrency_min=env.int('L7X_UPSTREAM_CONCURRENCY_MIN', 1),
+            upstream_concurrency_max=env.int('L7X_UPSTREAM_CONCURRENCY_MAX', 64),  # noqa: WPS432
+            upstream_concurrency_latency_tolerance=env.float('L7X_UPSTREAM_CONCURRENCY_LATENCY_TOLERANCE', 2.0),
+
+            ffmpeg_path=env.str('L7X_FFMPEG_PATH', 'ffmpeg').strip(),
+            media_preprocessing_enabled=env.bool('L7X_MEDIA_PREPROCESSING_ENABLED', True),  # noqa: WPS425
+            media_preprocess_parallelism=env.int('L7X_MEDIA_PREPROCESS_PARALLELISM', 2),
+            media_preprocess_bitrate=env.str('L7X_MEDIA_PREPROCESS_BITRATE', '24k').strip(),
 
             max_upload_file_size_in_byte=env.int('L7X_MAX_UPLOAD_FILE_SIZE_IN_BYTE', 50 * 1024 * 1024),  # noqa: WPS432
+            upload_spool_dir=_resolve_path(env.str('L7X_UPLOAD_SPOOL_DIR', '')),
+            resumable_upload_dir=_resolve_path(env.str('L7X_RESUMABLE_UPLOAD_DIR', '')) or Path(gettempdir()) / 'l7x_uploads',
+            resumable_upload_max_size_in_byte=env.int('L7X_RESUMABLE_UPLOAD_MAX_SIZE_IN_BYTE', 2 * 1024 * 1024 * 1024),  # noqa: WPS432
+            resumable_upload_chunk_size_in_byte=env.int('L7X_RESUMABLE_UPLOAD_CHUNK_SIZE_IN_BYTE', 8 * 1024 * 1024),  # noqa: WPS432
+            resumable_upload_expire_sec=env.float('L7X_RESUMABLE_UPLOAD_EXPIRE_SEC', 24 * 60 * 60.0),  # noqa: WPS432
+            resumable_upload_max_pending_count=env.int('L7X_RESUMABLE_UPLOAD_MAX_PENDING_COUNT', 32),  # noqa: WPS432
+            resumable_upload_max_pending_size_in_byte=env.int('L7X_RESUMABLE_UPLOAD_MAX_PENDING_SIZE_IN_BYTE', 16 * 1024 * 1024 * 1024),  # noqa: WPS432
 
             storage_secret=env.str('L7X_STORAGE_SECRET', ''),
 
+            admin_api_token=env.str('L7X_ADMIN_API_TOKEN', '').strip(),
+
             certificate_path=_resolve_path(env.str('L7X_SSL_CERTIFICATE_PATH', '')),
             private_key_path=_resolve_path(env.str('L7X_SSL_PRIVATE_KEY_PATH', '')),
             dark_mode=env.bool('L7X_DARK_MODE', False),
@@ -217,6 +366,18 @@ def _app_settings(include_db_admin_credentials: bool = False) -> AppSettings:
             prompts_per_language=prompts_per_language,
 
             llm_model_id=env.str('L7X_LLM_MODEL_ID', ''),
+            llm_models_routing=llm_models_routing,
+            llm_models_memory_budget_in_byte=env.int('L7X_LLM_MODELS_MEMORY_BUDGET_IN_BYTE', 0),
+            llm_progressive_mode=env.bool('L7X_LLM_PROGRESSIVE_MODE', False),  # noqa: WPS425
+            llm_draft_max_new_tokens=env.int('L7X_LLM_DRAFT_MAX_NEW_TOKENS', 512),  # noqa: WPS432
+            llm_pipelined_mode=env.bool('L7X_LLM_PIPELINED_MODE', False),  # noqa: WPS425
+            llm_pipeline_chunk_chars=env.int('L7X_LLM_PIPELINE_CHUNK_CHARS', 4000),  # noqa: WPS432
+            llm_live_summary_interval_sec=env.float('L7X_LLM_LIVE_SUMMARY_INTERVAL_SEC', 30.0),  # noqa: WPS432
+            llm_low_memory_mode=env.bool('L7X_LLM_LOW_MEMORY_MODE', False),  # noqa: WPS425
+            llm_offload_dir=_resolve_path(env.str('L7X_LLM_OFFLOAD_DIR', '')),
+            llm_max_memory_in_byte=env.int('L7X_LLM_MAX_MEMORY_IN_BYTE', 0),
+            llm_max_kv_cache_tokens=env.int('L7X_LLM_MAX_KV_CACHE_TOKENS', 4096),  # noqa: WPS432
+            llm_kv_cache_memory_budget_in_byte=env.int('L7X_LLM_KV_CACHE_MEMORY_BUDGET_IN_BYTE', 0),
             models_cache_dir=_resolve_path(env.str('L7X_MODELS_CACHE_DIR', '')),
         )
 
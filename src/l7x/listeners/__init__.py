@@ -4,7 +4,9 @@
 from typing import Final, TypeAlias
 
 from l7x.app import App
+from l7x.listeners.admin_listener import admin_listener_registrar
 from l7x.listeners.mainpage_listener import mainpage_listener_registrar
+from l7x.listeners.upload_listener import upload_listener_registrar
 
 #####################################################################################################
 
@@ -15,6 +17,8 @@
 def _get_app_listeners_registrars() -> ListenersRegistrars:
     return [
         mainpage_listener_registrar,
+        admin_listener_registrar,
+        upload_listener_registrar,
     ]
 
 #####################################################################################################
@@ -0,0 +1,82 @@
+#####################################################################################################
+
+from asyncio import get_running_loop
+from dataclasses import asdict
+from functools import partial
+from hmac import compare_digest
+from typing import Final
+
+from fastapi import Header
+# pylint: disable-next=no-name-in-module
+from pydantic import BaseModel
+from starlette import status
+
+from l7x.app import App
+from l7x.commands.llm_model_swap_command import LlmModelSwapCommand
+from l7x.types.errors import AppException
+from l7x.utils.aiohttp_utils import get_connection_metrics
+from l7x.utils.response_utils import JSONResponseExt
+from l7x.utils.translation_memory_utils import get_translation_memory_stats
+from l7x.utils.upstream_utils import get_upstream_clients
+
+#####################################################################################################
+
+_LLM_MODEL_SWAP_CALL_TIMEOUT_SEC: Final = 60.0
+
+#####################################################################################################
+
+class _LlmModelSwapRequest(BaseModel):
+    model_id: str
+
+#####################################################################################################
+
+def admin_listener_registrar(app: App, /) -> None:
+    admin_api_token: Final = app.app_settings.admin_api_token
+    if not admin_api_token:
+        return
+
+    expected_authorization: Final = f'Bearer {admin_api_token}'
+
+    def _check_authorization(authorization: str) -> None:
+        if not compare_digest(authorization.encode('utf-8'), expected_authorization.encode('utf-8')):
+            raise AppException(detail='Invalid admin token', err_code='UNAUTHORIZED', status_code=status.HTTP_401_UNAUTHORIZED)
+
+    async def _swap_llm_model(req: _LlmModelSwapRequest, authorization: str = Header('')) -> JSONResponseExt:
+        _check_authorization(authorization)
+
+        cmd_manager: Final = app.cmd_manager
+        if cmd_manager is None:
+            raise AppException(detail='LLM worker is not available', err_code='SERVICE_UNAVAILABLE', status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        send_and_wait_result: Final = partial(
+            cmd_manager.send_and_wait_result,
+            type_ret=bool,
+            call_timeout_sec=_LLM_MODEL_SWAP_CALL_TIMEOUT_SEC,
+        )
+        is_started: Final = await get_running_loop().run_in_executor(None, send_and_wait_result, LlmModelSwapCommand(model_id=req.model_id))
+        return JSONResponseExt({'model_id': req.model_id, 'started': is_started})
+
+    async def _get_upstream_metrics(authorization: str = Header('')) -> JSONResponseExt:
+        _check_authorization(authorization)
+
+        translation_memory_stats: Final = get_translation_memory_stats()
+        # numbers of this worker process only, every worker has its own pools
+        return JSONResponseExt({
+            **get_connection_metrics().to_dict(),
+            'upstreams': {
+                upstream_name: {
+                    'circuit_state': upstream_client.breaker.state,
+                    'concurrency_limit': upstream_client.limiter.limit,
+                    'in_flight': upstream_client.limiter.in_flight_count,
+                    'queued': upstream_client.limiter.queued_count,
+                }
+                for upstream_name, upstream_client in sorted(get_upstream_clients().items())
+            },
+            'recognition_cache': asdict(app.recognize_service.cache_stats),
+            'translation_memory': None if translation_memory_stats is None else asdict(translation_memory_stats),
+        })
+
+    app.post('/api/admin/llm-model-swap')(_swap_llm_model)
+    app.get('/api/admin/upstream-metrics')(_get_upstream_metrics)
+
+#####################################################################################################
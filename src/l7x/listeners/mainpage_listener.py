@@ -2,26 +2,35 @@
 import asyncio
 import base64
 import os
-from asyncio import sleep, get_running_loop
+from asyncio import CancelledError, Queue, Task, create_task, gather, sleep, get_running_loop
+from collections.abc import Callable, MutableMapping
+from contextlib import suppress
+from dataclasses import dataclass as _std_dataclass, field
 from functools import partial
 from io import BytesIO
-from typing import Final
+from pathlib import Path
+from typing import Final, TypeVar
+from uuid import uuid4
 
 from docx import Document
-from nicegui import ui, App
+from numpy import frombuffer, int16, ndarray
+from nicegui import ui, App, Client
 from nicegui.elements.button import Button
 from nicegui.elements.textarea import Textarea
-from nicegui.events import UploadEventArguments
+from nicegui.events import ClickEventArguments, GenericEventArguments, UploadEventArguments
 from pydantic.dataclasses import dataclass
 from starlette.requests import Request
-from torch import float16 as _torch_float16
-from transformers import pipeline, PreTrainedTokenizer, PreTrainedModel
 
+from l7x.commands.llm_process_command import LlmProcessCommand
 from l7x.configs.constants import RECONGIZER_MIME_TYPES
 from l7x.configs.settings import AppSettings
 from l7x.services.recognize_service import PrivateRecognizeService
-from l7x.utils.cmd_manager_utils import BaseCommand, _CmdGlobalContext, _CmdLocalContext, _CmdReturnValue
+from l7x.utils.audio_utils import LiveAudioBuffer, encode_wav
+from l7x.utils.cmd_manager_utils import CmdCancelledException
 from l7x.utils.fastapi_utils import AppFastAPI
+from l7x.utils.file_utils import remove_file_quietly, spool_to_temp_file
+from l7x.utils.orjson_utils import orjson_dumps_to_str
+from l7x.utils.upload_utils import UploadException
 
 #####################################################################################################
 
@@ -29,65 +38,358 @@
 class AudioData:
     name: str
     type: str
-    file: bytes
+    path: Path
+    content_hash: str
+    # the running stages reading the file: a replaced upload is removed only when the last one finishes
+    readers_count: int = 0
+    is_discarded: bool = False
 
 #####################################################################################################
 
-@dataclass(kw_only=True, frozen=True)
-class LlmProcessCommand(BaseCommand):
-    text: str
-    language: str
-    convert_to: str | None
+def _discard_audio_file(audio_data: AudioData) -> None:
+    audio_data.is_discarded = True
+    if audio_data.readers_count == 0:
+        remove_file_quietly(audio_data.path)
 
+#####################################################################################################
+
+_SESSION_STAGE_CACHE_SIZE: Final = 8
+_CLIENT_RECONNECT_GRACE_SEC: Final = 10.0
+
+_StageKey = TypeVar('_StageKey')
+
+#####################################################################################################
+
+@_std_dataclass(kw_only=True)
+class _SessionStages:
+    # (audio content hash, language) -> recognized text
+    recognized_texts: dict[tuple[str, str | None], str] = field(default_factory=dict)
+    # (recognized text, language) -> summary without style postprocessing
+    base_summaries: dict[tuple[str, str | None], str] = field(default_factory=dict)
+    # (base summary, language, style) -> converted summary
+    converted_summaries: dict[tuple[str, str | None, str], str] = field(default_factory=dict)
+
+#####################################################################################################
+
+def _remember_stage_result(stage_results: MutableMapping[_StageKey, str], key: _StageKey, stage_result: str) -> None:
+    stage_results.pop(key, None)
+    stage_results[key] = stage_result
+    while len(stage_results) > _SESSION_STAGE_CACHE_SIZE:
+        stage_results.pop(next(iter(stage_results)))
+
+#####################################################################################################
+
+def _watch_client_gone(client: Client, on_gone: Callable[[], None]) -> Callable[[], None]:
+    pending_checks: Final[list[Task[None]]] = []
+
+    async def _check_client_gone() -> None:
+        # short websocket drops are restored by nicegui, so react only if the page did not reconnect
+        await sleep(_CLIENT_RECONNECT_GRACE_SEC)
+        if not client.has_socket_connection:
+            on_gone()
+
+    def _on_disconnect() -> None:
+        pending_checks.append(create_task(_check_client_gone()))
+
+    client.on_disconnect(_on_disconnect)
+
+    def _unwatch() -> None:
+        with suppress(ValueError):
+            client.disconnect_handlers.remove(_on_disconnect)
+        for pending_check in pending_checks:
+            pending_check.cancel()
+
+    return _unwatch
+
+#####################################################################################################
+
+async def _send_llm_cmd(app: App, client: Client, llm_cmd: LlmProcessCommand) -> str:
+    call_id: Final = uuid4()
+    unwatch_client: Final = _watch_client_gone(client, partial(app.cmd_manager.cancel, call_id))
+
+    loop = get_running_loop()
+    send_and_wait_result = partial(
+        app.cmd_manager.send_and_wait_result,
+        call_timeout_sec=180,
+        call_id=call_id,
+    )
+    try:
+        return await loop.run_in_executor(None, send_and_wait_result, llm_cmd)
+    except CancelledError:
+        # the waiting thread cannot be interrupted, but the worker can drop the command
+        app.cmd_manager.cancel(call_id)
+        raise
+    finally:
+        unwatch_client()
+
+#####################################################################################################
+
+async def _resolve_language(app: App, language: str | None, text: str) -> str | None:
+    # the page sets no language: the summary one is detected from the transcript, locally in most cases
+    if language is not None or not text.strip():
+        return language
+    detected_language: Final = await app.autodetect_language_service.detect_language(text=text)
+    return detected_language or None
+
+#####################################################################################################
+
+async def _show_draft_summary(
+    app: App,
+    client: Client,
+    recognized_text: str,
+    language: str | None,
+    summarized_area: Textarea,
+) -> None:
+    try:
+        draft_text: Final = await _send_llm_cmd(app, client, LlmProcessCommand(
+            text=recognized_text,
+            language=language,
+            convert_to=None,
+            draft=True,
+        ))
+    except CmdCancelledException:
+        raise
+    except Exception as err:
+        app.logger.warning(f'Draft summary failed: {err}')
+        return
+    summarized_area.set_value(draft_text)
+
+#####################################################################################################
+
+async def _recognize_and_summarize_pipelined(
+    app: App,
+    client: Client,
+    language: str | None,
+    audio_data: AudioData,
+    recognizer_area: Textarea,
+    summarized_area: Textarea,
+) -> tuple[str, str]:
+    recognizer_service: Final[PrivateRecognizeService] = app.recognize_service
+    chunk_chars: Final = app.settings.llm_pipeline_chunk_chars
+    recognized_parts: Final[list[str]] = []
+    chunk_parts: Final[list[str]] = []
+    chunk_summary_tasks: Final[list[Task[str]]] = []
+    summary_language = language
+
+    def _summarize_chunk() -> None:
+        chunk_summary_tasks.append(create_task(_send_llm_cmd(app, client, LlmProcessCommand(
+            text=' '.join(chunk_parts),
+            language=summary_language,
+            convert_to=None,
+        ))))
+        chunk_parts.clear()
+
+    try:
+        # the LLM works on the finished chunks while the next segments are still being recognized
+        async for segment in recognizer_service.iter_recognized_segments(
+            file_name=audio_data.name,
+            audio_path=audio_data.path,
+            language=language,
+        ):
+            segment_text = segment.text.strip()
+            if not segment_text:
+                continue
+            recognized_parts.append(segment_text)
+            recognizer_area.set_value(' '.join(recognized_parts))
+            chunk_parts.append(segment_text)
+            if sum(len(chunk_part) + 1 for chunk_part in chunk_parts) >= chunk_chars:
+                summary_language = await _resolve_language(app, summary_language, ' '.join(chunk_parts))
+                _summarize_chunk()
+
+        recognized_text: Final = ' '.join(recognized_parts)
+        summary_language = await _resolve_language(app, summary_language, recognized_text)
+        if not chunk_summary_tasks:
+            # short recording: a single pass over the whole text
+            return recognized_text, await _send_llm_cmd(app, client, LlmProcessCommand(
+                text=recognized_text,
+                language=summary_language,
+                convert_to=None,
+            ))
+
+        if chunk_parts:
+            _summarize_chunk()
+        chunk_summaries: Final = await gather(*chunk_summary_tasks)
+        summarized_area.set_value('\n\n'.join(chunk_summaries))
+
+        # reduce step: the summaries of the chunks are summarized once more
+        return recognized_text, await _send_llm_cmd(app, client, LlmProcessCommand(
+            text='\n\n'.join(chunk_summaries),
+            language=summary_language,
+            convert_to=None,
+        ))
+    finally:
+        for chunk_summary_task in chunk_summary_tasks:
+            chunk_summary_task.cancel()
+
+#####################################################################################################
+
+class _LiveSession:
     #####################################################################################################
 
-    async def execute(
+    def __init__(
         self,
-        *,
-        global_context: _CmdGlobalContext,
-        local_context: _CmdLocalContext,
-    ) -> _CmdReturnValue:
-        model: Final[PreTrainedModel] = global_context.model
-        tokenizer: Final[PreTrainedTokenizer] = global_context.tokenizer
-        prompts_per_language: Final = global_context.app_settings.prompts_per_language
-        prompts: Final = prompts_per_language.get(self.language, prompts_per_language['base'])
-        if prompts is None:
-            global_context.logger.warning('Prompts not found')
+        app: App,
+        client: Client,
+        language: str | None,
+        recognizer_area: Textarea,
+        summarized_area: Textarea,
+    ) -> None:
+        settings: Final[AppSettings] = app.settings
+        self._app: Final = app
+        self._client: Final = client
+        self._language: Final = language
+        self._recognizer_area: Final = recognizer_area
+        self._summarized_area: Final = summarized_area
+        self._max_chunk_size_in_byte: Final = settings.recognizer_live_max_chunk_size_in_byte
+        self._summary_interval_sec: Final = settings.llm_live_summary_interval_sec
+        self._audio_buffer: Final = LiveAudioBuffer(
+            min_segment_sec=settings.recognizer_live_segment_min_sec,
+            max_segment_sec=settings.recognizer_live_segment_max_sec,
+        )
+        # audio ingest never waits: when the recognizer falls behind, the oldest segments are dropped
+        self._segments: Final[Queue[ndarray | None]] = Queue(maxsize=max(settings.recognizer_live_max_pending_segments, 1))
+        self._transcript_parts: Final[list[str]] = []
+        self._summarized_parts_count = 0
+        self._summary = ''
+        self._summary_language = language
+        self._segments_count = 0
+        self._dropped_segments_count = 0
+        self._dropped_chunks_count = 0
+        self._recognize_task: Task[None] | None = None
+        self._summary_task: Task[None] | None = None
+
+    #####################################################################################################
+
+    @property
+    def is_running(self) -> bool:
+        return self._recognize_task is not None
+
+    #####################################################################################################
+
+    def start(self) -> None:
+        self._recognize_task = create_task(self._recognize_loop())
+        self._summary_task = create_task(self._summary_loop())
+
+    #####################################################################################################
+
+    def feed(self, pcm_chunk: bytes) -> None:
+        if not self.is_running:
+            return
+        if len(pcm_chunk) > self._max_chunk_size_in_byte:
+            self._dropped_chunks_count += 1
+            # once per session: the browser keeps sending chunks of the same size
+            if self._dropped_chunks_count == 1:
+                ui.notify('Live audio is too large and is partly skipped', type='warning', position='top')
             return
+        samples: Final = frombuffer(pcm_chunk[:len(pcm_chunk) // 2 * 2], dtype=int16)
+        for segment_samples in self._audio_buffer.push(samples):
+            self._enqueue_segment(segment_samples)
 
-        # sum_system_prompt = "Please summarize the text, highlighting the main topic, key points, and supporting details. Ensure your response is concise, accurate, and easy to understand. Your respond must be in the same language as the original sentence."
-        text = self.text.strip()
+    #####################################################################################################
 
-        llm_pipeline = pipeline(
-            "text-generation",
-            model=model,
-            tokenizer=tokenizer,
-            model_kwargs={'torch_dtype': _torch_float16},
-            device_map='auto',
-        )
-        summary_prompts = prompts.get('summary', [])
-        new_prompts = summary_prompts
-
-        if self.convert_to is not None:
-            new_prompts.append(prompts.get(self.convert_to, []))
-
-        for sum_prompt in new_prompts:
-            messages = [
-                {"role": "system", "content": sum_prompt},
-                {"role": "user", "content": text}
-            ]
-
-            outputs = llm_pipeline(
-                messages,
-                max_new_tokens=10000,
-                do_sample=False,
-                temperature=0,
-                pad_token_id=tokenizer.eos_token_id,
-            )
-            out_text = outputs[0]["generated_text"][-1]['content']
+    async def stop(self) -> None:
+        recognize_task: Final = self._recognize_task
+        summary_task: Final = self._summary_task
+        if recognize_task is None or summary_task is None:
+            return
+        self._recognize_task = None
+        self._summary_task = None
+
+        summary_task.cancel()
+        tail_samples: Final = self._audio_buffer.flush()
+        if tail_samples is not None:
+            self._enqueue_segment(tail_samples)
+        self._enqueue_segment(None)
+        try:
+            # a tick still finishing would summarize the same parts as the final update
+            with suppress(CancelledError):
+                await summary_task
+            await recognize_task
+            # the last words are folded into the summary once the recognizer has caught up
+            await self._update_summary()
+        finally:
+            if self._dropped_segments_count:
+                self._app.logger.warning(f'Live session dropped {self._dropped_segments_count} of {self._segments_count} segments')
+            if self._dropped_chunks_count:
+                self._app.logger.warning(f'Live session dropped {self._dropped_chunks_count} oversized audio chunks')
+
+    #####################################################################################################
+
+    def cancel(self) -> None:
+        for session_task in (self._recognize_task, self._summary_task):
+            if session_task is not None:
+                session_task.cancel()
+        self._recognize_task = None
+        self._summary_task = None
+
+    #####################################################################################################
+
+    def _enqueue_segment(self, segment_samples: ndarray | None) -> None:
+        segments: Final = self._segments
+        while segments.full():
+            dropped_segment = segments.get_nowait()
+            if dropped_segment is None:
+                # the stop marker must stay
+                segments.put_nowait(dropped_segment)
+                return
+            self._dropped_segments_count += 1
+        if segment_samples is not None:
+            self._segments_count += 1
+        segments.put_nowait(segment_samples)
+
+    #####################################################################################################
+
+    async def _recognize_loop(self) -> None:
+        recognizer_service: Final[PrivateRecognizeService] = self._app.recognize_service
+        segment_index = 0
+        while (segment_samples := await self._segments.get()) is not None:
+            segment_index += 1
+            try:
+                segment_text = await recognizer_service.recognize(
+                    file_name=f'live_{segment_index}.wav',
+                    wav=encode_wav(segment_samples),
+                    language=self._language,
+                    mime_type='audio/wav',
+                )
+            except Exception as err:
+                self._app.logger.warning(f'Live segment {segment_index} recognition failed: {err}')
+                continue
+            segment_text = segment_text.strip()
+            if segment_text:
+                self._transcript_parts.append(segment_text)
+                self._recognizer_area.set_value(' '.join(self._transcript_parts))
+
+    #####################################################################################################
+
+    async def _summary_loop(self) -> None:
+        # the next tick starts only after the previous summary is ready, so a slow LLM skips ticks instead of queueing them
+        while True:
+            await sleep(self._summary_interval_sec)
+            try:
+                await self._update_summary()
+            except CmdCancelledException:
+                return
+            except Exception as err:
+                self._app.logger.warning(f'Live summary failed: {err}')
+
+    #####################################################################################################
 
-            text = out_text.strip()
-        return text
+    async def _update_summary(self) -> None:
+        transcript_parts_count: Final = len(self._transcript_parts)
+        new_parts: Final = self._transcript_parts[self._summarized_parts_count:transcript_parts_count]
+        if not new_parts:
+            return
+        if self._summary_language is None:
+            self._summary_language = await _resolve_language(self._app, None, ' '.join(self._transcript_parts))
+        summary: Final = await _send_llm_cmd(self._app, self._client, LlmProcessCommand(
+            text=' '.join(new_parts),
+            language=self._summary_language,
+            convert_to=None,
+            previous_summary=self._summary or None,
+        ))
+        self._summary = summary
+        self._summarized_parts_count = transcript_parts_count
+        self._summarized_area.set_value(summary)
 
 #####################################################################################################
 
@@ -99,46 +401,114 @@ async def _summarize(
     recognizer_area: Textarea,
     summarized_area: Textarea,
     radio_value: str,
+    session_stages: _SessionStages,
 ):
     if audio_data is None:
         ui.notify('File not found', position='top', type='negative')
         return
 
     recognizer_service: PrivateRecognizeService = app.recognize_service
+    settings: Final[AppSettings] = app.settings
+    client: Final = summ_btn.client
+    convert_to: Final = radio_value.lower() if radio_value.lower() in ('formal', 'informal') else None
 
+    audio_data.readers_count += 1
     try:
         summ_btn.set_enabled(False)
-        recognized_text = await asyncio.wait_for(
-            fut=recognizer_service.recognize(
-                file_name=audio_data.name,
-                mime_type=audio_data.type,
-                wav=audio_data.file,
-                language=language,
-            ),
-            timeout=180,
-        )
-        recognizer_area.set_value(recognized_text)
-        await sleep(0.5)
 
-        llm_cmd: Final = LlmProcessCommand(
-            text=recognized_text,
-            language=language,
-            convert_to=radio_value.lower() if radio_value.lower() in ('formal', 'informal') else None,
-        )
+        recognize_key: Final = (audio_data.content_hash, language)
+        recognized_text = session_stages.recognized_texts.get(recognize_key)
+        if recognized_text is None and settings.llm_pipelined_mode and settings.recognizer_segmentation_enabled:
+            recognized_text, pipelined_summary = await _recognize_and_summarize_pipelined(
+                app,
+                client,
+                language,
+                audio_data,
+                recognizer_area,
+                summarized_area,
+            )
+            if recognized_text:
+                _remember_stage_result(session_stages.recognized_texts, recognize_key, recognized_text)
+            _remember_stage_result(
+                session_stages.base_summaries,
+                (recognized_text, await _resolve_language(app, language, recognized_text)),
+                pipelined_summary,
+            )
+        elif recognized_text is None:
+            if settings.recognizer_segmentation_enabled:
+                segmented_recognition = await recognizer_service.recognize_segmented(
+                    file_name=audio_data.name,
+                    audio_path=audio_data.path,
+                    language=language,
+                )
+                recognized_text = segmented_recognition.text
+            else:
+                preprocessed_media = await recognizer_service.preprocess_media(
+                    file_name=audio_data.name,
+                    audio_path=audio_data.path,
+                    mime_type=audio_data.type,
+                )
+                if preprocessed_media is not None:
+                    # the compact copy replaces the upload, so the next runs skip preprocessing
+                    remove_file_quietly(audio_data.path)
+                    audio_data.name = preprocessed_media.file_name
+                    audio_data.type = preprocessed_media.mime_type
+                    audio_data.path = preprocessed_media.path
+                recognized_text = await asyncio.wait_for(
+                    fut=recognizer_service.recognize(
+                        file_name=audio_data.name,
+                        mime_type=audio_data.type,
+                        wav=audio_data.path,
+                        language=language,
+                        content_hash=audio_data.content_hash,
+                    ),
+                    timeout=180,
+                )
+            if recognized_text:
+                _remember_stage_result(session_stages.recognized_texts, recognize_key, recognized_text)
+            recognizer_area.set_value(recognized_text)
+            await sleep(0.5)
+        else:
+            recognizer_area.set_value(recognized_text)
+
+        summary_language: Final = await _resolve_language(app, language, recognized_text)
+        base_summary_key: Final = (recognized_text, summary_language)
+        summary_text = session_stages.base_summaries.get(base_summary_key)
+        if summary_text is None:
+            if settings.llm_progressive_mode:
+                await _show_draft_summary(app, client, recognized_text, summary_language, summarized_area)
+            summary_text = await _send_llm_cmd(app, client, LlmProcessCommand(
+                text=recognized_text,
+                language=summary_language,
+                convert_to=None,
+            ))
+            _remember_stage_result(session_stages.base_summaries, base_summary_key, summary_text)
+
+        if convert_to is not None:
+            converted_key: Final = (summary_text, summary_language, convert_to)
+            converted_text = session_stages.converted_summaries.get(converted_key)
+            if converted_text is None:
+                converted_text = await _send_llm_cmd(app, client, LlmProcessCommand(
+                    text=summary_text,
+                    language=summary_language,
+                    convert_to=convert_to,
+                    with_summary=False,
+                ))
+                _remember_stage_result(session_stages.converted_summaries, converted_key, converted_text)
+            summary_text = converted_text
 
-        loop = get_running_loop()
-        send_and_wait_result = partial(
-            app.cmd_manager.send_and_wait_result,
-            call_timeout_sec=180,
-        )
-        summary_text = await loop.run_in_executor(None, send_and_wait_result, llm_cmd)
         summarized_area.set_value(summary_text)
+    except CmdCancelledException:
+        return
     except Exception as err:
         print(f'Error: {err}')
         ui.notify('Recognize error', type='negative', position='top')
         return
     finally:
         summ_btn.set_enabled(True)
+        audio_data.readers_count -= 1
+        if audio_data.is_discarded:
+            _discard_audio_file(audio_data)
 
 #####################################################################################################
 
@@ -203,10 +573,15 @@ async def _clear_handler(rec_area: Textarea, summ_area: Textarea, download_btn:
 
 async def _show_mainpage(request: Request) -> None:
     ui.add_css('./static/style.css')
+    ui.add_head_html('<script src="/static/live_audio.js"></script>')
+    ui.add_head_html('<script src="/static/resumable_upload.js"></script>')
     app: Final = request.app
     settings: Final[AppSettings] = app.settings
     audio_file_data: AudioData | None = None
-    language = 'ru'
+    session_stages: Final = _SessionStages()
+    client: Final = ui.context.client
+    # the recognizer detects the spoken language itself, the summary one comes from the transcript
+    language: str | None = None
     if settings.dark_mode:
         ui.add_head_html('''
         <style>
@@ -216,18 +591,108 @@ async def _show_mainpage(request: Request) -> None:
 
     #######################################################################################
 
+    def _remove_audio_file() -> None:
+        nonlocal audio_file_data
+        if audio_file_data is not None:
+            _discard_audio_file(audio_file_data)
+            audio_file_data = None
+
+    _watch_client_gone(client, _remove_audio_file)
+
+    #######################################################################################
+
+    live_session: _LiveSession | None = None
+
+    def _cancel_live_session() -> None:
+        if live_session is not None:
+            live_session.cancel()
+
+    _watch_client_gone(client, _cancel_live_session)
+
+    def _feed_live_audio(event_args: GenericEventArguments) -> None:
+        if live_session is not None:
+            live_session.feed(base64.b64decode(event_args.args.get('pcm', '')))
+
+    ui.on('live_audio_chunk', _feed_live_audio)
+
+    async def _toggle_live(event_args: ClickEventArguments) -> None:
+        nonlocal live_session
+        live_btn: Final = event_args.sender
+        if live_session is not None and live_session.is_running:
+            live_btn.set_text('Live')
+            await ui.run_javascript('return await window.l7xLiveAudio.stop();', timeout=10)
+            await live_session.stop()
+            return
+
+        rec_area.set_value('')
+        summ_area.set_value('')
+        live_session = _LiveSession(app, client, language, rec_area, summ_area)
+        try:
+            await ui.run_javascript('return await window.l7xLiveAudio.start();', timeout=30)
+        except Exception as err:
+            app.logger.warning(f'Microphone is not available: {err}')
+            ui.notify('Microphone is not available', type='negative', position='top')
+            return
+        live_session.start()
+        live_btn.set_text('Stop live')
+
+    #######################################################################################
+
     async def _save_audio(event_args: UploadEventArguments) -> None:
         nonlocal audio_file_data
+        _remove_audio_file()
         if event_args.type not in RECONGIZER_MIME_TYPES:
             ui.notify('Not supported file type', type='negative', position='top')
-            audio_file_data = None
             return
 
+        # the upload is copied to disk in chunks, so the web worker never holds the whole file in memory
+        spooled_file: Final = await get_running_loop().run_in_executor(
+            None,
+            partial(spool_to_temp_file, event_args.content, settings.upload_spool_dir, suffix=Path(event_args.name).suffix),
+        )
         audio_file_data = AudioData(
             name=event_args.name,
             type=event_args.type,
-            file=event_args.content.read(),
+            path=spooled_file.path,
+            content_hash=spooled_file.content_hash,
+        )
+
+    #######################################################################################
+
+    async def _pick_resumable_upload() -> None:
+        uploads_url: Final = f'{request.base_url}api/uploads'
+        await ui.run_javascript(f'return window.l7xResumableUpload.pick({orjson_dumps_to_str(uploads_url)}, {orjson_dumps_to_str(",".join(sorted(RECONGIZER_MIME_TYPES)))});')
+
+    def _show_resumable_upload_progress(event_args: GenericEventArguments) -> None:
+        total_size: Final = max(int(event_args.args.get('total', 0)), 1)
+        upload_progress.set_visibility(True)
+        upload_progress.set_value(int(event_args.args.get('loaded', 0)) / total_size)
+
+    async def _take_resumable_upload(event_args: GenericEventArguments) -> None:
+        nonlocal audio_file_data
+        upload_progress.set_visibility(False)
+        try:
+            completed_upload = await app.upload_store.take_completed(str(event_args.args.get('upload_id', '')))
+        except UploadException as err:
+            ui.notify(f'Upload failed: {err.detail}', type='negative', position='top')
+            return
+        _remove_audio_file()
+        audio_file_data = AudioData(
+            name=completed_upload.file_name,
+            type=completed_upload.mime_type,
+            path=completed_upload.spooled_file.path,
+            content_hash=completed_upload.spooled_file.content_hash,
         )
+        ui.notify(f'File "{completed_upload.file_name}" uploaded', type='positive', position='top')
+
+    def _show_resumable_upload_error(event_args: GenericEventArguments) -> None:
+        upload_progress.set_visibility(False)
+        app.logger.warning(f'Resumable upload failed: {event_args.args.get("error")}')
+        ui.notify('Upload failed', type='negative', position='top')
+
+    ui.on('resumable_upload_progress', _show_resumable_upload_progress)
+    ui.on('resumable_upload_done', _take_resumable_upload)
+    ui.on('resumable_upload_failed', _show_resumable_upload_error)
 
     #######################################################################################
 
@@ -239,6 +704,11 @@ async def _save_audio(event_args: UploadEventArguments) -> None:
             max_files=1,
             on_upload=_save_audio,
         ).classes('shadow-border')
+        with ui.row():
+            # large files go in resumable chunks straight to disk, past the single request size limit
+            ui.button('Upload large file', icon='cloud_upload', on_click=_pick_resumable_upload).props('flat')
+            upload_progress = ui.linear_progress(value=0, show_value=False).classes('w-64 self-center')
+            upload_progress.set_visibility(False)
         with ui.column().classes('main-block shadow-border'):
             ui.label('Select text style postprocessing')
             transform_radio = ui.radio(['FORMAL', 'INFORMAL', 'OFF'], value='OFF').props('inline')
@@ -260,8 +730,14 @@ async def _save_audio(event_args: UploadEventArguments) -> None:
                         recognizer_area=rec_area,
                         summarized_area=summ_area,
                         radio_value=transform_radio.value,
+                        session_stages=session_stages,
                     )
                 )
+                ui.button(
+                    'Live',
+                    icon='mic',
+                    on_click=_toggle_live,
+                ).bind_enabled_from(sum_btn)
                 ui.button(
                     'Clear',
                     icon='delete',
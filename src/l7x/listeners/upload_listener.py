@@ -0,0 +1,91 @@
+#####################################################################################################
+
+from typing import Final
+
+from fastapi import Header
+from starlette import status
+from starlette.requests import Request
+from starlette.responses import Response
+
+from l7x.app import App
+from l7x.configs.constants import RECONGIZER_MIME_TYPES
+from l7x.utils.upload_utils import UploadException, UploadInfo, parse_upload_checksum, parse_upload_metadata
+
+#####################################################################################################
+
+_TUS_VERSION: Final = '1.0.0'
+_TUS_EXTENSIONS: Final = 'creation,checksum'
+_TUS_CHECKSUM_ALGORITHMS: Final = 'sha256'
+_OFFSET_CONTENT_TYPE: Final = 'application/offset+octet-stream'
+_UPLOADS_PATH: Final = '/api/uploads'
+
+#####################################################################################################
+
+def _create_tus_headers(upload_info: UploadInfo | None = None) -> dict[str, str]:
+    tus_headers: Final = {'Tus-Resumable': _TUS_VERSION, 'Cache-Control': 'no-store'}
+    if upload_info is not None:
+        tus_headers['Upload-Offset'] = str(upload_info.offset)
+        tus_headers['Upload-Length'] = str(upload_info.length)
+    return tus_headers
+
+#####################################################################################################
+
+def upload_listener_registrar(app: App, /) -> None:
+    upload_store: Final = app.upload_store
+    chunk_size_in_byte: Final = app.app_settings.resumable_upload_chunk_size_in_byte
+
+    async def _get_options() -> Response:
+        return Response(status_code=status.HTTP_204_NO_CONTENT, headers={
+            **_create_tus_headers(),
+            'Tus-Version': _TUS_VERSION,
+            'Tus-Extension': _TUS_EXTENSIONS,
+            'Tus-Max-Size': str(upload_store.max_size_in_byte),
+            'Tus-Checksum-Algorithm': _TUS_CHECKSUM_ALGORITHMS,
+            # not a part of tus, the bundled client reads it to size its chunks
+            'L7x-Chunk-Size': str(chunk_size_in_byte),
+        })
+
+    async def _create_upload(
+        request: Request,
+        upload_length: int = Header(...),  # noqa: B008, WPS404
+        upload_metadata: str = Header(''),  # noqa: B008, WPS404
+    ) -> Response:
+        metadata: Final = parse_upload_metadata(upload_metadata)
+        mime_type: Final = metadata.get('filetype', '')
+        if mime_type not in RECONGIZER_MIME_TYPES:
+            raise UploadException('Not supported file type', status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+        upload_info: Final = upload_store.create(length=upload_length, file_name=metadata.get('filename', 'upload'), mime_type=mime_type)
+        return Response(status_code=status.HTTP_201_CREATED, headers={
+            **_create_tus_headers(upload_info),
+            'Location': str(request.url_for('_get_upload_offset', upload_id=upload_info.upload_id)),
+        })
+
+    async def _get_upload_offset(upload_id: str) -> Response:
+        return Response(status_code=status.HTTP_200_OK, headers=_create_tus_headers(upload_store.get_info(upload_id)))
+
+    async def _append_upload_chunk(
+        upload_id: str,
+        request: Request,
+        upload_offset: int = Header(...),  # noqa: B008, WPS404
+        upload_checksum: str = Header(''),  # noqa: B008, WPS404
+        content_type: str = Header(''),  # noqa: B008, WPS404
+    ) -> Response:
+        if content_type != _OFFSET_CONTENT_TYPE:
+            raise UploadException(f'Content-Type must be {_OFFSET_CONTENT_TYPE}', status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+        # the body goes straight from the socket to the file, a chunk is never held in memory as a whole
+        upload_info: Final = await upload_store.append(
+            upload_id,
+            offset=upload_offset,
+            chunks=request.stream(),
+            checksum=parse_upload_checksum(upload_checksum) if upload_checksum else None,
+        )
+        return Response(status_code=status.HTTP_204_NO_CONTENT, headers=_create_tus_headers(upload_info))
+
+    app.options(_UPLOADS_PATH, include_in_schema=False)(_get_options)
+    app.post(_UPLOADS_PATH)(_create_upload)
+    app.head(f'{_UPLOADS_PATH}/{{upload_id}}', name='_get_upload_offset')(_get_upload_offset)
+    app.patch(f'{_UPLOADS_PATH}/{{upload_id}}')(_append_upload_chunk)
+
+#####################################################################################################
@@ -1,6 +1,6 @@
 #####################################################################################################
 
-from collections.abc import Sequence
+from collections.abc import Mapping, Sequence
 from contextlib import ExitStack, closing as _contextlib_closing, suppress
 from gc import DEBUG_UNCOLLECTABLE, collect as _gc_collect, garbage as _gc_garbage, set_debug as _gc_set_debug
 from logging import Logger
@@ -24,6 +24,7 @@
     creator_base_global_cmd_context,
     creator_local_tokens_cmd_context,
 )
+from l7x.configs.constants import RECOGNIZER_LANGS_CATALOG
 from l7x.configs.settings import AppSettings, create_app_settings
 from l7x.types.errors import ShutdownException
 from l7x.utils.cmd_manager_utils import CmdManagerImpl
@@ -35,6 +36,7 @@
     ShutdownEvent,
     create_event_loop,
 )
+from l7x.utils.shared_catalog_utils import SharedCatalogRef, create_shared_catalogs
 from l7x.utils.worker_utils import WorkerDescription, WorkerType, run_workers
 from l7x.web_worker import WebWorkerParams, WorkerParams, run_web_worker
 
@@ -47,6 +49,7 @@ async def _run_worker_processes(
     shutdown_event: ShutdownEvent,
     func_after_all_started: AfterAllStartedFunc | None,
     manager: SyncManager,
+    lang_catalog_refs: Mapping[str, SharedCatalogRef],
     /,
 ) -> None:
     sockets_need_close: list[Sockets] = []
@@ -105,6 +108,10 @@ async def _run_worker_processes(
                 sockets=web_sockets,
                 hypercorn_config=hypercorn_config,
                 cmd_manager=llm_cmd_manager,
+                lang_catalog_refs=lang_catalog_refs,
+                # the first worker polls the upstreams and publishes the language lists, the others only read them;
+                # it is restarted with the same params, so there is always a single publisher
+                is_lang_catalog_publisher=worker_index == 0,
             ),
             worker_type=WorkerType.PROCESS,
         )
@@ -131,7 +138,16 @@ async def _main_loop(mel_params: EventLoopFuncParams[None], /) -> None:
     app_settings: Final = mel_params.app_settings
     logger.info(f'App settings: {app_settings}')
 
-    with _multiprocessing_get_context('spawn').Manager() as manager:
+    with ExitStack() as exit_stack:
+        manager: Final = exit_stack.enter_context(_multiprocessing_get_context('spawn').Manager())
+        lang_catalog_refs: Mapping[str, SharedCatalogRef] = {}
+        if app_settings.lang_catalog_shared:
+            lang_catalog_refs = exit_stack.enter_context(create_shared_catalogs(
+                (RECOGNIZER_LANGS_CATALOG,),
+                capacity_in_byte=app_settings.lang_catalog_capacity_in_byte,
+                persist_dir=app_settings.lang_catalog_dir,
+                logger=logger,
+            ))
         await _run_worker_processes(
             app_settings,
             logger,
@@ -139,6 +155,7 @@ async def _main_loop(mel_params: EventLoopFuncParams[None], /) -> None:
             mel_params.shutdown_event,
             mel_params.func_after_all_started,
             manager,
+            lang_catalog_refs,
         )
 
 #####################################################################################################
@@ -1,18 +1,20 @@
 #####################################################################################################
 
 from abc import ABC, abstractmethod
-from http import HTTPStatus
+from asyncio import gather
+from collections.abc import Sequence
 from logging import Logger
 from typing import Final
-from urllib.parse import urljoin
 
 from aiohttp import ClientSession
 
 from l7x.configs.settings import AppSettings
 from l7x.services.base import BaseService
-from l7x.services.translation_service import JsonPayload
-from l7x.utils.mapping_utils import find_value_by_keys_sequence
-from l7x.utils.orjson_utils import orjson_loads
+from l7x.utils.lang_id_utils import LanguageIdentifier, LanguageProfiles, get_builtin_language_profiles
+from l7x.utils.upstream_request_utils import UpstreamEndpoint
+from l7x.utils.upstream_response_utils import decode_detected_language
+from l7x.utils.upstream_transport_utils import join_upstream_url
+from l7x.utils.upstream_utils import UpstreamError
 
 #####################################################################################################
 
@@ -29,6 +31,12 @@ def __init__(self, aiohttp_client: ClientSession, logger: Logger) -> None:
     async def detect_language(self, *, text: str) -> str:
         raise NotImplementedError()
 
+    #####################################################################################################
+
+    @abstractmethod
+    async def detect_languages(self, *, texts: Sequence[str]) -> tuple[str, ...]:
+        raise NotImplementedError()
+
 #####################################################################################################
 
 class PrivateAutodetectLanguageService(AutodetectLanguageService):
@@ -36,21 +44,62 @@ class PrivateAutodetectLanguageService(AutodetectLanguageService):
 
     def __init__(self, app_settings: AppSettings, aiohttp_client: ClientSession, logger: Logger) -> None:
         super().__init__(aiohttp_client, logger)
-        self._url: Final = urljoin(app_settings.translate_api_url, 'api/detect-language')
+        self._detect_language_endpoint: Final = UpstreamEndpoint(
+            url=join_upstream_url(app_settings.translate_api_url, 'api/detect-language'),
+            aiohttp_client=aiohttp_client,
+            app_settings=app_settings,
+            logger=logger,
+            read_timeout_sec=app_settings.translate_api_read_timeout_sec,
+        )
+        profiles_path: Final = app_settings.lang_id_profiles_path
+        self._language_identifier: Final = LanguageIdentifier(
+            get_builtin_language_profiles() if profiles_path is None else LanguageProfiles.load(profiles_path),
+        )
+        self._min_confidence: Final = app_settings.lang_id_min_confidence
 
     #####################################################################################################
 
     async def detect_language(self, *, text: str) -> str:
+        return (await self.detect_languages(texts=[text]))[0]
+
+    #####################################################################################################
+
+    async def detect_languages(self, *, texts: Sequence[str]) -> tuple[str, ...]:
+        # the texts are cut to a few hundred characters, so the local scoring is cheap enough for the event loop
+        identified_languages: Final = self._language_identifier.identify_many(texts)
+        detected_codes: Final = [
+            '' if identified_language is None else identified_language.code
+            for identified_language in identified_languages
+        ]
+        # only the texts the local model is not sure about go to the upstream
+        uncertain_indexes: Final = [
+            text_index
+            for text_index, identified_language in enumerate(identified_languages)
+            if identified_language is not None and identified_language.confidence < self._min_confidence
+        ]
+        remote_codes: Final = await gather(*[self._detect_language_remote(texts[text_index]) for text_index in uncertain_indexes])
+        for text_index, remote_code in zip(uncertain_indexes, remote_codes, strict=True):
+            # the local guess is still better than nothing when the upstream fails
+            detected_codes[text_index] = remote_code or detected_codes[text_index]
+        return tuple(detected_codes)
+
+    #####################################################################################################
+
+    async def _detect_language_remote(self, text: str) -> str:
         query: Final = {
             'q': text,
         }
 
-        detected_lang_resp: Final = await self._aiohttp_client.post(url=self._url, data=JsonPayload(query))
-        if detected_lang_resp.status != HTTPStatus.OK:
-            self._logger.warning(f'Return invalid status for api/detect-language [{detected_lang_resp.status}]')
+        try:
+            detected_lang_json: Final = await self._detect_language_endpoint.request_json(
+                'POST',
+                json_body=query,
+                hedge=True,
+            )
+        except UpstreamError as err:
+            self._logger.warning(f'Request to api/detect-language failed: {err}')
             return ''
 
-        detected_lang_json: Final = await detected_lang_resp.json(loads=orjson_loads)
-        return find_value_by_keys_sequence(detected_lang_json, 'result', 0, 0, 'language_code', default='', logger=self._logger)
+        return decode_detected_language(detected_lang_json, self._logger)
 
 #####################################################################################################
@@ -1,63 +1,139 @@
 #####################################################################################################
 
 from abc import ABC, abstractmethod
-from collections.abc import Mapping, Sequence
-from http import HTTPStatus
+from collections.abc import Awaitable, Callable, Mapping
 from logging import Logger
-from time import time
 from types import MappingProxyType
-from typing import Final
-from urllib.parse import urljoin
+from typing import Any, Final
 
 from aiohttp import ClientSession
 
-from l7x.configs.constants import TRANSLATE_API_LANGS_CACHE_EXPIRE_WHEN_LIST_EMPTY_SEC
+from l7x.configs.constants import (
+    LANG_CATALOG_PUBLISH_GRACE_SEC,
+    LANGS_CACHE_EXPIRE_JITTER_RATIO,
+    LANGS_CACHE_RETRY_ON_ERROR_SEC,
+    TRANSLATE_API_LANGS_CACHE_EXPIRE_WHEN_LIST_EMPTY_SEC,
+)
 from l7x.configs.settings import AppSettings
 from l7x.services.base import BaseService
-from l7x.types.lang_services import EMPTY_LANGS, LangInfo, LanguageDetail
-from l7x.utils.orjson_utils import orjson_loads
+from l7x.types.lang_services import EMPTY_LANGS, LanguageDetail
+from l7x.utils.shared_catalog_utils import SharedCatalog, SharedCatalogError
+from l7x.utils.ttl_cache_utils import AsyncTtlCache
+from l7x.utils.upstream_request_utils import UpstreamEndpoint
+from l7x.utils.upstream_response_utils import decode_languages
+from l7x.utils.upstream_transport_utils import join_upstream_url
 
 #####################################################################################################
 
-class InvalidRequestError(Exception):
-    def __init__(self, status: int) -> None:
-        super().__init__()
-        self.status: Final = status
+LangOptionsCatalog = SharedCatalog[Mapping[str, LanguageDetail]]
+
+#####################################################################################################
+
+def encode_lang_options(lang_options: Mapping[str, LanguageDetail]) -> dict[str, Any]:
+    return {
+        code_alpha_1: {'code': lang_detail.code, 'rtl': lang_detail.rtl}
+        for code_alpha_1, lang_detail in lang_options.items()
+    }
+
+#####################################################################################################
+
+def decode_lang_options(encoded_lang_options: Mapping[str, Any]) -> Mapping[str, LanguageDetail]:
+    if not encoded_lang_options:
+        return EMPTY_LANGS
+    return MappingProxyType({
+        code_alpha_1: LanguageDetail(code=lang_detail['code'], rtl=lang_detail['rtl'])
+        for code_alpha_1, lang_detail in encoded_lang_options.items()
+    })
+
+#####################################################################################################
+
+def create_lang_options_cache(
+    *,
+    name: str,
+    load: Callable[[], Awaitable[Mapping[str, LanguageDetail]]],
+    expire_sec: float,
+    logger: Logger,
+    shared_catalog: LangOptionsCatalog | None = None,
+) -> AsyncTtlCache[Mapping[str, LanguageDetail]]:
+    async def _load_lang_options() -> Mapping[str, LanguageDetail]:
+        langs_options: Final = await load()
+        if not langs_options:
+            return EMPTY_LANGS
+        if shared_catalog is not None and shared_catalog.is_publisher:
+            # only a good list is published: the other workers and the next cold start keep the last good one
+            try:
+                if shared_catalog.publish(encode_lang_options(langs_options)):
+                    logger.info(f'Shared catalog "{name}" is updated: {len(langs_options)} languages')
+            except (OSError, SharedCatalogError) as err:
+                logger.warning(f'Shared catalog "{name}" is not updated: {err}')
+        return MappingProxyType(langs_options)
+
+    return AsyncTtlCache(
+        name=name,
+        load=_load_lang_options,
+        default=EMPTY_LANGS,
+        # an empty list is most likely a starting upstream, it is asked again soon
+        get_ttl_sec=lambda langs_options: float(expire_sec) if langs_options else TRANSLATE_API_LANGS_CACHE_EXPIRE_WHEN_LIST_EMPTY_SEC,
+        error_ttl_sec=min(float(expire_sec), LANGS_CACHE_RETRY_ON_ERROR_SEC),
+        jitter_ratio=LANGS_CACHE_EXPIRE_JITTER_RATIO,
+        logger=logger,
+    )
+
+#####################################################################################################
+
+async def get_cached_lang_options(
+    lang_options_cache: AsyncTtlCache[Mapping[str, LanguageDetail]],
+    shared_catalog: LangOptionsCatalog | None,
+    logger: Logger,
+) -> Mapping[str, LanguageDetail]:
+    if shared_catalog is None:
+        return await lang_options_cache.get()
+    # the other workers only read the catalog published by one of them, no upstream polling per worker
+    try:
+        lang_options: Final = shared_catalog.read()
+    except SharedCatalogError as err:
+        # a broken catalog must not break the page: this worker asks the upstream itself
+        logger.warning(f'Shared catalog is not read: {err}')
+        return await lang_options_cache.get()
+    if lang_options is None and (shared_catalog.is_publisher or shared_catalog.attached_sec >= LANG_CATALOG_PUBLISH_GRACE_SEC):
+        # nothing published nor persisted yet: the publisher loads it in place like without the catalog,
+        # the other workers do the same once the publisher had its chance, e.g. the upstream is down at the first boot
+        return await lang_options_cache.get()
+    return lang_options or EMPTY_LANGS
 
 #####################################################################################################
 
 class LangsService(BaseService, ABC):
     #####################################################################################################
 
-    def __init__(self, app_settings: AppSettings, aiohttp_client: ClientSession, logger: Logger) -> None:
-        self._translate_api_langs_cache_expire_sec: Final = app_settings.translate_api_langs_cache_expire_sec
+    def __init__(
+        self,
+        app_settings: AppSettings,
+        aiohttp_client: ClientSession,
+        logger: Logger,
+        shared_catalog: LangOptionsCatalog | None = None,
+    ) -> None:
         self._aiohttp_client: Final = aiohttp_client
         self._logger: Final = logger
-        self._langs_options: Mapping[str, LanguageDetail] = EMPTY_LANGS
-        self._next_update_ts = -1.0
+        self._shared_catalog: Final = shared_catalog
+        self._lang_options_cache: Final = create_lang_options_cache(
+            name='translate languages',
+            load=self._get_languages,
+            expire_sec=app_settings.translate_api_langs_cache_expire_sec,
+            logger=logger,
+            shared_catalog=shared_catalog,
+        )
 
     #####################################################################################################
 
     async def get_lang_options(self, /) -> Mapping[str, LanguageDetail]:
-        cur_ts = time()
-        if self._next_update_ts <= cur_ts:
-            self._next_update_ts = cur_ts + float(self._translate_api_langs_cache_expire_sec)
-
-            try:
-                langs_options = await self._get_languages()
-            except InvalidRequestError as exc:
-                self._logger.warning(f'Return invalid status for get-languages: {exc.status}')
-                self._langs_options = EMPTY_LANGS
-                self._next_update_ts = cur_ts + min(self._translate_api_langs_cache_expire_sec, 10)
-                return self._langs_options
+        return await get_cached_lang_options(self._lang_options_cache, self._shared_catalog, self._logger)
 
-            if not langs_options:
-                self._langs_options = EMPTY_LANGS
-                self._next_update_ts = cur_ts + TRANSLATE_API_LANGS_CACHE_EXPIRE_WHEN_LIST_EMPTY_SEC
-            else:
-                self._langs_options = MappingProxyType(langs_options)
+    #####################################################################################################
 
-        return self._langs_options
+    async def refresh_lang_options(self, /) -> None:
+        # called periodically by the publisher worker, the cache decides whether the upstream is asked
+        await self._lang_options_cache.get()
 
     #####################################################################################################
 
@@ -70,23 +146,26 @@ async def _get_languages(self, /) -> Mapping[str, LanguageDetail]:
 class PrivateLangsService(LangsService):
     #####################################################################################################
 
-    def __init__(self, app_settings: AppSettings, aiohttp_client: ClientSession, logger: Logger) -> None:
-        super().__init__(app_settings, aiohttp_client, logger)
-        self._url: Final = urljoin(app_settings.translate_api_url, 'api/get-languages')
+    def __init__(
+        self,
+        app_settings: AppSettings,
+        aiohttp_client: ClientSession,
+        logger: Logger,
+        shared_catalog: LangOptionsCatalog | None = None,
+    ) -> None:
+        super().__init__(app_settings, aiohttp_client, logger, shared_catalog)
+        self._get_languages_endpoint: Final = UpstreamEndpoint(
+            url=join_upstream_url(app_settings.translate_api_url, 'api/get-languages'),
+            aiohttp_client=aiohttp_client,
+            app_settings=app_settings,
+            logger=logger,
+            read_timeout_sec=app_settings.translate_api_read_timeout_sec,
+        )
 
     #####################################################################################################
 
     async def _get_languages(self, /) -> Mapping[str, LanguageDetail]:
-        get_languages_resp = await self._aiohttp_client.get(self._url)
-        if get_languages_resp.status != HTTPStatus.OK:
-            raise InvalidRequestError(status=get_languages_resp.status)
-
-        languages: Sequence[LangInfo] = await get_languages_resp.json(loads=orjson_loads)
-        if not languages:
-            return {}
-        return {
-            lang.get('code_alpha_1'): LanguageDetail(code=lang.get('codeName'), rtl=lang.get('rtl'))
-            for lang in languages
-        }
+        languages_json: Final = await self._get_languages_endpoint.request_json('GET', hedge=True)
+        return decode_languages(languages_json)
 
 #####################################################################################################
@@ -1,63 +1,52 @@
 #####################################################################################################
 
 from abc import ABC, abstractmethod
-from collections.abc import Mapping, Sequence
-from http import HTTPStatus
+from collections.abc import Mapping
 from logging import Logger
-from time import time
-from types import MappingProxyType
 from typing import Final
-from urllib.parse import urljoin
 
 from aiohttp import ClientSession
 
-from l7x.configs.constants import TRANSLATE_API_LANGS_CACHE_EXPIRE_WHEN_LIST_EMPTY_SEC
 from l7x.configs.settings import AppSettings
 from l7x.services.base import BaseService
-from l7x.types.lang_services import EMPTY_LANGS, LangInfo, LanguageDetail
-from l7x.utils.orjson_utils import orjson_loads
-
-#####################################################################################################
-
-class InvalidRequestError(Exception):
-    def __init__(self, status: int) -> None:
-        super().__init__()
-        self.status: Final = status
+from l7x.services.langs_service import LangOptionsCatalog, create_lang_options_cache, get_cached_lang_options
+from l7x.types.lang_services import LanguageDetail
+from l7x.utils.upstream_request_utils import UpstreamEndpoint
+from l7x.utils.upstream_response_utils import decode_languages
+from l7x.utils.upstream_transport_utils import join_upstream_url
 
 #####################################################################################################
 
 class RecognizerLangsService(BaseService, ABC):
     #####################################################################################################
 
-    def __init__(self, app_settings: AppSettings, aiohttp_client: ClientSession, logger: Logger) -> None:
-        self._translate_api_langs_cache_expire_sec: Final = app_settings.recognizer_api_langs_cache_expire_sec
+    def __init__(
+        self,
+        app_settings: AppSettings,
+        aiohttp_client: ClientSession,
+        logger: Logger,
+        shared_catalog: LangOptionsCatalog | None = None,
+    ) -> None:
         self._aiohttp_client: Final = aiohttp_client
         self._logger: Final = logger
-        self._langs_options: Mapping[str, LanguageDetail] = EMPTY_LANGS
-        self._next_update_ts = -1.0
+        self._shared_catalog: Final = shared_catalog
+        self._lang_options_cache: Final = create_lang_options_cache(
+            name='recognizer languages',
+            load=self._get_languages,
+            expire_sec=app_settings.recognizer_api_langs_cache_expire_sec,
+            logger=logger,
+            shared_catalog=shared_catalog,
+        )
 
     #####################################################################################################
 
     async def get_recognizer_lang_options(self, /) -> Mapping[str, LanguageDetail]:
-        cur_ts = time()
-        if self._next_update_ts <= cur_ts:
-            self._next_update_ts = cur_ts + float(self._translate_api_langs_cache_expire_sec)
-
-            try:
-                langs_options = await self._get_languages()
-            except InvalidRequestError as exc:
-                self._logger.warning(f'Return invalid status for get-languages: {exc.status}')
-                self._langs_options = EMPTY_LANGS
-                self._next_update_ts = cur_ts + min(self._translate_api_langs_cache_expire_sec, 10)
-                return self._langs_options
-
-            if not langs_options:
-                self._langs_options = EMPTY_LANGS
-                self._next_update_ts = cur_ts + TRANSLATE_API_LANGS_CACHE_EXPIRE_WHEN_LIST_EMPTY_SEC
-            else:
-                self._langs_options = MappingProxyType(langs_options)
-
-        return self._langs_options
+        return await get_cached_lang_options(self._lang_options_cache, self._shared_catalog, self._logger)
+
+    #####################################################################################################
+
+    async def refresh_lang_options(self, /) -> None:
+        await self._lang_options_cache.get()
 
     #####################################################################################################
 
@@ -70,23 +59,26 @@ async def _get_languages(self, /) -> Mapping[str, LanguageDetail]:
 class PrivateRecognizerLangsService(RecognizerLangsService):
     #####################################################################################################
 
-    def __init__(self, app_settings: AppSettings, aiohttp_client: ClientSession, logger: Logger) -> None:
-        super().__init__(app_settings, aiohttp_client, logger)
-        self._url: Final = urljoin(app_settings.recognizer_api_url , '/get-speech-to-text-languages')
+    def __init__(
+        self,
+        app_settings: AppSettings,
+        aiohttp_client: ClientSession,
+        logger: Logger,
+        shared_catalog: LangOptionsCatalog | None = None,
+    ) -> None:
+        super().__init__(app_settings, aiohttp_client, logger, shared_catalog)
+        self._get_languages_endpoint: Final = UpstreamEndpoint(
+            url=join_upstream_url(app_settings.recognizer_api_url, '/get-speech-to-text-languages'),
+            aiohttp_client=aiohttp_client,
+            app_settings=app_settings,
+            logger=logger,
+            read_timeout_sec=app_settings.recognizer_api_read_timeout_sec,
+        )
 
     #####################################################################################################
 
     async def _get_languages(self, /) -> Mapping[str, LanguageDetail]:
-        get_languages_resp = await self._aiohttp_client.get(self._url)
-        if get_languages_resp.status != HTTPStatus.OK:
-            raise InvalidRequestError(status=get_languages_resp.status)
-
-        languages: Sequence[LangInfo] = await get_languages_resp.json(loads=orjson_loads)
-        if not languages:
-            return {}
-        return {
-            lang.get('code_alpha_1'): LanguageDetail(code=lang.get('codeName'), rtl=lang.get('rtl'))
-            for lang in languages
-        }
+        languages_json: Final = await self._get_languages_endpoint.request_json('GET', hedge=True)
+        return decode_languages(languages_json)
 
 #####################################################################################################
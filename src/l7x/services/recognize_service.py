@@ -1,24 +1,71 @@
 #####################################################################################################
 
 from abc import abstractmethod
-from http import HTTPStatus
+from asyncio import Semaphore, Task, create_task, gather, get_running_loop, wait_for
+from collections.abc import AsyncIterator
+from contextlib import ExitStack
+from dataclasses import dataclass
+from functools import partial
 from logging import Logger
-from typing import Any, Final
-from urllib.parse import urljoin
+from pathlib import Path
+from time import monotonic
+from typing import BinaryIO, Final, TypeAlias
 
-from aiohttp import BytesPayload, ClientSession, FormData
+from aiohttp import ClientSession
+from numpy import ndarray
 
+from l7x.configs.constants import MEDIA_PREPROCESS_MIME_TYPES
 from l7x.configs.settings import AppSettings
 from l7x.services.base import BaseService
-from l7x.utils.orjson_utils import orjson_dumps, orjson_loads
+from l7x.utils.audio_utils import (
+    COMPACT_AUDIO_MIME_TYPE,
+    COMPACT_AUDIO_SUFFIX,
+    AudioDecodeError,
+    AudioSegment,
+    decode_audio_to_pcm_file,
+    encode_wav,
+    find_segments_by_silence,
+    open_pcm_samples,
+    transcode_to_compact_audio,
+)
+from l7x.utils.recognition_cache_utils import RecognitionCache, RecognitionCacheStats, hash_audio_content, make_recognition_cache_key
+from l7x.utils.upstream_request_utils import UpstreamEndpoint, UpstreamStatusError
+from l7x.utils.upstream_response_utils import decode_recognized_text
+from l7x.utils.upstream_transport_utils import UpstreamForm, join_upstream_url
 
 #####################################################################################################
 
-class JsonPayload(BytesPayload):
-    #####################################################################################################
+AudioSource: TypeAlias = bytes | memoryview | Path | BinaryIO
+
+#####################################################################################################
+
+@dataclass(frozen=True, kw_only=True)
+class SegmentRecognition:
+    index: int
+    start_sec: float
+    end_sec: float
+    elapsed_sec: float
+    text: str
+
+#####################################################################################################
+
+@dataclass(frozen=True, kw_only=True)
+class SegmentedRecognition:
+    text: str
+    segments: tuple[SegmentRecognition, ...]
+
+#####################################################################################################
+
+@dataclass(frozen=True, kw_only=True)
+class PreprocessedMedia:
+    file_name: str
+    mime_type: str
+    path: Path
+
+#####################################################################################################
 
-    def __init__(self, value_for_send: Any) -> None:
-        super().__init__(orjson_dumps(value_for_send), content_type='application/json', encoding='utf-8')
+def join_segment_texts(segments: tuple[SegmentRecognition, ...]) -> str:
+    return ' '.join(segment_text for segment in segments if (segment_text := segment.text.strip()))
 
 #####################################################################################################
 
@@ -32,7 +79,15 @@ def __init__(self, aiohttp_client: ClientSession, logger: Logger) -> None:
     #####################################################################################################
 
     @abstractmethod
-    async def recognize(self, *, file_name: str, wav: bytes, language: str, mime_type: str) -> str:
+    async def recognize(
+        self,
+        *,
+        file_name: str,
+        wav: AudioSource,
+        language: str,
+        mime_type: str,
+        content_hash: str | None = None,
+    ) -> str:
         raise NotImplementedError()
 
 #####################################################################################################
@@ -42,30 +97,218 @@ class PrivateRecognizeService(RecognizeService):
 
     def __init__(self, app_settings: AppSettings, aiohttp_client: ClientSession, logger: Logger) -> None:
         super().__init__(aiohttp_client, logger)
-        self._url: Final = urljoin(app_settings.recognizer_api_url, '/speech-to-text')
+        self._recognize_endpoint: Final = UpstreamEndpoint(
+            url=join_upstream_url(app_settings.recognizer_api_url, '/speech-to-text'),
+            aiohttp_client=aiohttp_client,
+            app_settings=app_settings,
+            logger=logger,
+            read_timeout_sec=app_settings.recognizer_api_read_timeout_sec,
+        )
+        # a hedged upload sends the whole file a second time, the recognizer load doubles on slow calls
+        self._hedge_enabled: Final = app_settings.recognizer_api_hedge_enabled
+        self._ffmpeg_path: Final = app_settings.ffmpeg_path
+        self._spool_dir: Final = app_settings.upload_spool_dir
+        self._segment_min_sec: Final = app_settings.recognizer_segment_min_sec
+        self._segment_max_sec: Final = app_settings.recognizer_segment_max_sec
+        self._segment_timeout_sec: Final = app_settings.recognizer_segment_timeout_sec
+        self._parallelism: Final = max(app_settings.recognizer_parallelism, 1)
+        self._media_preprocessing_enabled: Final = app_settings.media_preprocessing_enabled
+        self._media_preprocess_bitrate: Final = app_settings.media_preprocess_bitrate
+        # ffmpeg runs in child processes, the semaphore bounds how many of them one web worker starts
+        self._ffmpeg_semaphore: Final = Semaphore(max(app_settings.media_preprocess_parallelism, 1))
+        # part of the cache key: another recognizer or other options give another text for the same audio
+        self._recognize_options: Final = {'output_native': 'false', 'denoise': 'false'}
+        self._cache_key_options: Final = {**self._recognize_options, 'url': self._recognize_endpoint.url}
+        self._cache: Final = RecognitionCache(
+            logger=logger,
+            max_entries=app_settings.recognizer_cache_max_entries,
+            ttl_sec=app_settings.recognizer_cache_ttl_sec,
+            disk_dir=app_settings.recognizer_cache_dir,
+            disk_max_size_in_byte=app_settings.recognizer_cache_dir_max_size_in_byte,
+        )
 
     #####################################################################################################
 
-    async def recognize(self, *, file_name: str, wav: bytes, language: str | None, mime_type: str = 'audio/wav') -> str:
-        data = FormData()
-        if language is not None:
-            data.add_field('lang', language)
-        data.add_field('output_native', 'false')
-        data.add_field('file', wav, filename=file_name, content_type=mime_type)
-        data.add_field('denoise', 'false')
-
-        recognize_resp = await self._aiohttp_client.post(
-            url=self._url,
-            data=data,
-        )
+    @property
+    def cache_stats(self) -> RecognitionCacheStats:
+        return self._cache.stats
+
+    #####################################################################################################
 
-        if recognize_resp.status == HTTPStatus.OK:
-            recognize_json = await recognize_resp.json(loads=orjson_loads)
-            recognized_text = recognize_json.get('result', '')
-        else:
-            self._logger.warning(f'Return invalid status for /speech-to-text [{recognize_resp.status}]')
-            recognized_text = ''
+    async def recognize(
+        self,
+        *,
+        file_name: str,
+        wav: AudioSource,
+        language: str | None,
+        mime_type: str = 'audio/wav',
+        content_hash: str | None = None,
+    ) -> str:
+        if content_hash is None:
+            if isinstance(wav, Path):
+                content_hash = await get_running_loop().run_in_executor(None, hash_audio_content, wav)
+            else:
+                content_hash = hash_audio_content(wav)
+        cache_key: Final = make_recognition_cache_key(content_hash, language, self._cache_key_options)
 
+        cached_text: Final = await self._cache.get(cache_key)
+        if cached_text is not None:
+            self._logger.debug(f'Recognition cache hit for "{file_name}": {self._cache.stats}')
+            return cached_text
+
+        recognized_text: Final = await self._recognize_uncached(file_name=file_name, wav=wav, language=language, mime_type=mime_type)
+        # an empty text is returned on upstream errors, it must not hide the next successful call
+        if recognized_text:
+            await self._cache.put(cache_key, recognized_text)
         return recognized_text
 
+    #####################################################################################################
+
+    async def _recognize_uncached(self, *, file_name: str, wav: AudioSource, language: str | None, mime_type: str) -> str:
+        # a stream is rewound before every attempt, paths and bytes are simply sent again
+        stream_start_position: Final = None if isinstance(wav, bytes | memoryview | Path) else wav.tell()
+
+        def _create_recognize_form(exit_stack: ExitStack) -> UpstreamForm:
+            if isinstance(wav, Path):
+                file_content = exit_stack.enter_context(wav.open('rb'))
+            else:
+                if stream_start_position is not None:
+                    wav.seek(stream_start_position)
+                file_content = wav
+
+            form_fields = dict(self._recognize_options)
+            if language is not None:
+                form_fields = {'lang': language, **form_fields}
+            return UpstreamForm(
+                fields=form_fields,
+                file_field='file',
+                file_name=file_name,
+                file_content_type=mime_type,
+                file_content=file_content,
+            )
+
+        try:
+            # a shared stream cannot be read by two requests at once, so only paths and bytes are hedged
+            recognize_json: Final = await self._recognize_endpoint.request_json(
+                'POST',
+                create_form=_create_recognize_form,
+                hedge=self._hedge_enabled and stream_start_position is None,
+            )
+        except UpstreamStatusError as err:
+            self._logger.warning(f'Return invalid status for /speech-to-text [{err.status}]')
+            return ''
+
+        return decode_recognized_text(recognize_json, self._logger)
+
+    #####################################################################################################
+
+    async def preprocess_media(self, *, file_name: str, audio_path: Path, mime_type: str) -> PreprocessedMedia | None:
+        if not self._media_preprocessing_enabled or mime_type not in MEDIA_PREPROCESS_MIME_TYPES:
+            return None
+
+        start_ts: Final = monotonic()
+        try:
+            async with self._ffmpeg_semaphore:
+                compact_path: Final = await transcode_to_compact_audio(
+                    audio_path,
+                    ffmpeg_path=self._ffmpeg_path,
+                    spool_dir=self._spool_dir,
+                    bitrate=self._media_preprocess_bitrate,
+                )
+        except (AudioDecodeError, OSError) as err:
+            # the recognizer still accepts the original container, so it is sent as is
+            self._logger.warning(f'Media preprocessing of "{file_name}" failed: {err}')
+            return None
+
+        self._logger.info(
+            f'Media "{file_name}" preprocessed in {monotonic() - start_ts:.3f} sec: '
+            + f'{audio_path.stat().st_size} -> {compact_path.stat().st_size} bytes',
+        )
+        return PreprocessedMedia(
+            file_name=f'{Path(file_name).stem}{COMPACT_AUDIO_SUFFIX}',
+            mime_type=COMPACT_AUDIO_MIME_TYPE,
+            path=compact_path,
+        )
+
+    #####################################################################################################
+
+    async def recognize_segmented(self, *, file_name: str, audio_path: Path, language: str | None) -> SegmentedRecognition:
+        segments: Final = tuple([
+            segment
+            async for segment in self.iter_recognized_segments(file_name=file_name, audio_path=audio_path, language=language)
+        ])
+        return SegmentedRecognition(text=join_segment_texts(segments), segments=segments)
+
+    #####################################################################################################
+
+    async def iter_recognized_segments(
+        self,
+        *,
+        file_name: str,
+        audio_path: Path,
+        language: str | None,
+    ) -> AsyncIterator[SegmentRecognition]:
+        async with self._ffmpeg_semaphore:
+            pcm_path: Final = await decode_audio_to_pcm_file(audio_path, ffmpeg_path=self._ffmpeg_path, spool_dir=self._spool_dir)
+        segment_tasks: Final[list[Task[SegmentRecognition]]] = []
+        try:
+            samples: Final = open_pcm_samples(pcm_path)
+            audio_segments: Final = await get_running_loop().run_in_executor(None, partial(
+                find_segments_by_silence,
+                samples,
+                min_segment_sec=self._segment_min_sec,
+                max_segment_sec=self._segment_max_sec,
+            ))
+            parallelism_semaphore: Final = Semaphore(self._parallelism)
+            segment_tasks.extend(
+                create_task(self._recognize_segment(file_name, samples, audio_segment, language, parallelism_semaphore))
+                for audio_segment in audio_segments
+            )
+            # all segments are recognized in parallel, but given out in the audio order
+            for segment_task in segment_tasks:
+                segment = await segment_task
+                self._logger.info(
+                    f'Segment {segment.index} of "{file_name}" [{segment.start_sec:.2f}-{segment.end_sec:.2f} sec] '
+                    + f'recognized in {segment.elapsed_sec:.3f} sec',
+                )
+                yield segment
+        finally:
+            for segment_task in segment_tasks:
+                segment_task.cancel()
+            await gather(*segment_tasks, return_exceptions=True)
+            pcm_path.unlink(missing_ok=True)
+
+    #####################################################################################################
+
+    async def _recognize_segment(
+        self,
+        file_name: str,
+        samples: ndarray,
+        audio_segment: AudioSegment,
+        language: str | None,
+        parallelism_semaphore: Semaphore,
+    ) -> SegmentRecognition:
+        async with parallelism_semaphore:
+            # encoded inside the semaphore, so only the segments in flight are kept in memory
+            segment_wav: Final = encode_wav(samples[audio_segment.start_sample:audio_segment.end_sample])
+            start_ts: Final = monotonic()
+            segment_text: Final = await wait_for(
+                self.recognize(
+                    file_name=f'{Path(file_name).stem}_{audio_segment.index}.wav',
+                    wav=segment_wav,
+                    language=language,
+                    mime_type='audio/wav',
+                ),
+                timeout=self._segment_timeout_sec,
+            )
+            elapsed_sec: Final = monotonic() - start_ts
+
+        return SegmentRecognition(
+            index=audio_segment.index,
+            start_sec=audio_segment.start_sec,
+            end_sec=audio_segment.end_sec,
+            elapsed_sec=elapsed_sec,
+            text=segment_text,
+        )
+
 #####################################################################################################
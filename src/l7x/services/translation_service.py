@@ -1,25 +1,46 @@
 #####################################################################################################
 
 from abc import ABC, abstractmethod
-from collections.abc import Iterable
+from asyncio import Semaphore, gather
+from collections.abc import Sequence
+from dataclasses import dataclass
 from http import HTTPStatus
 from logging import Logger
-from typing import Any, Final
-from urllib.parse import urljoin
+from time import monotonic
+from typing import Any, Final, TypeAlias
 
-from aiohttp import BytesPayload, ClientSession
+from aiohttp import ClientSession
 
 from l7x.configs.settings import AppSettings
 from l7x.services.base import BaseService
-from l7x.utils.orjson_utils import orjson_dumps, orjson_loads
+from l7x.utils.translation_batch_utils import pack_segments_into_batches, protect_notranslate_spans, restore_notranslate_spans
+from l7x.utils.translation_memory_utils import (
+    TranslationMemory,
+    TranslationMemoryKey,
+    normalize_segment,
+    split_into_sentences,
+    stitch_sentences,
+)
+from l7x.utils.upstream_request_utils import UpstreamEndpoint, UpstreamResponseError, UpstreamStatusError
+from l7x.utils.upstream_response_utils import decode_translated_text
+from l7x.utils.upstream_transport_utils import join_upstream_url
+from l7x.utils.upstream_utils import UpstreamError
 
 #####################################################################################################
 
-class JsonPayload(BytesPayload):
-    #####################################################################################################
+@dataclass(frozen=True, kw_only=True)
+class SegmentTranslation:
+    index: int
+    text: str
+    error: str | None = None
+
+#####################################################################################################
+
+# the translated text or the error of a single segment of a batch
+_SegmentResult: TypeAlias = str | UpstreamError
 
-    def __init__(self, value_for_send: Any) -> None:
-        super().__init__(orjson_dumps(value_for_send), content_type='application/json', encoding='utf-8')
+# an upstream without the bulk api may get it with the next deploy
+_BULK_SUPPORT_RECHECK_SEC: Final = 300.0
 
 #####################################################################################################
 
@@ -36,6 +57,12 @@ def __init__(self, aiohttp_client: ClientSession, logger: Logger) -> None:
     async def translate(self, *, text: str, dest_lang: str, source_lang: str) -> tuple[str, str]:
         raise NotImplementedError()
 
+    #####################################################################################################
+
+    @abstractmethod
+    async def translate_many(self, *, segments: Sequence[str], target_lang: str, source_lang: str) -> tuple[SegmentTranslation, ...]:
+        raise NotImplementedError()
+
 #####################################################################################################
 
 class PrivateTranslationService(TranslationService):
@@ -43,11 +70,40 @@ class PrivateTranslationService(TranslationService):
 
     def __init__(self, app_settings: AppSettings, aiohttp_client: ClientSession, logger: Logger) -> None:
         super().__init__(aiohttp_client, logger)
-        self._url: Final = urljoin(app_settings.translate_api_url, 'api/translate')
+        self._translate_endpoint: Final = UpstreamEndpoint(
+            url=join_upstream_url(app_settings.translate_api_url, 'api/translate'),
+            aiohttp_client=aiohttp_client,
+            app_settings=app_settings,
+            logger=logger,
+            read_timeout_sec=app_settings.translate_api_read_timeout_sec,
+        )
+        self._translate_bulk_endpoint: Final = UpstreamEndpoint(
+            url=join_upstream_url(app_settings.translate_api_url, 'api/translate-bulk'),
+            aiohttp_client=aiohttp_client,
+            app_settings=app_settings,
+            logger=logger,
+            read_timeout_sec=app_settings.translate_api_read_timeout_sec,
+        )
+        self._batch_max_size_in_byte: Final = max(app_settings.translate_api_batch_max_size_in_byte, 1)
+        self._batch_max_segments: Final = max(app_settings.translate_api_batch_max_segments, 1)
+        self._batch_parallelism: Final = max(app_settings.translate_api_batch_parallelism, 1)
+        self._bulk_unsupported_until_ts = 0.0
+        self._translation_memory: Final = TranslationMemory(
+            logger=logger,
+            max_entries=app_settings.translation_memory_max_entries,
+            store_path=app_settings.translation_memory_store_path,
+            store_max_entries=app_settings.translation_memory_store_max_entries,
+        ) if app_settings.translation_memory_enabled else None
 
     #####################################################################################################
 
     async def translate(self, *, text: str, target_lang: str, source_lang: str) -> str:
+        if self._translation_memory is not None:
+            segment_translation: Final = (await self.translate_many(segments=[text], target_lang=target_lang, source_lang=source_lang))[0]
+            if segment_translation.error is not None:
+                self._logger.warning(f'Translation failed: {segment_translation.error}')
+            return segment_translation.text
+
         payload: Final = {
             'translateMode': 'text',
             'q': text,
@@ -57,20 +113,197 @@ async def translate(self, *, text: str, target_lang: str, source_lang: str) -> s
         if source_lang:
             payload['source'] = source_lang
 
-        translate_resp = await self._aiohttp_client.post(
-            url=self._url,
-            data=JsonPayload(payload),
+        try:
+            translate_json: Final = await self._translate_endpoint.request_json(
+                'POST',
+                json_body=payload,
+                hedge=True,
+            )
+        except UpstreamError as err:
+            self._logger.warning(f'Request to api/translate failed: {err}')
+            return ''
+
+        # detected_source = translate_json.get('detectedSourceLanguage', '')
+        return decode_translated_text(translate_json, self._logger)
+
+    #####################################################################################################
+
+    async def translate_many(self, *, segments: Sequence[str], target_lang: str, source_lang: str) -> tuple[SegmentTranslation, ...]:
+        translation_memory: Final = self._translation_memory
+        if translation_memory is None:
+            return await self._translate_segments(segments, target_lang=target_lang, source_lang=source_lang)
+
+        # every segment is split into sentences, only the sentences the memory does not know go to the upstream
+        segment_sentences: Final = tuple(split_into_sentences(segment) for segment in segments)
+        sentence_keys: Final[dict[TranslationMemoryKey, str]] = {}
+        for sentences in segment_sentences:
+            for sentence in sentences:
+                sentence_keys.setdefault((source_lang, target_lang, normalize_segment(sentence.text)), sentence.text)
+        remembered: Final = await translation_memory.get_many(tuple(sentence_keys))
+
+        missed_keys: Final = tuple(key for key in sentence_keys if key not in remembered)
+        fresh_translations: Final = await self._translate_segments(
+            [sentence_keys[key] for key in missed_keys],
+            target_lang=target_lang,
+            source_lang=source_lang,
         )
+        fresh: Final = {
+            key: fresh_translation
+            for key, fresh_translation in zip(missed_keys, fresh_translations, strict=True)
+        }
+        await translation_memory.put_many({
+            key: fresh_translation.text
+            for key, fresh_translation in fresh.items()
+            if fresh_translation.error is None and fresh_translation.text and key[2]
+        })
+        self._logger.debug(
+            f'Translation memory: {len(remembered)} of {len(sentence_keys)} sentences remembered, {translation_memory.stats}',
+        )
+
+        translations: Final[list[SegmentTranslation]] = []
+        for segment_index, sentences in enumerate(segment_sentences):
+            translated_texts: list[str] = []
+            segment_error: str | None = None
+            for sentence in sentences:
+                key = (source_lang, target_lang, normalize_segment(sentence.text))
+                if key in remembered:
+                    translated_texts.append(remembered[key])
+                    continue
+                fresh_translation = fresh[key]
+                segment_error = segment_error or fresh_translation.error
+                translated_texts.append(fresh_translation.text)
+            if segment_error is not None:
+                # a half translated segment is not returned, the same way as a failed single request
+                translations.append(SegmentTranslation(index=segment_index, text='', error=segment_error))
+                continue
+            translations.append(SegmentTranslation(index=segment_index, text=stitch_sentences(sentences, translated_texts)))
+        return tuple(translations)
+
+    #####################################################################################################
+
+    async def _translate_segments(
+        self,
+        segments: Sequence[str],
+        *,
+        target_lang: str,
+        source_lang: str,
+    ) -> tuple[SegmentTranslation, ...]:
+        # [@...@] spans are swapped for placeholders, so the upstream can not translate them
+        protected_segments: Final = tuple(protect_notranslate_spans(segment) for segment in segments)
+        segment_indexes: Final = tuple(
+            segment_index
+            for segment_index, protected_segment in enumerate(protected_segments)
+            if protected_segment.text.strip()
+        )
+        batches: Final = pack_segments_into_batches(
+            [len(protected_segments[segment_index].text.encode('utf-8')) for segment_index in segment_indexes],
+            max_batch_size=self._batch_max_size_in_byte,
+            max_batch_segments=self._batch_max_segments,
+        )
+        parallelism_semaphore: Final = Semaphore(self._batch_parallelism)
+        batch_results: Final = await gather(*[
+            self._translate_batch(
+                [protected_segments[segment_indexes[batch_index]].text for batch_index in batch],
+                target_lang=target_lang,
+                source_lang=source_lang,
+                parallelism_semaphore=parallelism_semaphore,
+            )
+            for batch in batches
+        ])
+
+        segment_results: Final[dict[int, _SegmentResult]] = {}
+        for batch, batch_result in zip(batches, batch_results, strict=True):
+            for batch_index, segment_result in zip(batch, batch_result, strict=True):
+                segment_results[segment_indexes[batch_index]] = segment_result
 
-        if translate_resp.status == HTTPStatus.OK:
-            translate_json = await translate_resp.json(loads=orjson_loads)
-            translated_text = translate_json.get('translatedText', '')
-            # detected_source = translate_json.get('detectedSourceLanguage', '')
-        else:
-            self._logger.warning(f'Return invalid status for api/translate [{translate_resp.status}]')
-            translated_text = ''
-            # detected_source = ''
+        translations: Final[list[SegmentTranslation]] = []
+        for segment_index, segment in enumerate(segments):
+            segment_result = segment_results.get(segment_index, segment)
+            if isinstance(segment_result, UpstreamError):
+                translations.append(SegmentTranslation(index=segment_index, text='', error=str(segment_result)))
+                continue
+            restored_text = restore_notranslate_spans(segment_result, protected_segments[segment_index].notranslate_spans)
+            if restored_text is None:
+                translations.append(SegmentTranslation(index=segment_index, text='', error='Upstream lost a no-translate span'))
+                continue
+            translations.append(SegmentTranslation(index=segment_index, text=restored_text))
+        return tuple(translations)
+
+    #####################################################################################################
+
+    async def _translate_batch(
+        self,
+        texts: Sequence[str],
+        *,
+        target_lang: str,
+        source_lang: str,
+        parallelism_semaphore: Semaphore,
+    ) -> Sequence[_SegmentResult]:
+        if monotonic() >= self._bulk_unsupported_until_ts:
+            async with parallelism_semaphore:
+                try:
+                    return await self._translate_bulk(texts, target_lang=target_lang, source_lang=source_lang)
+                except UpstreamStatusError as err:
+                    if err.status != HTTPStatus.NOT_FOUND:
+                        self._logger.warning(f'Request to api/translate-bulk failed: {err}')
+                        return [err] * len(texts)
+                    # an upstream without the bulk api: the segments go one by one for a while
+                    self._logger.warning('Upstream has no api/translate-bulk, segments are translated one by one')
+                    self._bulk_unsupported_until_ts = monotonic() + _BULK_SUPPORT_RECHECK_SEC
+                except UpstreamError as err:
+                    self._logger.warning(f'Request to api/translate-bulk failed: {err}')
+                    return [err] * len(texts)
+
+        async def _translate_single_bounded(text: str) -> _SegmentResult:
+            async with parallelism_semaphore:
+                return await self._translate_single(text, target_lang=target_lang, source_lang=source_lang)
+
+        # the semaphore is not held here: each single request takes its own slot
+        return await gather(*[_translate_single_bounded(text) for text in texts])
+
+    #####################################################################################################
+
+    async def _translate_bulk(self, texts: Sequence[str], *, target_lang: str, source_lang: str) -> Sequence[_SegmentResult]:
+        payload: Final[dict[str, Any]] = {
+            'translateMode': 'text',
+            'q': list(texts),
+            'target': target_lang,
+        }
+        if source_lang:
+            payload['source'] = source_lang
+
+        translate_json: Final = await self._translate_bulk_endpoint.request_json('POST', json_body=payload)
+        translations: Final = translate_json.get('translations') if isinstance(translate_json, dict) else None
+        if not isinstance(translations, list) or len(translations) != len(texts):
+            raise UpstreamResponseError(f'Upstream "{self._translate_bulk_endpoint.url}" returned translations not matching the segments')
+        return [_decode_bulk_translation(translation) for translation in translations]
+
+    #####################################################################################################
+
+    async def _translate_single(self, text: str, *, target_lang: str, source_lang: str) -> _SegmentResult:
+        payload: Final = {
+            'translateMode': 'text',
+            'q': text,
+            'target': target_lang,
+        }
+        if source_lang:
+            payload['source'] = source_lang
+
+        try:
+            translate_json: Final = await self._translate_endpoint.request_json('POST', json_body=payload, hedge=True)
+        except UpstreamError as err:
+            return err
+        return decode_translated_text(translate_json, self._logger)
+
+#####################################################################################################
 
+def _decode_bulk_translation(translation: Any) -> _SegmentResult:
+    # a broken item fails its own segment only, the rest of the batch is kept
+    if not isinstance(translation, dict):
+        return UpstreamResponseError(f'Segment translation is not an object: {translation!r}')
+    translated_text: Final = translation.get('translatedText')
+    if isinstance(translated_text, str):
         return translated_text
+    return UpstreamResponseError(f'Segment is not translated: {translation.get("error", "unknown error")}')
 
 #####################################################################################################
@@ -1,24 +1,325 @@
 #####################################################################################################
 
 from asyncio import get_event_loop
+from bisect import bisect_left
+from collections.abc import Mapping
+from dataclasses import asdict, dataclass, replace
 from ssl import create_default_context as _create_default_ssl_context
+from time import monotonic
+from types import SimpleNamespace
+from typing import Any, Final
+from urllib.parse import urlsplit
 
-from aiohttp import ClientSession, TCPConnector
+from aiohttp import (
+    BytesPayload,
+    ClientSession,
+    TCPConnector,
+    TraceConfig,
+    TraceConnectionCreateEndParams,
+    TraceConnectionCreateStartParams,
+    TraceConnectionQueuedEndParams,
+    TraceConnectionQueuedStartParams,
+    TraceConnectionReuseconnParams,
+    TraceDnsResolveHostEndParams,
+    TraceDnsResolveHostStartParams,
+    TraceRequestEndParams,
+    TraceRequestExceptionParams,
+    TraceRequestStartParams,
+)
 from certifi import where as _certifi_where
 
-from l7x.utils.orjson_utils import orjson_dumps_to_str
+from l7x.configs.settings import AppSettings
+from l7x.utils.compression_utils import CompressionSettings, compress_body
+from l7x.utils.orjson_utils import orjson_dumps, orjson_dumps_to_str
 
 #####################################################################################################
 
-def create_aiohttp_client() -> ClientSession:
+# upper bounds of the histogram buckets, the last bucket takes everything slower
+_LATENCY_BUCKETS_SEC: Final = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0,
+)
+_LATENCY_PERCENTILES: Final = (50, 95, 99)
+
+#####################################################################################################
+
+@dataclass(frozen=True, kw_only=True)
+class ConnectionPoolSettings:
+    limit: int
+    limit_per_host: int
+    keepalive_timeout_sec: float
+    dns_ttl_sec: int
+    force_close: bool
+
+    #####################################################################################################
+
+    @classmethod
+    def from_settings(cls, app_settings: AppSettings) -> 'ConnectionPoolSettings':
+        return cls(
+            limit=app_settings.upstream_pool_limit,
+            limit_per_host=app_settings.upstream_pool_limit_per_host,
+            keepalive_timeout_sec=app_settings.upstream_pool_keepalive_timeout_sec,
+            dns_ttl_sec=app_settings.upstream_pool_dns_ttl_sec,
+            force_close=app_settings.upstream_pool_force_close,
+        )
+
+    #####################################################################################################
+
+    def with_overrides(self, overrides: Mapping[str, Any]) -> 'ConnectionPoolSettings':
+        return replace(self, **overrides)
+
+#####################################################################################################
+
+class JsonPayload(BytesPayload):
+    #####################################################################################################
+
+    def __init__(self, value_for_send: Any, compression_settings: CompressionSettings | None = None) -> None:
+        body = orjson_dumps(value_for_send)
+        content_encoding = None
+        if compression_settings is not None:
+            body, content_encoding = compress_body(body, compression_settings)
+        super().__init__(
+            body,
+            content_type='application/json',
+            encoding='utf-8',
+            headers=None if content_encoding is None else {'Content-Encoding': content_encoding},
+        )
+
+#####################################################################################################
+
+class LatencyHistogram:
+    #####################################################################################################
+
+    def __init__(self) -> None:
+        self._bucket_counts: Final = [0] * (len(_LATENCY_BUCKETS_SEC) + 1)
+        self._count = 0
+        self._sum_sec = 0.0
+        self._max_sec = 0.0
+
+    #####################################################################################################
+
+    def record(self, latency_sec: float) -> None:
+        self._bucket_counts[bisect_left(_LATENCY_BUCKETS_SEC, latency_sec)] += 1
+        self._count += 1
+        self._sum_sec += latency_sec
+        self._max_sec = max(self._max_sec, latency_sec)
+
+    #####################################################################################################
+
+    def get_percentile_sec(self, percentile: float) -> float:
+        # upper bound of the bucket that holds the percentile, precise enough to size a pool
+        rank: Final = self._count * percentile / 100
+        seen_count = 0
+        for bucket_index, bucket_count in enumerate(self._bucket_counts):
+            seen_count += bucket_count
+            if bucket_count and seen_count >= rank:
+                return _LATENCY_BUCKETS_SEC[bucket_index] if bucket_index < len(_LATENCY_BUCKETS_SEC) else self._max_sec
+        return 0.0
+
+    #####################################################################################################
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'count': self._count,
+            'avg_sec': self._sum_sec / self._count if self._count else 0.0,
+            'max_sec': self._max_sec,
+            **{f'p{percentile}_sec': self.get_percentile_sec(percentile) for percentile in _LATENCY_PERCENTILES},
+            'buckets': {
+                **{f'le_{bucket_sec}': bucket_count for bucket_sec, bucket_count in zip(_LATENCY_BUCKETS_SEC, self._bucket_counts)},
+                'le_inf': self._bucket_counts[-1],
+            },
+        }
+
+#####################################################################################################
+
+class _EndpointMetrics:
+    #####################################################################################################
+
+    def __init__(self) -> None:
+        self.requests_count = 0
+        self.errors_count = 0
+        self.connections_created_count = 0
+        self.connections_reused_count = 0
+        self.histograms: Final[dict[str, LatencyHistogram]] = {}
+
+    #####################################################################################################
+
+    def record(self, phase: str, latency_sec: float) -> None:
+        histogram = self.histograms.get(phase)
+        if histogram is None:
+            histogram = LatencyHistogram()
+            self.histograms[phase] = histogram
+        histogram.record(latency_sec)
+
+    #####################################################################################################
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'requests': self.requests_count,
+            'errors': self.errors_count,
+            'connections_created': self.connections_created_count,
+            'connections_reused': self.connections_reused_count,
+            **{f'{phase}_latency': histogram.to_dict() for phase, histogram in sorted(self.histograms.items())},
+        }
+
+#####################################################################################################
+
+class ConnectionMetrics:
+    #####################################################################################################
+
+    def __init__(self) -> None:
+        self._endpoints: Final[dict[str, _EndpointMetrics]] = {}
+        self._pools: Final[dict[str, ConnectionPoolSettings]] = {}
+
+    #####################################################################################################
+
+    def create_trace_config(self) -> TraceConfig:
+        # phases: pool_wait -> dns -> connect -> ttfb (request start to response headers),
+        # total (request start to the body read) is recorded by UpstreamEndpoint, aiohttp has no hook for the release
+        trace_config: Final = TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_connection_queued_start.append(self._on_connection_queued_start)
+        trace_config.on_connection_queued_end.append(self._on_connection_queued_end)
+        trace_config.on_dns_resolvehost_start.append(self._on_dns_resolvehost_start)
+        trace_config.on_dns_resolvehost_end.append(self._on_dns_resolvehost_end)
+        trace_config.on_connection_create_start.append(self._on_connection_create_start)
+        trace_config.on_connection_create_end.append(self._on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reuseconn)
+        trace_config.on_request_end.append(self._on_request_end)
+        trace_config.on_request_exception.append(self._on_request_exception)
+        return trace_config
+
+    #####################################################################################################
+
+    def register_pool(self, pool_name: str, pool_settings: ConnectionPoolSettings) -> None:
+        self._pools[pool_name] = pool_settings
+
+    #####################################################################################################
+
+    def record(self, endpoint_name: str, phase: str, latency_sec: float) -> None:
+        self._get_endpoint(endpoint_name).record(phase, latency_sec)
+
+    #####################################################################################################
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'pools': {pool_name: asdict(pool_settings) for pool_name, pool_settings in sorted(self._pools.items())},
+            'endpoints': {endpoint_name: endpoint.to_dict() for endpoint_name, endpoint in sorted(self._endpoints.items())},
+        }
+
+    #####################################################################################################
+
+    def _get_endpoint(self, endpoint_name: str) -> _EndpointMetrics:
+        endpoint = self._endpoints.get(endpoint_name)
+        if endpoint is None:
+            endpoint = _EndpointMetrics()
+            self._endpoints[endpoint_name] = endpoint
+        return endpoint
+
+    #####################################################################################################
+
+    async def _on_request_start(self, _: ClientSession, trace_ctx: SimpleNamespace, params: TraceRequestStartParams) -> None:
+        trace_ctx.endpoint = self._get_endpoint(get_endpoint_name(params.method, str(params.url)))
+        trace_ctx.endpoint.requests_count += 1
+        trace_ctx.request_start_ts = monotonic()
+
+    #####################################################################################################
+
+    async def _on_connection_queued_start(self, _: ClientSession, trace_ctx: SimpleNamespace, __: TraceConnectionQueuedStartParams) -> None:
+        trace_ctx.queued_start_ts = monotonic()
+
+    #####################################################################################################
+
+    async def _on_connection_queued_end(self, _: ClientSession, trace_ctx: SimpleNamespace, __: TraceConnectionQueuedEndParams) -> None:
+        trace_ctx.endpoint.record('pool_wait', monotonic() - trace_ctx.queued_start_ts)
+
+    #####################################################################################################
+
+    async def _on_dns_resolvehost_start(self, _: ClientSession, trace_ctx: SimpleNamespace, __: TraceDnsResolveHostStartParams) -> None:
+        trace_ctx.dns_start_ts = monotonic()
+
+    #####################################################################################################
+
+    async def _on_dns_resolvehost_end(self, _: ClientSession, trace_ctx: SimpleNamespace, __: TraceDnsResolveHostEndParams) -> None:
+        trace_ctx.endpoint.record('dns', monotonic() - trace_ctx.dns_start_ts)
+
+    #####################################################################################################
+
+    async def _on_connection_create_start(self, _: ClientSession, trace_ctx: SimpleNamespace, __: TraceConnectionCreateStartParams) -> None:
+        # dns resolving happens inside, so connect includes it
+        trace_ctx.connect_start_ts = monotonic()
+
+    #####################################################################################################
+
+    async def _on_connection_create_end(self, _: ClientSession, trace_ctx: SimpleNamespace, __: TraceConnectionCreateEndParams) -> None:
+        trace_ctx.endpoint.connections_created_count += 1
+        trace_ctx.endpoint.record('connect', monotonic() - trace_ctx.connect_start_ts)
+
+    #####################################################################################################
+
+    async def _on_connection_reuseconn(self, _: ClientSession, trace_ctx: SimpleNamespace, __: TraceConnectionReuseconnParams) -> None:
+        trace_ctx.endpoint.connections_reused_count += 1
+
+    #####################################################################################################
+
+    async def _on_request_end(self, _: ClientSession, trace_ctx: SimpleNamespace, __: TraceRequestEndParams) -> None:
+        trace_ctx.endpoint.record('ttfb', monotonic() - trace_ctx.request_start_ts)
+
+    #####################################################################################################
+
+    async def _on_request_exception(self, _: ClientSession, trace_ctx: SimpleNamespace, __: TraceRequestExceptionParams) -> None:
+        trace_ctx.endpoint.errors_count += 1
+
+#####################################################################################################
+
+_connection_metrics: Final = ConnectionMetrics()
+_host_aiohttp_clients: Final[dict[str, ClientSession]] = {}
+
+#####################################################################################################
+
+def get_connection_metrics() -> ConnectionMetrics:
+    return _connection_metrics
+
+#####################################################################################################
+
+def get_endpoint_name(method: str, url: str) -> str:
+    url_parts: Final = urlsplit(url)
+    return f'{method.upper()} {url_parts.scheme}://{url_parts.netloc}{url_parts.path}'
+
+#####################################################################################################
+
+def create_aiohttp_client(pool_settings: ConnectionPoolSettings, pool_name: str = 'default') -> ClientSession:
+    _connection_metrics.register_pool(pool_name, pool_settings)
     return ClientSession(
         connector=TCPConnector(
             loop=get_event_loop(),
             ssl=_create_default_ssl_context(
                 cafile=_certifi_where(),  # cspell:disable-line
             ),
+            limit=pool_settings.limit,
+            limit_per_host=pool_settings.limit_per_host,
+            # force_close and keepalive_timeout are mutually exclusive in aiohttp
+            keepalive_timeout=None if pool_settings.force_close else pool_settings.keepalive_timeout_sec,
+            force_close=pool_settings.force_close,
+            ttl_dns_cache=pool_settings.dns_ttl_sec,
         ),
         json_serialize=orjson_dumps_to_str,
+        trace_configs=[_connection_metrics.create_trace_config()],
     )
 
 #####################################################################################################
+
+def get_host_aiohttp_client(url: str, default_client: ClientSession, app_settings: AppSettings) -> ClientSession:
+    url_parts: Final = urlsplit(url)
+    pool_overrides: Final = app_settings.upstream_pools.get(url_parts.netloc)
+    if not pool_overrides:
+        return default_client
+
+    # a host with its own pool settings gets its own connector, so it can not starve the other upstreams
+    host_client = _host_aiohttp_clients.get(url_parts.netloc)
+    if host_client is None:
+        pool_settings: Final = ConnectionPoolSettings.from_settings(app_settings).with_overrides(pool_overrides)
+        host_client = create_aiohttp_client(pool_settings, pool_name=url_parts.netloc)
+        _host_aiohttp_clients[url_parts.netloc] = host_client
+    return host_client
+
+#####################################################################################################
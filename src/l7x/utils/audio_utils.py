@@ -0,0 +1,253 @@
+#####################################################################################################
+
+from asyncio import create_subprocess_exec
+from asyncio.subprocess import DEVNULL, PIPE
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import Final
+from wave import open as _wave_open
+
+from numpy import argmin, concatenate, convolve, diff, float32, int16, median, memmap, ndarray, ones, percentile, sqrt, zeros
+
+#####################################################################################################
+
+PCM_SAMPLE_RATE: Final = 16000
+COMPACT_AUDIO_MIME_TYPE: Final = 'audio/ogg'
+COMPACT_AUDIO_SUFFIX: Final = '.ogg'
+_PCM_SAMPLE_WIDTH_IN_BYTE: Final = 2
+
+_VAD_FRAME_MS: Final = 30
+_VAD_FRAMES_BLOCK_SIZE: Final = 16384
+_VAD_MIN_SILENCE_MS: Final = 300
+_VAD_NOISE_FLOOR_PERCENTILE: Final = 10
+_VAD_NOISE_FLOOR_RATIO: Final = 2.0
+# a pause is well below the typical level: with few pauses the percentile above is speech itself
+_VAD_SPEECH_LEVEL_RATIO: Final = 0.25
+_VAD_MIN_RMS: Final = 64.0
+_VAD_MIN_SEGMENT_FRAMES: Final = 2
+
+#####################################################################################################
+
+class AudioDecodeError(RuntimeError):
+    """Raise when ffmpeg cannot decode the audio."""
+
+#####################################################################################################
+
+@dataclass(frozen=True, kw_only=True)
+class AudioSegment:
+    index: int
+    start_sample: int
+    end_sample: int
+
+    #####################################################################################################
+
+    @property
+    def start_sec(self) -> float:
+        return self.start_sample / PCM_SAMPLE_RATE
+
+    #####################################################################################################
+
+    @property
+    def end_sec(self) -> float:
+        return self.end_sample / PCM_SAMPLE_RATE
+
+#####################################################################################################
+
+def _create_temp_path(spool_dir: Path | None, suffix: str) -> Path:
+    with NamedTemporaryFile(mode='wb', dir=spool_dir, suffix=suffix, delete=False) as temp_file:
+        return Path(temp_file.name)
+
+#####################################################################################################
+
+async def _run_ffmpeg(ffmpeg_path: str, source_path: Path, target_path: Path, *output_args: str) -> None:
+    ffmpeg_proc: Final = await create_subprocess_exec(
+        ffmpeg_path,
+        '-nostdin',
+        '-v', 'error',
+        '-y',
+        '-i', str(source_path),
+        *output_args,
+        str(target_path),
+        stdin=DEVNULL,
+        stdout=DEVNULL,
+        stderr=PIPE,
+    )
+    _, ffmpeg_stderr = await ffmpeg_proc.communicate()
+    if ffmpeg_proc.returncode != 0:
+        target_path.unlink(missing_ok=True)
+        raise AudioDecodeError(ffmpeg_stderr.decode('utf-8', errors='replace').strip())
+
+#####################################################################################################
+
+async def decode_audio_to_pcm_file(source_path: Path, *, ffmpeg_path: str, spool_dir: Path | None) -> Path:
+    pcm_path: Final = _create_temp_path(spool_dir, '.pcm')
+    await _run_ffmpeg(
+        ffmpeg_path,
+        source_path,
+        pcm_path,
+        '-vn',
+        '-f', 's16le',
+        '-acodec', 'pcm_s16le',
+        '-ac', '1',
+        '-ar', str(PCM_SAMPLE_RATE),
+    )
+    return pcm_path
+
+#####################################################################################################
+
+async def transcode_to_compact_audio(source_path: Path, *, ffmpeg_path: str, spool_dir: Path | None, bitrate: str) -> Path:
+    compact_path: Final = _create_temp_path(spool_dir, COMPACT_AUDIO_SUFFIX)
+    # drop video and extra channels, speech recognition needs only mono 16 kHz
+    await _run_ffmpeg(
+        ffmpeg_path,
+        source_path,
+        compact_path,
+        '-vn',
+        '-sn',
+        '-dn',
+        '-ac', '1',
+        '-ar', str(PCM_SAMPLE_RATE),
+        '-c:a', 'libopus',
+        '-b:a', bitrate,
+        '-application', 'voip',
+        '-f', 'ogg',
+    )
+    return compact_path
+
+#####################################################################################################
+
+def open_pcm_samples(pcm_path: Path) -> ndarray:
+    if pcm_path.stat().st_size < _PCM_SAMPLE_WIDTH_IN_BYTE:
+        return zeros(0, dtype=int16)
+    # memory mapped, so only the parts that are read get paged in
+    return memmap(pcm_path, dtype=int16, mode='r')
+
+#####################################################################################################
+
+def _calc_frames_rms(samples: ndarray, frame_size: int) -> ndarray:
+    frames_count: Final = len(samples) // frame_size
+    frames_rms: Final = zeros(frames_count, dtype=float32)
+    for block_start in range(0, frames_count, _VAD_FRAMES_BLOCK_SIZE):
+        block_end = min(block_start + _VAD_FRAMES_BLOCK_SIZE, frames_count)
+        block = samples[block_start * frame_size:block_end * frame_size].astype(float32).reshape(-1, frame_size)
+        frames_rms[block_start:block_end] = sqrt((block * block).mean(axis=1))
+    return frames_rms
+
+#####################################################################################################
+
+def find_segments_by_silence(
+    samples: ndarray,
+    *,
+    min_segment_sec: float,
+    max_segment_sec: float,
+    sample_rate: int = PCM_SAMPLE_RATE,
+) -> tuple[AudioSegment, ...]:
+    samples_count: Final = len(samples)
+    if samples_count == 0:
+        return ()
+    frame_size: Final = sample_rate * _VAD_FRAME_MS // 1000
+    # a cut needs at least one frame to search in after the minimal segment
+    max_segment_frames: Final = max(int(max_segment_sec * 1000) // _VAD_FRAME_MS, _VAD_MIN_SEGMENT_FRAMES)
+    min_segment_frames: Final = min(int(min_segment_sec * 1000) // _VAD_FRAME_MS, max_segment_frames - 1)
+
+    frames_rms: Final = _calc_frames_rms(samples, frame_size)
+    frames_count: Final = len(frames_rms)
+    if frames_count <= max_segment_frames:
+        return (AudioSegment(index=0, start_sample=0, end_sample=samples_count),)
+
+    # moving average over the minimal pause length, its minimum is the middle of the quietest pause
+    silence_window: Final = max(_VAD_MIN_SILENCE_MS // _VAD_FRAME_MS, 1)
+    smoothed_rms: Final = convolve(frames_rms, ones(silence_window, dtype=float32) / silence_window, mode='same')
+
+    # the floor is taken over the smoothed level: short gaps between words do not pull it down
+    noise_floor: Final = float(percentile(smoothed_rms, _VAD_NOISE_FLOOR_PERCENTILE))
+    speech_level: Final = float(median(smoothed_rms))
+    silence_threshold: Final = min(max(noise_floor * _VAD_NOISE_FLOOR_RATIO, _VAD_MIN_RMS), speech_level * _VAD_SPEECH_LEVEL_RATIO)
+
+    segments: list[AudioSegment] = []
+    start_frame = 0
+    while frames_count - start_frame > max_segment_frames:
+        search_from = start_frame + max(min_segment_frames, 1)
+        search_to = start_frame + max_segment_frames
+        search_window = smoothed_rms[search_from:search_to]
+        silent_frames = (search_window < silence_threshold).nonzero()[0]
+        if 0 < len(silent_frames) < len(search_window):
+            # prefer the latest real pause to keep segments long, cut at its quietest point
+            pause_breaks = (diff(silent_frames) != 1).nonzero()[0]
+            pause_start = int(silent_frames[pause_breaks[-1] + 1]) if len(pause_breaks) else int(silent_frames[0])
+            pause_end = int(silent_frames[-1]) + 1
+            cut_offset = pause_start + int(argmin(search_window[pause_start:pause_end]))
+        else:
+            # no pause or the whole window is quiet: the threshold tells nothing, cut at the quietest point
+            cut_offset = int(argmin(search_window))
+        cut_frame = search_from + cut_offset
+        segments.append(AudioSegment(index=len(segments), start_sample=start_frame * frame_size, end_sample=cut_frame * frame_size))
+        start_frame = cut_frame
+
+    segments.append(AudioSegment(index=len(segments), start_sample=start_frame * frame_size, end_sample=samples_count))
+    return tuple(segments)
+
+#####################################################################################################
+
+def encode_wav(samples: ndarray, sample_rate: int = PCM_SAMPLE_RATE) -> bytes:
+    wav_buffer: Final = BytesIO()
+    with _wave_open(wav_buffer, 'wb') as wav_writer:
+        wav_writer.setnchannels(1)
+        wav_writer.setsampwidth(_PCM_SAMPLE_WIDTH_IN_BYTE)
+        wav_writer.setframerate(sample_rate)
+        wav_writer.writeframes(samples.astype(int16, copy=False).tobytes())
+    return wav_buffer.getvalue()
+
+#####################################################################################################
+
+class LiveAudioBuffer:
+    #####################################################################################################
+
+    def __init__(self, *, min_segment_sec: float, max_segment_sec: float, sample_rate: int = PCM_SAMPLE_RATE) -> None:
+        self._min_segment_sec: Final = min_segment_sec
+        self._max_segment_sec: Final = max_segment_sec
+        self._sample_rate: Final = sample_rate
+        self._max_segment_samples: Final = int(max_segment_sec * sample_rate)
+        self._chunks: list[ndarray] = []
+        self._buffered_samples_count = 0
+
+    #####################################################################################################
+
+    @property
+    def buffered_sec(self) -> float:
+        return self._buffered_samples_count / self._sample_rate
+
+    #####################################################################################################
+
+    def push(self, samples: ndarray) -> list[ndarray]:
+        self._chunks.append(samples)
+        self._buffered_samples_count += len(samples)
+        if self._buffered_samples_count <= self._max_segment_samples:
+            return []
+
+        buffered: Final = concatenate(self._chunks)
+        audio_segments: Final = find_segments_by_silence(
+            buffered,
+            min_segment_sec=self._min_segment_sec,
+            max_segment_sec=self._max_segment_sec,
+            sample_rate=self._sample_rate,
+        )
+        # the last segment may still grow with the next chunks, so it stays in the buffer
+        tail: Final = buffered[audio_segments[-1].start_sample:]
+        self._chunks = [tail]
+        self._buffered_samples_count = len(tail)
+        return [buffered[audio_segment.start_sample:audio_segment.end_sample] for audio_segment in audio_segments[:-1]]
+
+    #####################################################################################################
+
+    def flush(self) -> ndarray | None:
+        if self._buffered_samples_count == 0:
+            return None
+        buffered: Final = concatenate(self._chunks)
+        self._chunks = []
+        self._buffered_samples_count = 0
+        return buffered
+
+#####################################################################################################
@@ -1,14 +1,14 @@
 #####################################################################################################
 
 from abc import ABC, abstractmethod
-from collections.abc import Awaitable, Callable, Iterable, MutableSequence
+from collections.abc import Awaitable, Callable, Iterable, Mapping, MutableMapping, MutableSequence
 from contextlib import AbstractAsyncContextManager, AbstractContextManager, AsyncExitStack
 from dataclasses import dataclass, field
 from logging import Logger
 from multiprocessing.managers import SyncManager
 from queue import Empty, Queue
 from threading import Condition
-from time import monotonic
+from time import monotonic, time
 from types import UnionType
 from typing import Any, Final, Generic, Optional, TypeAlias, TypeVar, Union, cast, final, get_args, get_origin
 from uuid import UUID, uuid4
@@ -47,6 +47,56 @@ async def execute(
 
 #####################################################################################################
 
+class CmdCancelledException(AppException):
+    """Raise when the caller cancelled the command before it was completed."""
+
+#####################################################################################################
+
+@dataclass(frozen=True, kw_only=True)
+class CmdCallState:
+    call_id: UUID | None
+    is_cancelled: Callable[[], bool]
+
+#####################################################################################################
+
+# is_cancelled is polled while a command runs, every real check is a round trip to the manager process
+_CANCEL_CHECK_INTERVAL_SEC: Final = 0.25
+# a cancel that comes after the result was taken is never popped by a worker, it is dropped after this time:
+# longer than any call timeout, so a cancel for a call still waiting in the queue is not lost
+_CANCELLED_CALL_ID_EXPIRE_SEC: Final = 600.0
+
+#####################################################################################################
+
+class _CancelCheck:
+    #####################################################################################################
+
+    def __init__(self, cancelled_call_ids: Mapping[UUID, float], call_id: UUID | None) -> None:
+        self._cancelled_call_ids: Final = cancelled_call_ids
+        self._call_id: Final = call_id
+        self._checked_ts = -_CANCEL_CHECK_INTERVAL_SEC
+        self._is_cancelled = False
+
+    #####################################################################################################
+
+    def __call__(self) -> bool:
+        if self._is_cancelled or self._call_id is None:
+            return self._is_cancelled
+        now_ts: Final = monotonic()
+        if now_ts - self._checked_ts >= _CANCEL_CHECK_INTERVAL_SEC:
+            self._checked_ts = now_ts
+            self._is_cancelled = self._call_id in self._cancelled_call_ids
+        return self._is_cancelled
+
+#####################################################################################################
+
+def _drop_expired_cancelled_call_ids(cancelled_call_ids: MutableMapping[UUID, float]) -> None:
+    expired_ts: Final = time() - _CANCELLED_CALL_ID_EXPIRE_SEC
+    for call_id, cancelled_ts in tuple(cancelled_call_ids.items()):
+        if cancelled_ts <= expired_ts:
+            cancelled_call_ids.pop(call_id, None)
+
+#####################################################################################################
+
 _CmdMiddlewareResult = TypeVar('_CmdMiddlewareResult')
 
 class CmdMiddlewareResults(ABC):
@@ -114,6 +164,7 @@ class _ManagerWorkerParams(Generic[_CmdGlobalContext, _GlobalContextCreatorAddit
     call_queue: Queue[_InputCallInfo[_CmdGlobalContext, _CmdLocalContext]]
     call_results_condition: Condition
     call_results: MutableSequence[_ResultCallInfo]
+    cancelled_call_ids: MutableMapping[UUID, float]
 
 #####################################################################################################
 
@@ -199,6 +250,7 @@ async def _cmd_manager_worker(
     call_queue: Final = worker_params.call_queue
     call_results: Final = worker_params.call_results
     call_results_condition: Final = worker_params.call_results_condition
+    cancelled_call_ids: Final = worker_params.cancelled_call_ids
 
     global_context, middlewares_selector = await worker_params.global_context_creator(
         logger,
@@ -221,6 +273,7 @@ async def _cmd_manager_worker(
             try:
                 input_call_info = call_queue.get(timeout=2)
             except Empty:
+                _drop_expired_cancelled_call_ids(cancelled_call_ids)
                 continue
 
             if input_call_info is None:
@@ -235,6 +288,18 @@ async def _cmd_manager_worker(
             logger.info(f'handle {cmd}')
             start_ts = monotonic()
 
+            if call_id is not None and cancelled_call_ids.pop(call_id, None) is not None:
+                logger.info(f'{cmd} cancelled before execute')
+                with call_results_condition:
+                    call_results.append(_ResultCallInfo(call_id=call_id, execute_result=CmdCancelledException('Cmd cancelled')))
+                    call_results_condition.notify_all()
+                continue
+
+            middleware_results.put_middleware_result(CmdCallState(
+                call_id=call_id,
+                is_cancelled=_CancelCheck(cancelled_call_ids, call_id),
+            ))
+
             allow_execute = True
             if middlewares_selector is not None:
                 middlewares = middlewares_selector(type(cmd))
@@ -254,6 +319,9 @@ async def _cmd_manager_worker(
                     execute_result = err
 
             middleware_results.clear_middleware_results()
+            if call_id is not None:
+                cancelled_call_ids.pop(call_id, None)
+            _drop_expired_cancelled_call_ids(cancelled_call_ids)
 
             delta_ts = monotonic() - start_ts
             logger.info(f'{cmd} ({delta_ts} sec)')
@@ -304,6 +372,7 @@ def send_and_wait_result(
         *,
         type_ret: type[_CmdReturnValue] | None = None,
         call_timeout_sec: float | None = DEFAULT_CMD_EXECUTE_WAIT_TIMEOUT_SEC,
+        call_id: UUID | None = None,
     ) -> _CmdReturnValue:
         raise NotImplementedError()
 
@@ -313,6 +382,12 @@ def send_and_wait_result(
     def send(self, cmd: BaseCommand[_CmdGlobalContext, _CmdLocalContext, Any]) -> None:
         raise NotImplementedError()
 
+    #####################################################################################################
+
+    @abstractmethod
+    def cancel(self, call_id: UUID) -> None:
+        raise NotImplementedError()
+
 #####################################################################################################
 
 def _get_origin_type(type_ret: type) -> type | tuple[type, ...]:
@@ -364,6 +439,7 @@ def __init__(
             call_queue=manager.Queue(),
             call_results_condition=manager.Condition(),
             call_results=manager.list(),
+            cancelled_call_ids=manager.dict(),
         )
 
         descriptions: Final[list[WorkerDescription[WorkerParams]]] = []
@@ -391,8 +467,9 @@ def send_and_wait_result(
         *,
         type_ret: type[_CmdReturnValue] | None = None,
         call_timeout_sec: float | None = DEFAULT_CMD_EXECUTE_WAIT_TIMEOUT_SEC,
+        call_id: UUID | None = None,
     ) -> _CmdReturnValue:
-        call_info: Final = _InputCallInfo(cmd=cmd)
+        call_info: Final = _InputCallInfo(cmd=cmd) if call_id is None else _InputCallInfo(call_id=call_id, cmd=cmd)
         worker_params: Final = self._worker_params
         worker_params.call_queue.put(call_info)
 
@@ -413,6 +490,9 @@ def send_and_wait_result(
             (index, call_result_info) = call_result_infos[0]
             call_results.pop(index)
 
+        if call_id is not None:
+            worker_params.cancelled_call_ids.pop(call_id, None)
+
         execute_result: Final = call_result_info.execute_result
         if isinstance(execute_result, BaseException):
             raise execute_result
@@ -429,4 +509,10 @@ def send(self, cmd: BaseCommand[_CmdGlobalContext, _CmdLocalContext, Any]) -> No
         call_info: Final = _InputCallInfo(call_id=None, cmd=cmd)
         self._worker_params.call_queue.put(call_info)
 
+    #####################################################################################################
+
+    def cancel(self, call_id: UUID) -> None:
+        # wall clock: the workers in other processes compare it when they drop expired cancels
+        self._worker_params.cancelled_call_ids[call_id] = time()
+
 #####################################################################################################
@@ -0,0 +1,74 @@
+#####################################################################################################
+
+from collections.abc import Mapping
+from dataclasses import dataclass, replace
+from gzip import compress as _gzip_compress
+from typing import Any, Final
+
+from l7x.configs.settings import AppSettings
+
+#####################################################################################################
+
+GZIP_ENCODING: Final = 'gzip'
+ZSTD_ENCODING: Final = 'zstd'
+IDENTITY_ENCODING: Final = 'identity'
+
+_ZSTD_FRAME_MAGIC: Final = b'\x28\xb5\x2f\xfd'
+# a fast level: the bodies are small and the latency matters more than the last percent of size
+_GZIP_LEVEL: Final = 5
+_ZSTD_LEVEL: Final = 3
+
+#####################################################################################################
+
+@dataclass(frozen=True, kw_only=True)
+class CompressionSettings:
+    request_encoding: str
+    min_size_in_byte: int
+    accept_encoding: str
+
+    #####################################################################################################
+
+    @classmethod
+    def from_settings(cls, app_settings: AppSettings) -> 'CompressionSettings':
+        return cls(
+            request_encoding=app_settings.upstream_request_compression,
+            min_size_in_byte=app_settings.upstream_request_compression_min_size_in_byte,
+            accept_encoding=app_settings.upstream_accept_encoding,
+        )
+
+    #####################################################################################################
+
+    def with_overrides(self, overrides: Mapping[str, Any]) -> 'CompressionSettings':
+        return replace(self, **overrides)
+
+#####################################################################################################
+
+def compress_body(body: bytes, compression_settings: CompressionSettings) -> tuple[bytes, str | None]:
+    request_encoding: Final = compression_settings.request_encoding
+    if not request_encoding or request_encoding == IDENTITY_ENCODING or len(body) < compression_settings.min_size_in_byte:
+        return body, None
+    if request_encoding == GZIP_ENCODING:
+        return _gzip_compress(body, compresslevel=_GZIP_LEVEL), GZIP_ENCODING
+    if request_encoding == ZSTD_ENCODING:
+        return _get_zstd_module().ZstdCompressor(level=_ZSTD_LEVEL).compress(body), ZSTD_ENCODING
+    raise ValueError(f'Not supported request compression "{request_encoding}"')
+
+#####################################################################################################
+
+def decompress_zstd_body(body: bytes) -> bytes:
+    # aiohttp decodes gzip, deflate and br itself, zstd comes as is
+    if not body.startswith(_ZSTD_FRAME_MAGIC):
+        return body
+    return _get_zstd_module().ZstdDecompressor().decompressobj().decompress(body)
+
+#####################################################################################################
+
+def _get_zstd_module() -> Any:
+    try:
+        # optional: only the upstreams configured for zstd need it
+        import zstandard  # pylint: disable=import-outside-toplevel
+    except ImportError as err:
+        raise ImportError('zstd compression is configured for an upstream, install zstandard for it') from err
+    return zstandard
+
+#####################################################################################################
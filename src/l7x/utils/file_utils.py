@@ -0,0 +1,55 @@
+#####################################################################################################
+
+from contextlib import suppress
+from dataclasses import dataclass
+from hashlib import sha256
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import BinaryIO, Final
+
+#####################################################################################################
+
+FILE_COPY_CHUNK_SIZE_IN_BYTE: Final = 1024 * 1024
+
+#####################################################################################################
+
+@dataclass(frozen=True, kw_only=True)
+class SpooledFile:
+    path: Path
+    size_in_byte: int
+    content_hash: str
+
+#####################################################################################################
+
+def spool_to_temp_file(source: BinaryIO, spool_dir: Path | None, suffix: str = '') -> SpooledFile:
+    if spool_dir is not None:
+        spool_dir.mkdir(parents=True, exist_ok=True)
+
+    content_hash: Final = sha256()
+    size_in_byte = 0
+    with NamedTemporaryFile(mode='wb', dir=spool_dir, suffix=suffix, delete=False) as spool_file:
+        while chunk := source.read(FILE_COPY_CHUNK_SIZE_IN_BYTE):
+            content_hash.update(chunk)
+            spool_file.write(chunk)
+            size_in_byte += len(chunk)
+
+    return SpooledFile(path=Path(spool_file.name), size_in_byte=size_in_byte, content_hash=content_hash.hexdigest())
+
+#####################################################################################################
+
+def calc_file_sha256(path: Path) -> str:
+    content_hash: Final = sha256()
+    with path.open('rb') as source_file:
+        while chunk := source_file.read(FILE_COPY_CHUNK_SIZE_IN_BYTE):
+            content_hash.update(chunk)
+    return content_hash.hexdigest()
+
+#####################################################################################################
+
+def remove_file_quietly(path: Path | None) -> None:
+    if path is None:
+        return
+    with suppress(FileNotFoundError):
+        path.unlink()
+
+#####################################################################################################
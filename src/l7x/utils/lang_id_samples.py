@@ -0,0 +1,85 @@
+#####################################################################################################
+
+from typing import Final
+
+from l7x.types.language import LKey
+from l7x.types.mapping import FrozenDict
+
+#####################################################################################################
+
+# the same meeting text in every language: the built-in profiles are trained on it,
+# a profiles file built from real corpora replaces them through L7X_LANG_ID_PROFILES_PATH
+LANG_ID_SAMPLES: Final = FrozenDict({
+    LKey.AR: (
+        'مرحبا بكم في الاجتماع. سنناقش اليوم خطة المشروع والميزانية والموعد النهائي. '
+        + 'يجب على الفريق إعداد التقرير قبل نهاية الأسبوع. هل لديكم أي أسئلة حول المهام القادمة؟ '
+        + 'نحن نعمل معا من أجل تحقيق أهداف الشركة. شكرا لكم على الحضور والمشاركة في هذا النقاش.'
+    ),
+    LKey.AZ: (
+        'İclasa xoş gəlmisiniz. Bu gün layihənin planını, büdcəni və son tarixi müzakirə edəcəyik. '
+        + 'Komanda hesabatı həftənin sonuna qədər hazırlamalıdır. Növbəti tapşırıqlar haqqında sualınız varmı? '
+        + 'Biz şirkətin məqsədlərinə çatmaq üçün birlikdə işləyirik. İştirakınız üçün təşəkkür edirik.'
+    ),
+    LKey.DE: (
+        'Willkommen zur Besprechung. Heute sprechen wir über den Projektplan, das Budget und die Frist. '
+        + 'Das Team muss den Bericht bis zum Ende der Woche vorbereiten. Gibt es Fragen zu den nächsten Aufgaben? '
+        + 'Wir arbeiten gemeinsam daran, die Ziele des Unternehmens zu erreichen. Vielen Dank für Ihre Teilnahme.'
+    ),
+    LKey.EN: (
+        'Welcome to the meeting. Today we will discuss the project plan, the budget and the deadline. '
+        + 'The team has to prepare the report by the end of the week. Are there any questions about the next tasks? '
+        + 'We are working together to reach the goals of the company. Thank you for your participation.'
+    ),
+    LKey.ES: (
+        'Bienvenidos a la reunión. Hoy vamos a hablar del plan del proyecto, el presupuesto y la fecha límite. '
+        + 'El equipo tiene que preparar el informe antes del final de la semana. ¿Hay alguna pregunta sobre las próximas tareas? '
+        + 'Trabajamos juntos para alcanzar los objetivos de la empresa. Muchas gracias por su participación.'
+    ),
+    LKey.FR: (
+        "Bienvenue à la réunion. Aujourd'hui, nous allons parler du plan du projet, du budget et de la date limite. "
+        + "L'équipe doit préparer le rapport avant la fin de la semaine. Avez-vous des questions sur les prochaines tâches ? "
+        + "Nous travaillons ensemble pour atteindre les objectifs de l'entreprise. Merci beaucoup pour votre participation."
+    ),
+    LKey.HI: (
+        'बैठक में आपका स्वागत है। आज हम परियोजना की योजना, बजट और समय सीमा पर चर्चा करेंगे। '
+        + 'टीम को सप्ताह के अंत तक रिपोर्ट तैयार करनी है। क्या अगले कार्यों के बारे में कोई प्रश्न है? '
+        + 'हम कंपनी के लक्ष्यों को प्राप्त करने के लिए मिलकर काम कर रहे हैं। आपकी भागीदारी के लिए धन्यवाद।'
+    ),
+    LKey.KO: (
+        '회의에 오신 것을 환영합니다. 오늘은 프로젝트 계획, 예산, 마감일에 대해 논의하겠습니다. '
+        + '팀은 이번 주말까지 보고서를 준비해야 합니다. 다음 작업에 대해 질문이 있습니까? '
+        + '우리는 회사의 목표를 달성하기 위해 함께 일하고 있습니다. 참여해 주셔서 감사합니다.'
+    ),
+    LKey.NE: (
+        'बैठकमा तपाईंलाई स्वागत छ। आज हामी परियोजनाको योजना, बजेट र अन्तिम मितिबारे छलफल गर्नेछौं। '
+        + 'टोलीले हप्ताको अन्त्यसम्म प्रतिवेदन तयार गर्नुपर्छ। अर्को कामहरूबारे कुनै प्रश्न छ? '
+        + 'हामी कम्पनीका लक्ष्यहरू पूरा गर्न सँगै काम गरिरहेका छौं। तपाईंको सहभागिताको लागि धन्यवाद।'
+    ),
+    LKey.RU: (
+        'Добро пожаловать на встречу. Сегодня мы обсудим план проекта, бюджет и сроки. '
+        + 'Команда должна подготовить отчёт до конца недели. Есть ли вопросы по следующим задачам? '
+        + 'Мы работаем вместе, чтобы достичь целей компании. Спасибо всем за участие в обсуждении.'
+    ),
+    LKey.TG: (
+        'Ба вохӯрӣ хуш омадед. Имрӯз мо нақшаи лоиҳа, буҷет ва мӯҳлатро муҳокима мекунем. '
+        + 'Гурӯҳ бояд то охири ҳафта ҳисоботро омода кунад. Оё дар бораи вазифаҳои навбатӣ саволе ҳаст? '
+        + 'Мо якҷоя кор мекунем, то ба ҳадафҳои ширкат расем. Ташаккур барои иштирокатон.'
+    ),
+    LKey.UR: (
+        'اجلاس میں خوش آمدید۔ آج ہم منصوبے کی منصوبہ بندی، بجٹ اور آخری تاریخ پر بات کریں گے۔ '
+        + 'ٹیم کو ہفتے کے آخر تک رپورٹ تیار کرنی ہے۔ کیا اگلے کاموں کے بارے میں کوئی سوال ہے؟ '
+        + 'ہم کمپنی کے مقاصد حاصل کرنے کے لیے مل کر کام کر رہے ہیں۔ آپ کی شرکت کا شکریہ۔'
+    ),
+    LKey.UZ: (
+        "Yig'ilishga xush kelibsiz. Bugun biz loyiha rejasi, byudjet va muddatni muhokama qilamiz. "
+        + "Jamoa hisobotni hafta oxirigacha tayyorlashi kerak. Keyingi vazifalar bo'yicha savollar bormi? "
+        + "Biz kompaniya maqsadlariga erishish uchun birgalikda ishlaymiz. Ishtirokingiz uchun rahmat."
+    ),
+    LKey.ZH: (
+        '欢迎参加会议。今天我们将讨论项目计划、预算和截止日期。'
+        + '团队必须在本周末之前准备好报告。关于接下来的任务有什么问题吗？'
+        + '我们一起努力实现公司的目标。感谢大家的参与和支持。'
+    ),
+})
+
+#####################################################################################################
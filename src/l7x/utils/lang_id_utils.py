@@ -0,0 +1,169 @@
+#####################################################################################################
+
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from functools import cache
+from pathlib import Path
+from re import UNICODE, compile as _re_compile
+from typing import Final
+from unicodedata import name as _unicode_name
+from zlib import crc32
+
+from numpy import add, array, asarray, concatenate, float32, full, inf, int64, log, load as _numpy_load, ndarray, savez, zeros
+
+from l7x.utils.lang_id_samples import LANG_ID_SAMPLES
+
+#####################################################################################################
+
+_NGRAM_SIZES: Final = (1, 2, 3)
+# hashed n-grams: a fixed size table instead of a vocabulary, 2 ** 16 buckets per language
+_BUCKETS_COUNT: Final = 1 << 16
+_BUCKET_MASK: Final = _BUCKETS_COUNT - 1
+# a few hundred characters are enough to tell the language, longer texts are cut
+_MAX_SAMPLE_CHARS: Final = 1000
+_SMOOTHING: Final = 0.01
+# a text fitting its best profile this much worse than an unseen sentence of that language is of another language
+_FIT_FLOOR_MARGIN: Final = 0.4
+_SENTENCE_END_PATTERN: Final = _re_compile(r'(?<=[.!?。？！।۔])\s*', UNICODE)
+
+#####################################################################################################
+
+@dataclass(frozen=True, kw_only=True)
+class IdentifiedLanguage:
+    code: str
+    # the margin between the best two languages in average log likelihood per n-gram
+    confidence: float
+
+#####################################################################################################
+
+def _get_script_features(text: str) -> list[str]:
+    # the script of a letter alone tells apart most of the languages: Hangul, Han, Devanagari, Arabic...
+    return [f'#{_unicode_name(char, "").split(" ", 1)[0]}' for char in text if char.isalpha()]
+
+#####################################################################################################
+
+def extract_ngram_buckets(text: str) -> ndarray:
+    sample: Final = ' '.join(text[:_MAX_SAMPLE_CHARS].lower().split())
+    if not sample:
+        return zeros(0, dtype=int64)
+    padded_sample: Final = f' {sample} '
+    features: Final = [
+        f'{ngram_size}{padded_sample[ngram_start:ngram_start + ngram_size]}'
+        for ngram_size in _NGRAM_SIZES
+        for ngram_start in range(len(padded_sample) - ngram_size + 1)
+    ]
+    features.extend(_get_script_features(sample))
+    # crc32 and not hash(): the buckets must be the same in every process and in the saved profiles
+    return array([crc32(feature.encode('utf-8')) & _BUCKET_MASK for feature in features], dtype=int64)
+
+#####################################################################################################
+
+@dataclass(frozen=True, kw_only=True)
+class LanguageProfiles:
+    codes: tuple[str, ...]
+    # languages x buckets table of the n-gram log probabilities
+    log_probs: ndarray
+    # per language: the lowest average n-gram log probability of a text still taken for that language
+    fit_floors: ndarray
+
+    #####################################################################################################
+
+    @classmethod
+    def build(cls, samples: Mapping[str, str]) -> 'LanguageProfiles':
+        codes: Final = tuple(samples)
+        return cls(
+            codes=codes,
+            log_probs=_calc_log_probs([samples[code] for code in codes]),
+            fit_floors=array([_calc_fit_floor(samples[code]) for code in codes], dtype=float32),
+        )
+
+    #####################################################################################################
+
+    @classmethod
+    def load(cls, profiles_path: Path) -> 'LanguageProfiles':
+        with _numpy_load(profiles_path) as profiles_file:
+            codes: Final = tuple(str(code) for code in profiles_file['codes'])
+            # files saved without the floors never report a poor fit
+            if 'fit_floors' in profiles_file.files:
+                fit_floors = profiles_file['fit_floors']
+            else:
+                fit_floors = full(len(codes), -inf, dtype=float32)
+            return cls(codes=codes, log_probs=profiles_file['log_probs'], fit_floors=fit_floors)
+
+    #####################################################################################################
+
+    def save(self, profiles_path: Path) -> None:
+        savez(profiles_path, codes=asarray(self.codes), log_probs=self.log_probs, fit_floors=self.fit_floors)
+
+#####################################################################################################
+
+def _calc_log_probs(samples: Sequence[str]) -> ndarray:
+    counts: Final = zeros((len(samples), _BUCKETS_COUNT), dtype=float32)
+    for sample_index, sample in enumerate(samples):
+        add.at(counts[sample_index], extract_ngram_buckets(sample), 1)
+    totals: Final = counts.sum(axis=1, keepdims=True)
+    return log((counts + _SMOOTHING) / (totals + _SMOOTHING * _BUCKETS_COUNT)).astype(float32)
+
+#####################################################################################################
+
+def _calc_fit_floor(sample: str) -> float:
+    # every sentence is scored by a profile built without it: that is how well an unseen text of the language fits
+    sentences: Final = [sentence for sentence in _SENTENCE_END_PATTERN.split(sample) if sentence.strip()]
+    if len(sentences) < 2:
+        return -inf
+    held_out_fits: Final[list[float]] = []
+    for sentence_index, sentence in enumerate(sentences):
+        rest_log_probs = _calc_log_probs([' '.join(sentences[:sentence_index] + sentences[sentence_index + 1:])])
+        held_out_fits.append(float(rest_log_probs[0, extract_ngram_buckets(sentence)].mean()))
+    return sum(held_out_fits) / len(held_out_fits) - _FIT_FLOOR_MARGIN
+
+#####################################################################################################
+
+@cache
+def get_builtin_language_profiles() -> LanguageProfiles:
+    return LanguageProfiles.build({str(code): sample for code, sample in LANG_ID_SAMPLES.items()})
+
+#####################################################################################################
+
+class LanguageIdentifier:
+    #####################################################################################################
+
+    def __init__(self, profiles: LanguageProfiles) -> None:
+        self._profiles: Final = profiles
+
+    #####################################################################################################
+
+    def identify(self, text: str) -> IdentifiedLanguage | None:
+        return self.identify_many([text])[0]
+
+    #####################################################################################################
+
+    def identify_many(self, texts: Sequence[str]) -> tuple[IdentifiedLanguage | None, ...]:
+        text_buckets: Final = [extract_ngram_buckets(text) for text in texts]
+        scored_indexes: Final = [text_index for text_index, buckets in enumerate(text_buckets) if len(buckets)]
+        identified: Final[list[IdentifiedLanguage | None]] = [None] * len(texts)
+        if not scored_indexes:
+            return tuple(identified)
+
+        ngram_counts: Final = array([len(text_buckets[text_index]) for text_index in scored_indexes], dtype=int64)
+        offsets: Final = concatenate(([0], ngram_counts.cumsum()[:-1]))
+        # one gather and one segmented sum score all texts against all languages at once
+        scores: Final = add.reduceat(
+            self._profiles.log_probs[:, concatenate([text_buckets[text_index] for text_index in scored_indexes])],
+            offsets,
+            axis=1,
+        ) / ngram_counts
+        ranked: Final = scores.argsort(axis=0)
+        for column, text_index in enumerate(scored_indexes):
+            best_index = ranked[-1, column]
+            if scores[best_index, column] < self._profiles.fit_floors[best_index]:
+                # a language without a profile still has a best one: a poor fit is never sure
+                margin = 0.0
+            elif len(self._profiles.codes) > 1:
+                margin = scores[best_index, column] - scores[ranked[-2, column], column]
+            else:
+                margin = 0.0
+            identified[text_index] = IdentifiedLanguage(code=self._profiles.codes[best_index], confidence=float(margin))
+        return tuple(identified)
+
+#####################################################################################################
@@ -77,6 +77,78 @@ def find_value_by_keys_sequence(
         return default
     return ret_value
 
+#####################################################################################################
+
+class CompiledKeysPath(Generic[_ValueFinderReturnTypes]):
+    # find_value_or_none_by_keys_sequence for hot paths: the keys are checked once here,
+    # the lookup itself only indexes and leaves the type checks to the failures
+    __slots__ = ('_keys', '_ret_type')
+
+    #####################################################################################################
+
+    def __init__(self, *keys: str | int, ret_type: type[_ValueFinderReturnTypes]) -> None:
+        for key in keys:
+            if not isinstance(key, _STR_AND_INT_TYPES):
+                key_type = type(key)
+                raise FindValueByKeysSequenceException(f'Key for find by key must be int or str, now is {key_type}.')
+        self._keys: Final = keys
+        self._ret_type: Final = ret_type
+
+    #####################################################################################################
+
+    @property
+    def keys(self) -> tuple[str | int, ...]:
+        return self._keys
+
+    #####################################################################################################
+
+    @property
+    def ret_type(self) -> type[_ValueFinderReturnTypes]:
+        return self._ret_type
+
+    #####################################################################################################
+
+    def find_or_none(self, source: _SourceType, /, logger: Logger | None = None) -> _ValueFinderReturnTypes | None:
+        cursor: Any = source
+        try:
+            for key in self._keys:
+                cursor = cursor[key]
+        except (IndexError, KeyError):
+            if logger is not None and logger.isEnabledFor(DEBUG):
+                logger.warning(_CANNOT_FIND_PATH_MSG.format(args=self._keys, source=source))
+            return None
+        except TypeError:
+            if cursor is not None:
+                if not isinstance(cursor, _MAPPING_AND_SEQUENCE_TYPES):
+                    cursor_type = type(cursor)
+                    raise FindValueByKeysSequenceException(f'Source for find by key must be map or sequence, now is {cursor_type}.')
+                raise
+        if cursor is None:
+            if logger is not None and logger.isEnabledFor(DEBUG):
+                logger.warning(_CANNOT_FIND_PATH_MSG.format(args=self._keys, source=source))
+            return None
+        if not isinstance(cursor, self._ret_type):
+            value_type: Final = type(cursor)
+            raise FindValueByKeysSequenceException(f'Return value for find by key must be type {self._ret_type}. Now is {value_type}')
+        return cursor
+
+    #####################################################################################################
+
+    def find(
+        self,
+        source: _SourceType,
+        /,
+        *,
+        default: _ValueFinderReturnTypes,
+        logger: Logger | None = None,
+    ) -> _ValueFinderReturnTypes:
+        ret_value: Final = self.find_or_none(source, logger)
+        if ret_value is None:
+            if logger is not None and logger.isEnabledFor(DEBUG):
+                logger.warning(f'By path {self._keys} in {source} is None, return default {default}.')
+            return default
+        return ret_value
+
 ####################################################################################################
 
 class _AbsentValue:
@@ -120,6 +192,35 @@ def get_value(self, *args: str | int, default: _ValueFinderReturnTypes) -> _Valu
             return default
         return ret_value
 
+    #####################################################################################################
+
+    def get_path_value_or_none(self, path: CompiledKeysPath[_ValueFinderReturnTypes]) -> _ValueFinderReturnTypes | None:
+        # the same cache entry as get_value_or_none with the same keys
+        cached_result: Final = self._cache.get(path.keys, _AbsentValue)
+        if cached_result is _AbsentValue:
+            result_by_path: Final = path.find_or_none(self._source, self._logger)
+            self._cache[path.keys] = result_by_path
+            return result_by_path
+
+        if cached_result is None:
+            return None
+
+        if not isinstance(cached_result, path.ret_type):
+            value_type: Final = type(cached_result)
+            raise FindValueByKeysSequenceException(f'Return value for find by key must be type {path.ret_type}. Now is {value_type}')
+        return cached_result
+
+    #####################################################################################################
+
+    def get_path_value(self, path: CompiledKeysPath[_ValueFinderReturnTypes], *, default: _ValueFinderReturnTypes) -> _ValueFinderReturnTypes:
+        ret_value: Final = self.get_path_value_or_none(path)
+        if ret_value is None:
+            logger: Final = self._logger
+            if logger is not None and logger.isEnabledFor(DEBUG):
+                logger.warning(f'By path {path.keys} in {self._source} is None, return default {default}.')
+            return default
+        return ret_value
+
 ####################################################################################################
 
 _FunSelf = TypeVar('_FunSelf', bound=CacheablePropertiesObject)
@@ -0,0 +1,236 @@
+#####################################################################################################
+
+from asyncio import get_running_loop
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass
+from functools import partial
+from hashlib import sha256
+from logging import Logger
+from os import replace as _os_replace
+from pathlib import Path
+from random import random
+from tempfile import NamedTemporaryFile
+from threading import Lock
+from time import time
+from typing import BinaryIO, Final
+
+from l7x.utils.file_utils import FILE_COPY_CHUNK_SIZE_IN_BYTE, remove_file_quietly
+from l7x.utils.orjson_utils import JSONDecodeError, orjson_dumps, orjson_loads
+
+#####################################################################################################
+
+_DISK_ENTRY_SUFFIX: Final = '.json'
+_DISK_TMP_SUFFIX: Final = '.tmp'
+# a temporary file this old is left by a failed or killed write, a live write takes milliseconds
+_DISK_STALE_TMP_SEC: Final = 60.0
+# the disk tier is trimmed on a fraction of writes, scanning the directory on every write is too slow
+_DISK_TRIM_PROBABILITY: Final = 0.1
+
+#####################################################################################################
+
+def hash_audio_content(source: bytes | memoryview | Path | BinaryIO) -> str:
+    content_hash: Final = sha256()
+    if isinstance(source, bytes | memoryview):
+        content_hash.update(source)
+        return content_hash.hexdigest()
+
+    if isinstance(source, Path):
+        with source.open('rb') as source_file:
+            return hash_audio_content(source_file)
+
+    start_position: Final = source.tell()
+    while chunk := source.read(FILE_COPY_CHUNK_SIZE_IN_BYTE):
+        content_hash.update(chunk)
+    # the same stream is sent to the recognizer after hashing
+    source.seek(start_position)
+    return content_hash.hexdigest()
+
+#####################################################################################################
+
+def _get_disk_entry_path(disk_dir: Path, key: str) -> Path:
+    return disk_dir / f'{key}{_DISK_ENTRY_SUFFIX}'
+
+#####################################################################################################
+
+def make_recognition_cache_key(content_hash: str, language: str | None, options: Mapping[str, str]) -> str:
+    key_hash: Final = sha256(content_hash.encode('utf-8'))
+    key_hash.update(b'\0')
+    key_hash.update((language or '').encode('utf-8'))
+    for option_name in sorted(options):
+        key_hash.update(b'\0')
+        key_hash.update(f'{option_name}={options[option_name]}'.encode('utf-8'))
+    return key_hash.hexdigest()
+
+#####################################################################################################
+
+@dataclass(frozen=True, kw_only=True)
+class RecognitionCacheStats:
+    memory_hits: int
+    disk_hits: int
+    misses: int
+    memory_entries: int
+
+#####################################################################################################
+
+class RecognitionCache:
+    #####################################################################################################
+
+    def __init__(
+        self,
+        *,
+        logger: Logger,
+        max_entries: int,
+        ttl_sec: float,
+        disk_dir: Path | None,
+        disk_max_size_in_byte: int,
+    ) -> None:
+        self._logger: Final = logger
+        self._max_entries: Final = max_entries
+        self._ttl_sec: Final = ttl_sec
+        self._disk_dir: Final = disk_dir
+        self._disk_max_size_in_byte: Final = disk_max_size_in_byte
+        self._entries: Final[OrderedDict[str, tuple[float, str]]] = OrderedDict()
+        self._disk_lock: Final = Lock()
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+        if disk_dir is not None:
+            disk_dir.mkdir(parents=True, exist_ok=True)
+
+    #####################################################################################################
+
+    @property
+    def stats(self) -> RecognitionCacheStats:
+        return RecognitionCacheStats(
+            memory_hits=self._memory_hits,
+            disk_hits=self._disk_hits,
+            misses=self._misses,
+            memory_entries=len(self._entries),
+        )
+
+    #####################################################################################################
+
+    async def get(self, key: str) -> str | None:
+        memory_entry: Final = self._entries.get(key)
+        if memory_entry is not None:
+            expires_at, recognized_text = memory_entry
+            if expires_at > time():
+                self._entries.move_to_end(key)
+                self._memory_hits += 1
+                return recognized_text
+            del self._entries[key]
+
+        disk_dir: Final = self._disk_dir
+        if disk_dir is not None:
+            disk_entry: Final = await get_running_loop().run_in_executor(None, partial(self._read_disk_entry, disk_dir, key))
+            if disk_entry is not None:
+                self._disk_hits += 1
+                self._remember(key, *disk_entry)
+                return disk_entry[1]
+
+        self._misses += 1
+        return None
+
+    #####################################################################################################
+
+    async def put(self, key: str, recognized_text: str) -> None:
+        expires_at: Final = time() + self._ttl_sec
+        self._remember(key, expires_at, recognized_text)
+        disk_dir: Final = self._disk_dir
+        if disk_dir is not None:
+            try:
+                await get_running_loop().run_in_executor(
+                    None,
+                    partial(self._write_disk_entry, disk_dir, key, expires_at, recognized_text),
+                )
+            except OSError as err:
+                self._logger.warning(f'Recognition cache write failed: {err}')
+
+    #####################################################################################################
+
+    def _remember(self, key: str, expires_at: float, recognized_text: str) -> None:
+        if self._max_entries <= 0:
+            return
+        entries: Final = self._entries
+        entries[key] = (expires_at, recognized_text)
+        entries.move_to_end(key)
+        while len(entries) > self._max_entries:
+            entries.popitem(last=False)
+
+    #####################################################################################################
+
+    def _read_disk_entry(self, disk_dir: Path, key: str) -> tuple[float, str] | None:
+        entry_path: Final = _get_disk_entry_path(disk_dir, key)
+        try:
+            entry_json: Final = orjson_loads(entry_path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except (OSError, JSONDecodeError) as err:
+            self._logger.warning(f'Recognition cache entry "{entry_path.name}" is broken: {err}')
+            remove_file_quietly(entry_path)
+            return None
+
+        expires_at: Final = float(entry_json.get('expires_at', 0))
+        if expires_at <= time():
+            remove_file_quietly(entry_path)
+            return None
+        return expires_at, str(entry_json.get('text', ''))
+
+    #####################################################################################################
+
+    def _write_disk_entry(self, disk_dir: Path, key: str, expires_at: float, recognized_text: str) -> None:
+        # written next to the target and renamed, so other workers never read a partial entry
+        tmp_path: Path | None = None
+        try:
+            with NamedTemporaryFile(mode='wb', dir=disk_dir, suffix=_DISK_TMP_SUFFIX, delete=False) as entry_file:
+                tmp_path = Path(entry_file.name)
+                entry_file.write(orjson_dumps({'expires_at': expires_at, 'text': recognized_text}))
+            _os_replace(tmp_path, _get_disk_entry_path(disk_dir, key))
+        except BaseException:
+            remove_file_quietly(tmp_path)
+            raise
+
+        if random() < _DISK_TRIM_PROBABILITY:  # noqa: S311
+            self._trim_disk(disk_dir)
+
+    #####################################################################################################
+
+    def _trim_disk(self, disk_dir: Path) -> None:
+        if not self._disk_lock.acquire(blocking=False):
+            return
+        try:
+            now: Final = time()
+            for tmp_path in disk_dir.glob(f'*{_DISK_TMP_SUFFIX}'):
+                try:
+                    tmp_stat = tmp_path.stat()
+                except FileNotFoundError:
+                    continue
+                if tmp_stat.st_mtime + _DISK_STALE_TMP_SEC <= now:
+                    remove_file_quietly(tmp_path)
+
+            entries: list[tuple[float, int, Path]] = []
+            for entry_path in disk_dir.glob(f'*{_DISK_ENTRY_SUFFIX}'):
+                try:
+                    entry_stat = entry_path.stat()
+                except FileNotFoundError:
+                    continue
+                if entry_stat.st_mtime + self._ttl_sec <= now:
+                    remove_file_quietly(entry_path)
+                    continue
+                entries.append((entry_stat.st_mtime, entry_stat.st_size, entry_path))
+
+            used_size_in_byte = sum(entry_size for _, entry_size, _ in entries)
+            if self._disk_max_size_in_byte <= 0 or used_size_in_byte <= self._disk_max_size_in_byte:
+                return
+            # the oldest entries go first
+            for _, entry_size, entry_path in sorted(entries):
+                if used_size_in_byte <= self._disk_max_size_in_byte:
+                    break
+                remove_file_quietly(entry_path)
+                used_size_in_byte -= entry_size
+        finally:
+            self._disk_lock.release()
+
+#####################################################################################################
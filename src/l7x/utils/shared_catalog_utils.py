@@ -0,0 +1,199 @@
+#####################################################################################################
+
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from logging import Logger
+from multiprocessing.shared_memory import SharedMemory
+from os import replace as _os_replace
+from pathlib import Path
+from struct import Struct
+from tempfile import NamedTemporaryFile
+from time import monotonic
+from typing import Any, Final, Generic, TypeVar
+
+from l7x.utils.orjson_utils import JSONDecodeError, orjson_dumps, orjson_loads
+
+#####################################################################################################
+
+_T = TypeVar('_T')
+
+# version (odd while the payload is being written) and payload size
+_HEADER: Final = Struct('<QQ')
+_READ_ATTEMPTS: Final = 100
+
+#####################################################################################################
+
+class SharedCatalogError(Exception):
+    """Raise when a catalog does not fit into its shared memory segment or cannot be decoded."""
+
+#####################################################################################################
+
+@dataclass(frozen=True, kw_only=True)
+class SharedCatalogRef:
+    shm_name: str
+    persist_path: Path | None
+
+#####################################################################################################
+
+class SharedCatalog(Generic[_T]):
+    #####################################################################################################
+
+    def __init__(
+        self,
+        shm: SharedMemory,
+        *,
+        decode: Callable[[Any], _T],
+        is_publisher: bool,
+        persist_path: Path | None,
+    ) -> None:
+        self._shm: Final = shm
+        self._decode: Final = decode
+        self._is_publisher: Final = is_publisher
+        self._persist_path: Final = persist_path
+        self._decoded_version = 0
+        self._decoded_value: _T | None = None
+        self._attached_at: Final = monotonic()
+
+    #####################################################################################################
+
+    @classmethod
+    def attach(cls, catalog_ref: SharedCatalogRef, *, decode: Callable[[Any], _T], is_publisher: bool) -> 'SharedCatalog[_T]':
+        return cls(
+            SharedMemory(name=catalog_ref.shm_name),
+            decode=decode,
+            is_publisher=is_publisher,
+            persist_path=catalog_ref.persist_path,
+        )
+
+    #####################################################################################################
+
+    @property
+    def is_publisher(self) -> bool:
+        return self._is_publisher
+
+    #####################################################################################################
+
+    @property
+    def attached_sec(self) -> float:
+        return monotonic() - self._attached_at
+
+    #####################################################################################################
+
+    @property
+    def version(self) -> int:
+        return _HEADER.unpack_from(self._shm.buf)[0]
+
+    #####################################################################################################
+
+    def read(self) -> _T | None:
+        # lock free: the decoded value is reused until the publisher bumps the version
+        if self.version == self._decoded_version:
+            return self._decoded_value
+
+        versioned_payload: Final = _read_payload(self._shm)
+        if versioned_payload is None:
+            # the publisher is in the middle of a write: the previous catalog is still good enough
+            return self._decoded_value
+        payload_version, payload = versioned_payload
+        if payload_version == 0:
+            return None
+        try:
+            self._decoded_value = self._decode(orjson_loads(payload))
+        except (JSONDecodeError, KeyError, TypeError, ValueError) as err:
+            raise SharedCatalogError(f'Shared catalog "{self._shm.name}" cannot be decoded: {err}') from err
+        self._decoded_version = payload_version
+        return self._decoded_value
+
+    #####################################################################################################
+
+    def publish(self, catalog: Any) -> bool:
+        payload: Final = orjson_dumps(catalog)
+        # the only writer, so its own read never meets a write in progress
+        versioned_payload: Final = _read_payload(self._shm)
+        if versioned_payload is not None and versioned_payload[1] == payload:
+            return False
+        _write_payload(self._shm, payload)
+        if self._persist_path is not None:
+            _persist_payload(self._persist_path, payload)
+        return True
+
+    #####################################################################################################
+
+    def close(self) -> None:
+        self._shm.close()
+
+#####################################################################################################
+
+def _read_payload(shm: SharedMemory) -> tuple[int, bytes] | None:
+    # None while a write is in progress: the readers never wait for the publisher
+    shm_buf: Final = shm.buf
+    for _ in range(_READ_ATTEMPTS):
+        start_version, payload_size = _HEADER.unpack_from(shm_buf)
+        if start_version % 2:
+            return None
+        payload = bytes(shm_buf[_HEADER.size:_HEADER.size + payload_size])
+        # seqlock: the payload is consistent only if no write started or ended meanwhile
+        if _HEADER.unpack_from(shm_buf)[0] == start_version:
+            return start_version, payload
+    return None
+
+#####################################################################################################
+
+def _write_payload(shm: SharedMemory, payload: bytes) -> None:
+    shm_buf: Final = shm.buf
+    if _HEADER.size + len(payload) > len(shm_buf):
+        raise SharedCatalogError(f'Catalog of {len(payload)} bytes does not fit into "{shm.name}" of {len(shm_buf)} bytes')
+    version: Final = _HEADER.unpack_from(shm_buf)[0]
+    # a single publisher process writes, readers retry while the version is odd
+    _HEADER.pack_into(shm_buf, 0, version + 1, 0)
+    shm_buf[_HEADER.size:_HEADER.size + len(payload)] = payload
+    _HEADER.pack_into(shm_buf, 0, version + 2, len(payload))
+
+#####################################################################################################
+
+def _persist_payload(persist_path: Path, payload: bytes) -> None:
+    persist_path.parent.mkdir(parents=True, exist_ok=True)
+    with NamedTemporaryFile(mode='wb', dir=persist_path.parent, suffix='.tmp', delete=False) as persist_file:
+        persist_file.write(payload)
+    _os_replace(persist_file.name, persist_path)
+
+#####################################################################################################
+
+@contextmanager
+def create_shared_catalogs(
+    catalog_names: tuple[str, ...],
+    *,
+    capacity_in_byte: int,
+    persist_dir: Path | None,
+    logger: Logger,
+) -> Iterator[Mapping[str, SharedCatalogRef]]:
+    # owned by the main process: the segments live as long as the web workers do
+    catalog_refs: Final[dict[str, SharedCatalogRef]] = {}
+    with ExitStack() as exit_stack:
+        for catalog_name in catalog_names:
+            shm = SharedMemory(create=True, size=_HEADER.size + capacity_in_byte)
+            exit_stack.callback(shm.unlink)
+            exit_stack.callback(shm.close)
+            _HEADER.pack_into(shm.buf, 0, 0, 0)
+
+            persist_path = None if persist_dir is None else persist_dir / f'{catalog_name}.json'
+            if persist_path is not None:
+                _load_persisted_payload(shm, persist_path, logger)
+            catalog_refs[catalog_name] = SharedCatalogRef(shm_name=shm.name, persist_path=persist_path)
+        yield catalog_refs
+
+#####################################################################################################
+
+def _load_persisted_payload(shm: SharedMemory, persist_path: Path, logger: Logger) -> None:
+    # the last good catalog is served at once after a cold start, the publisher refreshes it later
+    try:
+        payload: Final = persist_path.read_bytes()
+        orjson_loads(payload)
+        _write_payload(shm, payload)
+    except FileNotFoundError:
+        return
+    except (OSError, JSONDecodeError, SharedCatalogError) as err:
+        logger.warning(f'Persisted catalog "{persist_path}" is ignored: {err}')
+
+#####################################################################################################
@@ -0,0 +1,68 @@
+#####################################################################################################
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from re import MULTILINE, UNICODE, Match, compile as _re_compile
+from typing import Final
+
+#####################################################################################################
+
+_NOTRANSLATE_WRAP_PATTERN: Final = _re_compile(r'(\[@(?P<non_translated>.*?)@\])', MULTILINE | UNICODE)
+# rare brackets: the translation engines keep them as is and they do not occur in normal text
+_PLACEHOLDER_TEMPLATE: Final = '⟦{index}⟧'
+
+#####################################################################################################
+
+@dataclass(frozen=True, kw_only=True)
+class ProtectedText:
+    text: str
+    notranslate_spans: tuple[str, ...]
+
+#####################################################################################################
+
+def protect_notranslate_spans(text: str) -> ProtectedText:
+    notranslate_spans: Final[list[str]] = []
+
+    def _replace_with_placeholder(match: Match[str]) -> str:
+        notranslate_spans.append(match.group('non_translated'))
+        return _PLACEHOLDER_TEMPLATE.format(index=len(notranslate_spans) - 1)
+
+    protected_text: Final = _NOTRANSLATE_WRAP_PATTERN.sub(_replace_with_placeholder, text)
+    return ProtectedText(text=protected_text, notranslate_spans=tuple(notranslate_spans))
+
+#####################################################################################################
+
+def restore_notranslate_spans(translated_text: str, notranslate_spans: Sequence[str]) -> str | None:
+    # None when the upstream lost or mangled a placeholder: the span can not be put back to the right place
+    restored_text = translated_text
+    for span_index, notranslate_span in enumerate(notranslate_spans):
+        placeholder = _PLACEHOLDER_TEMPLATE.format(index=span_index)
+        if placeholder not in restored_text:
+            return None
+        restored_text = restored_text.replace(placeholder, notranslate_span)
+    return restored_text
+
+#####################################################################################################
+
+def pack_segments_into_batches(
+    segment_sizes: Sequence[int],
+    *,
+    max_batch_size: int,
+    max_batch_segments: int,
+) -> tuple[tuple[int, ...], ...]:
+    # keeps the segments order, a segment larger than the limit goes alone into its own batch
+    batches: Final[list[tuple[int, ...]]] = []
+    batch: list[int] = []
+    batch_size = 0
+    for segment_index, segment_size in enumerate(segment_sizes):
+        if batch and (batch_size + segment_size > max_batch_size or len(batch) >= max_batch_segments):
+            batches.append(tuple(batch))
+            batch = []
+            batch_size = 0
+        batch.append(segment_index)
+        batch_size += segment_size
+    if batch:
+        batches.append(tuple(batch))
+    return tuple(batches)
+
+#####################################################################################################
@@ -0,0 +1,256 @@
+#####################################################################################################
+
+from asyncio import get_running_loop
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from functools import partial
+from logging import Logger
+from pathlib import Path
+from random import random
+from re import MULTILINE, UNICODE, compile as _re_compile
+from sqlite3 import Connection, Error as SqliteError, connect as _sqlite_connect
+from threading import Lock
+from time import time
+from typing import Final, TypeAlias
+from unicodedata import normalize as _unicode_normalize
+from weakref import WeakSet
+
+#####################################################################################################
+
+# (source language, target language, normalized segment)
+TranslationMemoryKey: TypeAlias = tuple[str, str, str]
+
+_SENTENCE_END_PATTERN: Final = _re_compile(r'(?<=[.!?…。！？])\s+', MULTILINE | UNICODE)
+_NOTRANSLATE_WRAP_PATTERN: Final = _re_compile(r'\[@.*?@\]', MULTILINE | UNICODE)
+_WHITESPACE_PATTERN: Final = _re_compile(r'\s+', UNICODE)
+# the store is trimmed on a fraction of writes, counting the rows on every write is too slow
+_STORE_TRIM_PROBABILITY: Final = 0.05
+_STORE_BUSY_TIMEOUT_SEC: Final = 5.0
+
+#####################################################################################################
+
+@dataclass(frozen=True, kw_only=True)
+class TextSegment:
+    text: str
+    # the whitespace after the segment, put back as is when the translations are stitched
+    separator: str
+
+#####################################################################################################
+
+def split_into_sentences(text: str) -> tuple[TextSegment, ...]:
+    # a [@...@] span is never cut: it must reach the translation service whole
+    notranslate_spans: Final = tuple(span_match.span() for span_match in _NOTRANSLATE_WRAP_PATTERN.finditer(text))
+    segments: Final[list[TextSegment]] = []
+    segment_start = 0
+    for separator_match in _SENTENCE_END_PATTERN.finditer(text):
+        if any(span_start < separator_match.start() < span_end for span_start, span_end in notranslate_spans):
+            continue
+        segments.append(TextSegment(text=text[segment_start:separator_match.start()], separator=separator_match.group()))
+        segment_start = separator_match.end()
+    if segment_start < len(text):
+        segments.append(TextSegment(text=text[segment_start:], separator=''))
+    return tuple(segments)
+
+#####################################################################################################
+
+def stitch_sentences(segments: Sequence[TextSegment], translated_texts: Sequence[str]) -> str:
+    return ''.join(
+        f'{translated_text}{segment.separator}'
+        for segment, translated_text in zip(segments, translated_texts, strict=True)
+    )
+
+#####################################################################################################
+
+def normalize_segment(segment: str) -> str:
+    # the case is kept: "Apple" and "apple" may need different translations
+    return _WHITESPACE_PATTERN.sub(' ', _unicode_normalize('NFC', segment)).strip()
+
+#####################################################################################################
+
+@dataclass(frozen=True, kw_only=True)
+class TranslationMemoryStats:
+    memory_hits: int
+    store_hits: int
+    misses: int
+    memory_entries: int
+    hit_ratio: float
+
+#####################################################################################################
+
+def _create_stats(*, memory_hits: int, store_hits: int, misses: int, memory_entries: int) -> TranslationMemoryStats:
+    lookups_count: Final = memory_hits + store_hits + misses
+    return TranslationMemoryStats(
+        memory_hits=memory_hits,
+        store_hits=store_hits,
+        misses=misses,
+        memory_entries=memory_entries,
+        hit_ratio=(memory_hits + store_hits) / lookups_count if lookups_count else 0.0,
+    )
+
+#####################################################################################################
+
+class TranslationMemory:
+    #####################################################################################################
+
+    def __init__(
+        self,
+        *,
+        logger: Logger,
+        max_entries: int,
+        store_path: Path | None,
+        store_max_entries: int,
+    ) -> None:
+        self._logger: Final = logger
+        self._max_entries: Final = max_entries
+        self._store_max_entries: Final = store_max_entries
+        self._entries: Final[OrderedDict[TranslationMemoryKey, str]] = OrderedDict()
+        # one connection per worker, the executor threads take turns on it
+        self._store_lock: Final = Lock()
+        self._store: Connection | None = None
+        self._memory_hits = 0
+        self._store_hits = 0
+        self._misses = 0
+
+        if store_path is not None:
+            try:
+                self._store = _open_store(store_path)
+            except (OSError, SqliteError) as err:
+                logger.warning(f'Translation memory store "{store_path}" is not used: {err}')
+
+        _translation_memories.add(self)
+
+    #####################################################################################################
+
+    @property
+    def stats(self) -> TranslationMemoryStats:
+        return _create_stats(
+            memory_hits=self._memory_hits,
+            store_hits=self._store_hits,
+            misses=self._misses,
+            memory_entries=len(self._entries),
+        )
+
+    #####################################################################################################
+
+    async def get_many(self, keys: Sequence[TranslationMemoryKey]) -> Mapping[TranslationMemoryKey, str]:
+        found: Final[dict[TranslationMemoryKey, str]] = {}
+        store_keys: Final[list[TranslationMemoryKey]] = []
+        for key in keys:
+            translation = self._entries.get(key)
+            if translation is None:
+                store_keys.append(key)
+                continue
+            self._entries.move_to_end(key)
+            self._memory_hits += 1
+            found[key] = translation
+
+        store: Final = self._store
+        if store_keys and store is not None:
+            try:
+                store_found = await get_running_loop().run_in_executor(None, partial(self._read_store, store, store_keys))
+            except SqliteError as err:
+                self._logger.warning(f'Translation memory read failed: {err}')
+                store_found = {}
+            self._store_hits += len(store_found)
+            for key, translation in store_found.items():
+                self._remember(key, translation)
+            found.update(store_found)
+
+        self._misses += len(keys) - len(found)
+        return found
+
+    #####################################################################################################
+
+    async def put_many(self, translations: Mapping[TranslationMemoryKey, str]) -> None:
+        for key, translation in translations.items():
+            self._remember(key, translation)
+        store: Final = self._store
+        if translations and store is not None:
+            try:
+                await get_running_loop().run_in_executor(None, partial(self._write_store, store, dict(translations)))
+            except SqliteError as err:
+                self._logger.warning(f'Translation memory write failed: {err}')
+
+    #####################################################################################################
+
+    def _remember(self, key: TranslationMemoryKey, translation: str) -> None:
+        if self._max_entries <= 0:
+            return
+        entries: Final = self._entries
+        entries[key] = translation
+        entries.move_to_end(key)
+        while len(entries) > self._max_entries:
+            entries.popitem(last=False)
+
+    #####################################################################################################
+
+    def _read_store(self, store: Connection, keys: Sequence[TranslationMemoryKey]) -> dict[TranslationMemoryKey, str]:
+        found: Final[dict[TranslationMemoryKey, str]] = {}
+        with self._store_lock:
+            for key in keys:
+                row = store.execute(
+                    'SELECT translation FROM translation_memory WHERE source_lang = ? AND target_lang = ? AND segment = ?',
+                    key,
+                ).fetchone()
+                if row is not None:
+                    found[key] = row[0]
+        return found
+
+    #####################################################################################################
+
+    def _write_store(self, store: Connection, translations: Mapping[TranslationMemoryKey, str]) -> None:
+        now: Final = time()
+        with self._store_lock, store:
+            store.executemany(
+                'INSERT OR REPLACE INTO translation_memory (source_lang, target_lang, segment, translation, updated_at) '
+                + 'VALUES (?, ?, ?, ?, ?)',
+                [(*key, translation, now) for key, translation in translations.items()],
+            )
+            if self._store_max_entries > 0 and random() < _STORE_TRIM_PROBABILITY:  # noqa: S311
+                # the least recently written rows go first
+                store.execute(
+                    'DELETE FROM translation_memory WHERE rowid IN ('
+                    + 'SELECT rowid FROM translation_memory ORDER BY updated_at DESC LIMIT -1 OFFSET ?)',
+                    (self._store_max_entries,),
+                )
+
+#####################################################################################################
+
+_translation_memories: Final[WeakSet[TranslationMemory]] = WeakSet()
+
+#####################################################################################################
+
+def get_translation_memory_stats() -> TranslationMemoryStats | None:
+    # numbers of this worker process, summed over its translation services
+    translation_memories: Final = tuple(_translation_memories)
+    if not translation_memories:
+        return None
+    memories_stats: Final = tuple(translation_memory.stats for translation_memory in translation_memories)
+    return _create_stats(
+        memory_hits=sum(memory_stats.memory_hits for memory_stats in memories_stats),
+        store_hits=sum(memory_stats.store_hits for memory_stats in memories_stats),
+        misses=sum(memory_stats.misses for memory_stats in memories_stats),
+        memory_entries=sum(memory_stats.memory_entries for memory_stats in memories_stats),
+    )
+
+#####################################################################################################
+
+def _open_store(store_path: Path) -> Connection:
+    store_path.parent.mkdir(parents=True, exist_ok=True)
+    # shared by the web workers: wal lets them read while one of them writes
+    store: Final = _sqlite_connect(store_path, timeout=_STORE_BUSY_TIMEOUT_SEC, check_same_thread=False)
+    store.execute('PRAGMA journal_mode=WAL')
+    with store:
+        store.execute(
+            'CREATE TABLE IF NOT EXISTS translation_memory ('
+            + 'source_lang TEXT NOT NULL, '
+            + 'target_lang TEXT NOT NULL, '
+            + 'segment TEXT NOT NULL, '
+            + 'translation TEXT NOT NULL, '
+            + 'updated_at REAL NOT NULL, '
+            + 'PRIMARY KEY (source_lang, target_lang, segment))',
+        )
+    return store
+
+#####################################################################################################
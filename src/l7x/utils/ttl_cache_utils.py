@@ -0,0 +1,89 @@
+#####################################################################################################
+
+from asyncio import Task, create_task, shield
+from collections.abc import Awaitable, Callable
+from logging import Logger
+from random import uniform
+from time import monotonic
+from typing import Final, Generic, TypeVar
+
+#####################################################################################################
+
+_T = TypeVar('_T')
+
+#####################################################################################################
+
+class AsyncTtlCache(Generic[_T]):
+    #####################################################################################################
+
+    def __init__(
+        self,
+        *,
+        name: str,
+        load: Callable[[], Awaitable[_T]],
+        default: _T,
+        get_ttl_sec: Callable[[_T], float],
+        error_ttl_sec: float,
+        jitter_ratio: float,
+        logger: Logger,
+    ) -> None:
+        self._name: Final = name
+        self._load: Final = load
+        self._get_ttl_sec: Final = get_ttl_sec
+        self._error_ttl_sec: Final = error_ttl_sec
+        self._jitter_ratio: Final = min(max(jitter_ratio, 0.0), 1.0)
+        self._logger: Final = logger
+        self._value = default
+        self._is_loaded = False
+        self._expire_ts = -1.0
+        self._refresh_task: Task[None] | None = None
+
+    #####################################################################################################
+
+    async def get(self) -> _T:
+        # stale-while-revalidate: an expired value is still returned while the background refresh runs,
+        # stale-if-error: a failed refresh keeps the previous value until the retry
+        if monotonic() >= self._expire_ts:
+            refresh_task: Final = self._start_refresh()
+            if not self._is_loaded:
+                # nothing to serve yet; shielded, so a cancelled request does not cancel the shared load
+                await shield(refresh_task)
+        return self._value
+
+    #####################################################################################################
+
+    def invalidate(self) -> None:
+        self._expire_ts = -1.0
+
+    #####################################################################################################
+
+    def _start_refresh(self) -> Task[None]:
+        # single flight: callers that come during the refresh share the same task
+        refresh_task = self._refresh_task
+        if refresh_task is None:
+            refresh_task = create_task(self._refresh())
+            self._refresh_task = refresh_task
+        return refresh_task
+
+    #####################################################################################################
+
+    async def _refresh(self) -> None:
+        try:
+            loaded_value: Final = await self._load()
+        except Exception as err:  # pylint: disable=broad-except
+            self._logger.warning(f'Refresh of "{self._name}" failed, the previous value is kept: {err!r}')
+            self._expire_ts = monotonic() + self._get_jittered_ttl_sec(self._error_ttl_sec)
+        else:
+            self._value = loaded_value
+            self._expire_ts = monotonic() + self._get_jittered_ttl_sec(self._get_ttl_sec(loaded_value))
+        finally:
+            self._is_loaded = True
+            self._refresh_task = None
+
+    #####################################################################################################
+
+    def _get_jittered_ttl_sec(self, ttl_sec: float) -> float:
+        # web workers started together must not all refresh at the same second
+        return ttl_sec * uniform(1 - self._jitter_ratio, 1)  # noqa: S311
+
+#####################################################################################################
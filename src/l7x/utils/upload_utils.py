@@ -0,0 +1,293 @@
+#####################################################################################################
+
+from asyncio import Lock, get_running_loop
+from base64 import b64decode
+from binascii import Error as _BinasciiError
+from collections.abc import AsyncIterable
+from dataclasses import dataclass
+from hashlib import sha256
+from hmac import compare_digest
+from os import replace as _os_replace
+from pathlib import Path
+from shutil import move as _shutil_move
+from tempfile import NamedTemporaryFile
+from time import time
+from typing import Final
+from uuid import uuid4
+
+from aiofiles import open as _aiofiles_open
+from starlette import status
+
+from l7x.types.errors import AppException
+from l7x.utils.file_utils import SpooledFile, calc_file_sha256, remove_file_quietly
+from l7x.utils.orjson_utils import JSONDecodeError, orjson_dumps, orjson_loads
+
+#####################################################################################################
+
+_DATA_SUFFIX: Final = '.part'
+_INFO_SUFFIX: Final = '.json'
+_CHECKSUM_ALGORITHM: Final = 'sha256'
+
+#####################################################################################################
+
+class UploadException(AppException):
+    #####################################################################################################
+
+    def __init__(self, detail: str, status_code: int, err_code: str = 'UPLOAD_ERROR') -> None:
+        super().__init__(detail=detail, err_code=err_code, status_code=status_code)
+
+#####################################################################################################
+
+@dataclass(frozen=True, kw_only=True)
+class UploadInfo:
+    upload_id: str
+    length: int
+    offset: int
+    file_name: str
+    mime_type: str
+
+#####################################################################################################
+
+@dataclass(frozen=True, kw_only=True)
+class CompletedUpload:
+    file_name: str
+    mime_type: str
+    spooled_file: SpooledFile
+
+#####################################################################################################
+
+def parse_upload_metadata(upload_metadata: str) -> dict[str, str]:
+    # tus format: comma separated "key base64(value)" pairs
+    metadata: Final[dict[str, str]] = {}
+    for metadata_pair in upload_metadata.split(','):
+        metadata_parts = metadata_pair.strip().split(' ', 1)
+        if not metadata_parts[0]:
+            continue
+        try:
+            metadata[metadata_parts[0]] = b64decode(metadata_parts[1]).decode('utf-8') if len(metadata_parts) > 1 else ''
+        except (_BinasciiError, UnicodeDecodeError) as err:
+            raise UploadException(f'Invalid Upload-Metadata: {err}', status.HTTP_400_BAD_REQUEST) from err
+    return metadata
+
+#####################################################################################################
+
+def parse_upload_checksum(upload_checksum: str) -> bytes:
+    checksum_parts: Final = upload_checksum.strip().split(' ', 1)
+    if len(checksum_parts) != 2 or checksum_parts[0].lower() != _CHECKSUM_ALGORITHM:
+        raise UploadException(f'Only {_CHECKSUM_ALGORITHM} checksums are supported', status.HTTP_400_BAD_REQUEST)
+    try:
+        return b64decode(checksum_parts[1], validate=True)
+    except _BinasciiError as err:
+        raise UploadException(f'Invalid Upload-Checksum: {err}', status.HTTP_400_BAD_REQUEST) from err
+
+#####################################################################################################
+
+class ResumableUploadStore:
+    #####################################################################################################
+
+    def __init__(
+        self,
+        *,
+        upload_dir: Path,
+        max_size_in_byte: int,
+        expire_sec: float,
+        spool_dir: Path | None,
+        max_pending_count: int,
+        max_pending_size_in_byte: int,
+    ) -> None:
+        self._upload_dir: Final = upload_dir
+        self._max_size_in_byte: Final = max_size_in_byte
+        self._expire_sec: Final = expire_sec
+        self._max_pending_count: Final = max_pending_count
+        self._max_pending_size_in_byte: Final = max_pending_size_in_byte
+        self._spool_dir: Final = spool_dir
+        # chunks of one upload are appended one by one, the client never sends them in parallel
+        self._locks: Final[dict[str, Lock]] = {}
+        # a lock is dropped with its last user: a released lock may still have a waiter that did not take it yet
+        self._lock_users_counts: Final[dict[str, int]] = {}
+
+        upload_dir.mkdir(parents=True, exist_ok=True)
+        if spool_dir is not None:
+            spool_dir.mkdir(parents=True, exist_ok=True)
+
+    #####################################################################################################
+
+    @property
+    def max_size_in_byte(self) -> int:
+        return self._max_size_in_byte
+
+    #####################################################################################################
+
+    def create(self, *, length: int, file_name: str, mime_type: str) -> UploadInfo:
+        if length <= 0:
+            raise UploadException('Upload-Length must be positive', status.HTTP_400_BAD_REQUEST)
+        if length > self._max_size_in_byte:
+            raise UploadException(
+                f'Upload of {length} bytes exceeds the limit of {self._max_size_in_byte} bytes',
+                status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+
+        self._remove_expired()
+        self._check_pending_limits(length)
+
+        upload_id: Final = uuid4().hex
+        self._get_data_path(upload_id).touch()
+        self._write_info(upload_id, {'length': length, 'file_name': file_name, 'mime_type': mime_type, 'created_at': time()})
+        return UploadInfo(upload_id=upload_id, length=length, offset=0, file_name=file_name, mime_type=mime_type)
+
+    #####################################################################################################
+
+    def get_info(self, upload_id: str) -> UploadInfo:
+        upload_info: Final = self._read_info(upload_id)
+        try:
+            offset: Final = self._get_data_path(upload_id).stat().st_size
+        except FileNotFoundError as err:
+            raise UploadException('Upload not found', status.HTTP_404_NOT_FOUND) from err
+        return UploadInfo(
+            upload_id=upload_id,
+            length=int(upload_info['length']),
+            offset=offset,
+            file_name=str(upload_info['file_name']),
+            mime_type=str(upload_info['mime_type']),
+        )
+
+    #####################################################################################################
+
+    async def append(self, upload_id: str, *, offset: int, chunks: AsyncIterable[bytes], checksum: bytes | None) -> UploadInfo:
+        upload_lock: Final = self._locks.setdefault(upload_id, Lock())
+        self._lock_users_counts[upload_id] = self._lock_users_counts.get(upload_id, 0) + 1
+        try:
+            async with upload_lock:
+                return await self._append_locked(upload_id, offset=offset, chunks=chunks, checksum=checksum)
+        finally:
+            lock_users_count = self._lock_users_counts[upload_id] - 1
+            if lock_users_count:
+                self._lock_users_counts[upload_id] = lock_users_count
+            else:
+                del self._lock_users_counts[upload_id]
+                del self._locks[upload_id]
+
+    #####################################################################################################
+
+    async def take_completed(self, upload_id: str) -> CompletedUpload:
+        upload_info: Final = self.get_info(upload_id)
+        if upload_info.offset != upload_info.length:
+            raise UploadException('Upload is not completed', status.HTTP_409_CONFLICT)
+
+        # moved out of the store, from now the page that took it owns the file
+        with NamedTemporaryFile(dir=self._spool_dir, suffix=Path(upload_info.file_name).suffix, delete=False) as target_file:
+            target_path: Final = Path(target_file.name)
+        try:
+            # a copy when the spool dir is on another filesystem, so off the event loop
+            await get_running_loop().run_in_executor(None, _shutil_move, self._get_data_path(upload_id), target_path)
+        except OSError as err:
+            remove_file_quietly(target_path)
+            raise UploadException(f'Upload cannot be moved to the spool dir: {err}', status.HTTP_500_INTERNAL_SERVER_ERROR) from err
+        remove_file_quietly(self._get_info_path(upload_id))
+
+        content_hash: Final = await get_running_loop().run_in_executor(None, calc_file_sha256, target_path)
+        return CompletedUpload(
+            file_name=upload_info.file_name,
+            mime_type=upload_info.mime_type,
+            spooled_file=SpooledFile(path=target_path, size_in_byte=upload_info.length, content_hash=content_hash),
+        )
+
+    #####################################################################################################
+
+    async def _append_locked(self, upload_id: str, *, offset: int, chunks: AsyncIterable[bytes], checksum: bytes | None) -> UploadInfo:
+        upload_info: Final = self.get_info(upload_id)
+        if offset != upload_info.offset:
+            raise UploadException(f'Upload-Offset {offset} does not match {upload_info.offset}', status.HTTP_409_CONFLICT)
+
+        remaining_size: Final = upload_info.length - offset
+        chunk_hash: Final = sha256()
+        written_size = 0
+        data_path: Final = self._get_data_path(upload_id)
+        async with _aiofiles_open(data_path, 'r+b') as data_file:
+            await data_file.seek(offset)
+            try:
+                async for chunk in chunks:
+                    written_size += len(chunk)
+                    if written_size > remaining_size:
+                        raise UploadException('Chunk exceeds Upload-Length', status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+                    chunk_hash.update(chunk)
+                    await data_file.write(chunk)
+                if checksum is not None and not compare_digest(chunk_hash.digest(), checksum):
+                    raise UploadException('Checksum mismatch', 460, err_code='CHECKSUM_MISMATCH')
+            except BaseException:
+                # the chunk is written all or nothing, the client resends it from the same offset
+                await data_file.truncate(offset)
+                raise
+            await data_file.flush()
+
+        return UploadInfo(
+            upload_id=upload_id,
+            length=upload_info.length,
+            offset=offset + written_size,
+            file_name=upload_info.file_name,
+            mime_type=upload_info.mime_type,
+        )
+
+    #####################################################################################################
+
+    def _get_data_path(self, upload_id: str) -> Path:
+        if not upload_id.isalnum():
+            raise UploadException('Upload not found', status.HTTP_404_NOT_FOUND)
+        return self._upload_dir / f'{upload_id}{_DATA_SUFFIX}'
+
+    #####################################################################################################
+
+    def _get_info_path(self, upload_id: str) -> Path:
+        if not upload_id.isalnum():
+            raise UploadException('Upload not found', status.HTTP_404_NOT_FOUND)
+        return self._upload_dir / f'{upload_id}{_INFO_SUFFIX}'
+
+    #####################################################################################################
+
+    def _read_info(self, upload_id: str) -> dict[str, object]:
+        try:
+            return orjson_loads(self._get_info_path(upload_id).read_bytes())
+        except (FileNotFoundError, JSONDecodeError) as err:
+            raise UploadException('Upload not found', status.HTTP_404_NOT_FOUND) from err
+
+    #####################################################################################################
+
+    def _write_info(self, upload_id: str, upload_info: dict[str, object]) -> None:
+        with NamedTemporaryFile(mode='wb', dir=self._upload_dir, suffix='.tmp', delete=False) as info_file:
+            info_file.write(orjson_dumps(upload_info))
+        _os_replace(info_file.name, self._get_info_path(upload_id))
+
+    #####################################################################################################
+
+    def _check_pending_limits(self, length: int) -> None:
+        # anyone may create an upload: the declared lengths are reserved up front,
+        # counted from the dir and not from memory, since the workers share it
+        pending_count = 0
+        pending_size_in_byte = 0
+        for info_path in self._upload_dir.glob(f'*{_INFO_SUFFIX}'):
+            try:
+                upload_info = orjson_loads(info_path.read_bytes())
+            except (FileNotFoundError, JSONDecodeError):
+                continue
+            pending_count += 1
+            pending_size_in_byte += int(upload_info.get('length', 0))
+
+        if self._max_pending_count > 0 and pending_count >= self._max_pending_count:
+            raise UploadException('Too many pending uploads, try again later', status.HTTP_507_INSUFFICIENT_STORAGE)
+        if self._max_pending_size_in_byte > 0 and pending_size_in_byte + length > self._max_pending_size_in_byte:
+            raise UploadException('Not enough space for the upload, try again later', status.HTTP_507_INSUFFICIENT_STORAGE)
+
+    #####################################################################################################
+
+    def _remove_expired(self) -> None:
+        expired_ts: Final = time() - self._expire_sec
+        for data_path in self._upload_dir.glob(f'*{_DATA_SUFFIX}'):
+            try:
+                if data_path.stat().st_mtime >= expired_ts:
+                    continue
+            except FileNotFoundError:
+                continue
+            remove_file_quietly(data_path)
+            remove_file_quietly(data_path.with_suffix(_INFO_SUFFIX))
+
+#####################################################################################################
@@ -0,0 +1,108 @@
+#####################################################################################################
+
+from collections.abc import Callable
+from contextlib import ExitStack
+from http import HTTPStatus
+from logging import Logger
+from time import monotonic
+from typing import Any, Final, TypeAlias
+
+from aiohttp import ClientSession
+
+from l7x.configs.settings import AppSettings
+from l7x.utils.aiohttp_utils import get_connection_metrics, get_endpoint_name
+from l7x.utils.orjson_utils import JSONDecodeError, orjson_loads
+from l7x.utils.upstream_transport_utils import UpstreamForm, create_upstream_transport
+from l7x.utils.upstream_utils import UpstreamClient, UpstreamError, get_upstream_client, raise_for_retryable_status
+
+#####################################################################################################
+
+# called once per attempt: a multipart body with open files cannot be sent twice,
+# files opened for the form are registered in the exit stack and closed after the attempt
+CreateUpstreamForm: TypeAlias = Callable[[ExitStack], UpstreamForm]
+
+#####################################################################################################
+
+class UpstreamStatusError(UpstreamError):
+    def __init__(self, url: str, status: int) -> None:
+        super().__init__(f'Upstream "{url}" returned status {status}')
+        self.url: Final = url
+        self.status: Final = status
+
+#####################################################################################################
+
+class UpstreamResponseError(UpstreamError):
+    """Raise when the upstream answered 200 with a body that is not a valid JSON."""
+
+#####################################################################################################
+
+class UpstreamEndpoint:
+    #####################################################################################################
+
+    def __init__(
+        self,
+        *,
+        url: str,
+        aiohttp_client: ClientSession,
+        app_settings: AppSettings,
+        logger: Logger,
+        read_timeout_sec: float,
+    ) -> None:
+        self._url: Final = url
+        # the url scheme picks the transport: http(s) and unix go through aiohttp, h2 and h2c through httpx
+        self._transport: Final = create_upstream_transport(
+            url,
+            default_client=aiohttp_client,
+            app_settings=app_settings,
+            read_timeout_sec=read_timeout_sec,
+        )
+        self._upstream: Final = get_upstream_client(url, app_settings, logger)
+
+    #####################################################################################################
+
+    @property
+    def url(self) -> str:
+        return self._url
+
+    #####################################################################################################
+
+    @property
+    def upstream(self) -> UpstreamClient:
+        return self._upstream
+
+    #####################################################################################################
+
+    async def request_json(
+        self,
+        method: str,
+        *,
+        json_body: Any = None,
+        create_form: CreateUpstreamForm | None = None,
+        idempotent: bool = True,
+        hedge: bool = False,
+    ) -> Any:
+        endpoint_name: Final = get_endpoint_name(method, self._transport.request_url)
+
+        async def _send_request() -> Any:
+            start_ts: Final = monotonic()
+            with ExitStack() as exit_stack:
+                upstream_resp = await self._transport.send(
+                    method,
+                    json_body=json_body,
+                    form=None if create_form is None else create_form(exit_stack),
+                )
+            # the transport has read the body and released the connection: the trace hooks end at the response headers,
+            # so the total latency of every answered request, an error status included, is only seen here
+            get_connection_metrics().record(endpoint_name, 'total', monotonic() - start_ts)
+            raise_for_retryable_status(upstream_resp.status)
+            if upstream_resp.status != HTTPStatus.OK:
+                raise UpstreamStatusError(self._url, upstream_resp.status)
+
+            try:
+                return orjson_loads(upstream_resp.body)
+            except JSONDecodeError as err:
+                raise UpstreamResponseError(f'Upstream "{self._url}" returned invalid JSON: {err}') from err
+
+        return await self._upstream.call(_send_request, idempotent=idempotent, hedge=hedge)
+
+#####################################################################################################
@@ -0,0 +1,64 @@
+#####################################################################################################
+
+from collections.abc import Mapping
+from logging import Logger
+from typing import Any, Final
+
+from l7x.types.lang_services import LanguageDetail
+from l7x.utils.mapping_utils import CompiledKeysPath, FindValueByKeysSequenceException
+
+#####################################################################################################
+
+# the paths are compiled once per process, every response only walks them
+_TRANSLATED_TEXT_PATH: Final = CompiledKeysPath('translatedText', ret_type=str)
+_DETECTED_LANGUAGE_PATH: Final = CompiledKeysPath('result', 0, 0, 'language_code', ret_type=str)
+_RECOGNIZED_TEXT_PATH: Final = CompiledKeysPath('result', ret_type=str)
+
+#####################################################################################################
+
+def _find_text(path: CompiledKeysPath[str], response_json: Mapping[str, Any], logger: Logger | None) -> str:
+    # a field of an unexpected type is an upstream problem, the callers get an empty text as for a missing one
+    try:
+        return path.find(response_json, default='', logger=logger)
+    except (FindValueByKeysSequenceException, TypeError) as err:
+        if logger is not None:
+            logger.warning(f'Upstream response has an unexpected shape at {path.keys}: {err}')
+        return ''
+
+#####################################################################################################
+
+def decode_languages(languages_json: Any) -> Mapping[str, LanguageDetail]:
+    # api/get-languages and /get-speech-to-text-languages: [{"code_alpha_1": ..., "codeName": ..., "rtl": ...}]
+    if not isinstance(languages_json, list):
+        return {}
+    return {
+        lang['code_alpha_1']: LanguageDetail(code=lang.get('codeName'), rtl=lang.get('rtl'))
+        for lang in languages_json
+        if isinstance(lang, dict) and 'code_alpha_1' in lang
+    }
+
+#####################################################################################################
+
+def decode_translated_text(translate_json: Any, logger: Logger | None = None) -> str:
+    # api/translate: {"translatedText": ..., "detectedSourceLanguage": ...}
+    if not isinstance(translate_json, dict):
+        return ''
+    return _find_text(_TRANSLATED_TEXT_PATH, translate_json, logger)
+
+#####################################################################################################
+
+def decode_detected_language(detected_lang_json: Any, logger: Logger | None = None) -> str:
+    # api/detect-language: {"result": [[{"language_code": ...}]]}
+    if not isinstance(detected_lang_json, dict):
+        return ''
+    return _find_text(_DETECTED_LANGUAGE_PATH, detected_lang_json, logger)
+
+#####################################################################################################
+
+def decode_recognized_text(recognize_json: Any, logger: Logger | None = None) -> str:
+    # /speech-to-text: {"result": ...}
+    if not isinstance(recognize_json, dict):
+        return ''
+    return _find_text(_RECOGNIZED_TEXT_PATH, recognize_json, logger)
+
+#####################################################################################################
@@ -0,0 +1,286 @@
+#####################################################################################################
+
+from abc import ABC, abstractmethod
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, BinaryIO, Final
+from urllib.parse import unquote, urljoin, urlsplit, urlunsplit
+
+from aiohttp import ClientSession, ClientTimeout, FormData, UnixConnector
+
+from l7x.configs.settings import AppSettings
+from l7x.utils.aiohttp_utils import ConnectionPoolSettings, JsonPayload, get_connection_metrics, get_host_aiohttp_client
+from l7x.utils.compression_utils import ZSTD_ENCODING, CompressionSettings, compress_body, decompress_zstd_body
+from l7x.utils.orjson_utils import orjson_dumps, orjson_dumps_to_str
+from l7x.utils.upstream_utils import UpstreamTransportError
+
+#####################################################################################################
+
+UNIX_SCHEME: Final = 'unix'
+HTTP2_SCHEME: Final = 'h2'
+HTTP2_CLEARTEXT_SCHEME: Final = 'h2c'
+
+# the host of a unix socket url is the percent encoded socket path: unix://%2Frun%2Frecognizer.sock/api
+_UNIX_SOCKET_HOST: Final = 'localhost'
+# urljoin does not know the custom schemes, the join is done on the http form of the url
+_CUSTOM_SCHEMES_AS_HTTP: Final = MappingProxyType({
+    UNIX_SCHEME: 'http',
+    HTTP2_SCHEME: 'https',
+    HTTP2_CLEARTEXT_SCHEME: 'http',
+})
+
+#####################################################################################################
+
+@dataclass(frozen=True, kw_only=True)
+class UpstreamForm:
+    fields: Mapping[str, str] = field(default_factory=dict)
+    file_field: str
+    file_name: str
+    file_content_type: str
+    file_content: bytes | memoryview | BinaryIO
+
+#####################################################################################################
+
+@dataclass(frozen=True, kw_only=True)
+class UpstreamResponse:
+    status: int
+    body: bytes
+
+#####################################################################################################
+
+def join_upstream_url(base_url: str, path: str) -> str:
+    url_parts: Final = urlsplit(base_url)
+    http_scheme: Final = _CUSTOM_SCHEMES_AS_HTTP.get(url_parts.scheme)
+    if http_scheme is None:
+        return urljoin(base_url, path)
+    joined_url_parts: Final = urlsplit(urljoin(urlunsplit(url_parts._replace(scheme=http_scheme)), path))
+    return urlunsplit(joined_url_parts._replace(scheme=url_parts.scheme))
+
+#####################################################################################################
+
+class UpstreamTransport(ABC):
+    #####################################################################################################
+
+    def __init__(self, *, request_url: str, compression_settings: CompressionSettings) -> None:
+        self._request_url: Final = request_url
+        self._compression_settings: Final = compression_settings
+        self._request_headers: Final = {'Accept-Encoding': compression_settings.accept_encoding} if compression_settings.accept_encoding else {}
+
+    #####################################################################################################
+
+    @property
+    def request_url(self) -> str:
+        return self._request_url
+
+    #####################################################################################################
+
+    @abstractmethod
+    async def send(
+        self,
+        method: str,
+        *,
+        json_body: Any = None,
+        form: UpstreamForm | None = None,
+    ) -> UpstreamResponse:
+        raise NotImplementedError()
+
+#####################################################################################################
+
+class AiohttpTransport(UpstreamTransport):
+    #####################################################################################################
+
+    def __init__(
+        self,
+        *,
+        aiohttp_client: ClientSession,
+        request_url: str,
+        compression_settings: CompressionSettings,
+        connect_timeout_sec: float,
+        read_timeout_sec: float,
+    ) -> None:
+        super().__init__(request_url=request_url, compression_settings=compression_settings)
+        self._aiohttp_client: Final = aiohttp_client
+        # no total timeout: a long recognition is fine while the upstream keeps the socket alive
+        self._timeout: Final = ClientTimeout(total=None, sock_connect=connect_timeout_sec, sock_read=read_timeout_sec)
+
+    #####################################################################################################
+
+    async def send(
+        self,
+        method: str,
+        *,
+        json_body: Any = None,
+        form: UpstreamForm | None = None,
+    ) -> UpstreamResponse:
+        request_data: Any = None
+        if json_body is not None:
+            request_data = JsonPayload(json_body, self._compression_settings)
+        elif form is not None:
+            request_data = FormData()
+            for field_name, field_value in form.fields.items():
+                request_data.add_field(field_name, field_value)
+            # file objects are streamed into the multipart body by aiohttp chunk by chunk,
+            # it is not compressed: that needs the whole file in memory and the audio is mostly compressed already
+            request_data.add_field(form.file_field, form.file_content, filename=form.file_name, content_type=form.file_content_type)
+
+        # the context manager gives the connection back to the pool on every path, errors included
+        async with self._aiohttp_client.request(
+            method,
+            self._request_url,
+            data=request_data,
+            headers=self._request_headers,
+            timeout=self._timeout,
+        ) as upstream_resp:
+            response_body = await upstream_resp.read()
+            content_encoding = upstream_resp.headers.get('Content-Encoding', '')
+        if content_encoding == ZSTD_ENCODING:
+            response_body = decompress_zstd_body(response_body)
+        return UpstreamResponse(status=upstream_resp.status, body=response_body)
+
+#####################################################################################################
+
+class HttpxTransport(UpstreamTransport):
+    #####################################################################################################
+
+    def __init__(
+        self,
+        *,
+        httpx_client: Any,
+        request_url: str,
+        compression_settings: CompressionSettings,
+        connect_timeout_sec: float,
+        read_timeout_sec: float,
+    ) -> None:
+        from httpx import Timeout  # pylint: disable=import-outside-toplevel
+
+        super().__init__(request_url=request_url, compression_settings=compression_settings)
+        self._httpx_client: Final = httpx_client
+        self._timeout: Final = Timeout(connect=connect_timeout_sec, read=read_timeout_sec, write=None, pool=None)
+
+    #####################################################################################################
+
+    async def send(
+        self,
+        method: str,
+        *,
+        json_body: Any = None,
+        form: UpstreamForm | None = None,
+    ) -> UpstreamResponse:
+        from httpx import TransportError  # pylint: disable=import-outside-toplevel
+
+        request_headers: Final = dict(self._request_headers)
+        request_kwargs: Final[dict[str, Any]] = {'headers': request_headers}
+        if json_body is not None:
+            request_kwargs['content'], content_encoding = compress_body(orjson_dumps(json_body), self._compression_settings)
+            request_headers['Content-Type'] = 'application/json'
+            if content_encoding is not None:
+                request_headers['Content-Encoding'] = content_encoding
+        elif form is not None:
+            request_kwargs['data'] = dict(form.fields)
+            request_kwargs['files'] = {form.file_field: (form.file_name, form.file_content, form.file_content_type)}
+
+        try:
+            upstream_resp: Final = await self._httpx_client.request(method, self._request_url, timeout=self._timeout, **request_kwargs)
+        except TransportError as err:
+            raise UpstreamTransportError(f'HTTP/2 request to "{self._request_url}" failed: {err!r}') from err
+        response_body = upstream_resp.content
+        if upstream_resp.headers.get('Content-Encoding', '') == ZSTD_ENCODING:
+            # httpx decodes zstd only when it finds zstandard itself, the frame magic tells whether it did
+            response_body = decompress_zstd_body(response_body)
+        return UpstreamResponse(status=upstream_resp.status_code, body=response_body)
+
+#####################################################################################################
+
+_unix_aiohttp_clients: Final[dict[str, ClientSession]] = {}
+_httpx_clients: Final[dict[str, Any]] = {}
+
+#####################################################################################################
+
+def _get_unix_aiohttp_client(socket_path: str, app_settings: AppSettings) -> ClientSession:
+    unix_client = _unix_aiohttp_clients.get(socket_path)
+    if unix_client is None:
+        pool_settings: Final = ConnectionPoolSettings.from_settings(app_settings)
+        get_connection_metrics().register_pool(f'{UNIX_SCHEME}:{socket_path}', pool_settings)
+        unix_client = ClientSession(
+            connector=UnixConnector(
+                path=socket_path,
+                limit=pool_settings.limit,
+                # force_close and keepalive_timeout are mutually exclusive in aiohttp
+                keepalive_timeout=None if pool_settings.force_close else pool_settings.keepalive_timeout_sec,
+                force_close=pool_settings.force_close,
+            ),
+            json_serialize=orjson_dumps_to_str,
+            trace_configs=[get_connection_metrics().create_trace_config()],
+        )
+        _unix_aiohttp_clients[socket_path] = unix_client
+    return unix_client
+
+#####################################################################################################
+
+def _get_httpx_client(netloc: str, *, cleartext: bool, app_settings: AppSettings) -> Any:
+    httpx_client = _httpx_clients.get(netloc)
+    if httpx_client is None:
+        try:
+            # optional: only the h2 and h2c upstreams need it
+            from httpx import AsyncClient, Limits  # pylint: disable=import-outside-toplevel
+        except ImportError as err:
+            raise ImportError(f'The "{netloc}" upstream uses HTTP/2, install httpx[http2] for it') from err
+
+        pool_settings: Final = ConnectionPoolSettings.from_settings(app_settings)
+        httpx_client = AsyncClient(
+            # a single multiplexed connection carries the concurrent calls, no head-of-line connection limit
+            http1=not cleartext,
+            http2=True,
+            limits=Limits(
+                max_connections=pool_settings.limit or None,
+                keepalive_expiry=None if pool_settings.force_close else pool_settings.keepalive_timeout_sec,
+            ),
+        )
+        _httpx_clients[netloc] = httpx_client
+    return httpx_client
+
+#####################################################################################################
+
+def create_upstream_transport(
+    url: str,
+    *,
+    default_client: ClientSession,
+    app_settings: AppSettings,
+    read_timeout_sec: float,
+) -> UpstreamTransport:
+    url_parts: Final = urlsplit(url)
+    connect_timeout_sec: Final = app_settings.upstream_connect_timeout_sec
+    # some upstreams do not accept compressed bodies, so the defaults can be changed per host
+    compression_settings: Final = CompressionSettings.from_settings(app_settings).with_overrides(
+        app_settings.upstream_compression_overrides.get(url_parts.netloc, {}),
+    )
+
+    if url_parts.scheme == UNIX_SCHEME:
+        return AiohttpTransport(
+            aiohttp_client=_get_unix_aiohttp_client(unquote(url_parts.netloc), app_settings),
+            request_url=urlunsplit(url_parts._replace(scheme='http', netloc=_UNIX_SOCKET_HOST)),
+            compression_settings=compression_settings,
+            connect_timeout_sec=connect_timeout_sec,
+            read_timeout_sec=read_timeout_sec,
+        )
+
+    if url_parts.scheme in {HTTP2_SCHEME, HTTP2_CLEARTEXT_SCHEME}:
+        is_cleartext: Final = url_parts.scheme == HTTP2_CLEARTEXT_SCHEME
+        return HttpxTransport(
+            httpx_client=_get_httpx_client(url_parts.netloc, cleartext=is_cleartext, app_settings=app_settings),
+            request_url=urlunsplit(url_parts._replace(scheme=_CUSTOM_SCHEMES_AS_HTTP[url_parts.scheme])),
+            compression_settings=compression_settings,
+            connect_timeout_sec=connect_timeout_sec,
+            read_timeout_sec=read_timeout_sec,
+        )
+
+    return AiohttpTransport(
+        aiohttp_client=get_host_aiohttp_client(url, default_client, app_settings),
+        request_url=url,
+        compression_settings=compression_settings,
+        connect_timeout_sec=connect_timeout_sec,
+        read_timeout_sec=read_timeout_sec,
+    )
+
+#####################################################################################################
@@ -0,0 +1,453 @@
+#####################################################################################################
+
+from asyncio import FIRST_COMPLETED, CancelledError, Future, Task, TimeoutError as AsyncTimeoutError, create_task, get_running_loop, sleep, wait
+from collections import deque
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from enum import StrEnum
+from http import HTTPStatus
+from logging import Logger
+from math import inf
+from random import uniform
+from time import monotonic
+from typing import Final, TypeVar
+from urllib.parse import urlsplit
+
+from aiohttp import ClientError
+
+from l7x.configs.settings import AppSettings
+
+#####################################################################################################
+
+_T = TypeVar('_T')
+
+_LATENCY_WINDOW_SIZE: Final = 256
+_HEDGE_MIN_SAMPLES: Final = 20
+_LIMIT_DECREASE_RATIO: Final = 0.9
+_BASELINE_LATENCY_ALPHA: Final = 0.05
+
+# statuses that say nothing about the request itself, so repeating it may succeed
+RETRYABLE_STATUSES: Final = frozenset([
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+])
+
+#####################################################################################################
+
+class UpstreamError(Exception):
+    """Raise when the upstream call failed after all attempts."""
+
+#####################################################################################################
+
+class UpstreamUnavailableError(UpstreamError):
+    """Raise when the circuit breaker is open and the call is not sent."""
+
+#####################################################################################################
+
+class UpstreamTransportError(UpstreamError):
+    """Raise when a non aiohttp transport failed to deliver the request or to read the answer."""
+
+#####################################################################################################
+
+class RetryableStatusError(UpstreamError):
+    def __init__(self, status: int) -> None:
+        super().__init__(f'Upstream returned status {status}')
+        self.status: Final = status
+
+#####################################################################################################
+
+def raise_for_retryable_status(status: int) -> None:
+    if status in RETRYABLE_STATUSES or status >= HTTPStatus.INTERNAL_SERVER_ERROR:
+        raise RetryableStatusError(status)
+
+#####################################################################################################
+
+@dataclass(frozen=True, kw_only=True)
+class UpstreamPolicy:
+    max_attempts: int
+    backoff_base_sec: float
+    backoff_max_sec: float
+    hedge_percentile: float
+    breaker_failures_threshold: int
+    breaker_reset_sec: float
+    concurrency_initial: int
+    concurrency_min: int
+    concurrency_max: int
+    concurrency_latency_tolerance: float
+
+    #####################################################################################################
+
+    @classmethod
+    def from_settings(cls, app_settings: AppSettings) -> 'UpstreamPolicy':
+        return cls(
+            max_attempts=max(app_settings.upstream_max_attempts, 1),
+            backoff_base_sec=app_settings.upstream_backoff_base_sec,
+            backoff_max_sec=app_settings.upstream_backoff_max_sec,
+            hedge_percentile=app_settings.upstream_hedge_percentile,
+            breaker_failures_threshold=app_settings.upstream_breaker_failures_threshold,
+            breaker_reset_sec=app_settings.upstream_breaker_reset_sec,
+            concurrency_initial=app_settings.upstream_concurrency_initial,
+            concurrency_min=max(app_settings.upstream_concurrency_min, 1),
+            concurrency_max=app_settings.upstream_concurrency_max,
+            concurrency_latency_tolerance=app_settings.upstream_concurrency_latency_tolerance,
+        )
+
+#####################################################################################################
+
+class CircuitState(StrEnum):
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+#####################################################################################################
+
+class CircuitBreaker:
+    #####################################################################################################
+
+    def __init__(self, *, failures_threshold: int, reset_sec: float) -> None:
+        self._failures_threshold: Final = failures_threshold
+        self._reset_sec: Final = reset_sec
+        self._state = CircuitState.CLOSED
+        self._failures_count = 0
+        self._opened_ts = 0.0
+        self._probe_in_flight = False
+
+    #####################################################################################################
+
+    @property
+    def state(self) -> CircuitState:
+        return self._state
+
+    #####################################################################################################
+
+    def allow_request(self) -> bool:
+        if self._failures_threshold <= 0 or self._state == CircuitState.CLOSED:
+            return True
+        if self._state == CircuitState.OPEN:
+            if monotonic() - self._opened_ts < self._reset_sec:
+                return False
+            self._state = CircuitState.HALF_OPEN
+            self._probe_in_flight = False
+        # half open: a single probe decides whether the upstream is back
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+
+    #####################################################################################################
+
+    def record_success(self) -> None:
+        self._state = CircuitState.CLOSED
+        self._failures_count = 0
+        self._probe_in_flight = False
+
+    #####################################################################################################
+
+    def release_probe(self) -> None:
+        self._probe_in_flight = False
+
+    #####################################################################################################
+
+    def record_failure(self) -> None:
+        self._failures_count += 1
+        self._probe_in_flight = False
+        if self._state == CircuitState.HALF_OPEN or self._failures_count >= self._failures_threshold > 0:
+            self._state = CircuitState.OPEN
+            self._opened_ts = monotonic()
+
+#####################################################################################################
+
+class AimdConcurrencyLimiter:
+    #####################################################################################################
+
+    def __init__(self, *, initial_limit: int, min_limit: int, max_limit: int, latency_tolerance: float) -> None:
+        self._min_limit: Final = min_limit
+        self._max_limit: Final = max(max_limit, min_limit)
+        self._latency_tolerance: Final = latency_tolerance
+        self._limit = float(min(max(initial_limit, min_limit), self._max_limit))
+        self._in_flight_count = 0
+        self._baseline_latency: float | None = None
+        self._decreased_ts = -inf
+        self._waiters: Final[deque[Future[None]]] = deque()
+
+    #####################################################################################################
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    #####################################################################################################
+
+    @property
+    def in_flight_count(self) -> int:
+        return self._in_flight_count
+
+    #####################################################################################################
+
+    @property
+    def queued_count(self) -> int:
+        return len(self._waiters)
+
+    #####################################################################################################
+
+    async def acquire(self) -> None:
+        if not self._waiters and self._in_flight_count < self.limit:
+            self._in_flight_count += 1
+            return
+
+        # over the limit: wait locally in FIFO order instead of piling onto the upstream
+        waiter: Final[Future[None]] = get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # the slot was already handed over to this waiter
+                self._in_flight_count -= 1
+                self._wake_waiters()
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+    #####################################################################################################
+
+    def release(self, started_ts: float, latency_sec: float | None, *, dropped: bool) -> None:
+        was_saturated: Final = self._in_flight_count >= self.limit
+        self._in_flight_count -= 1
+
+        if dropped:
+            # multiplicative decrease on errors and overload answers
+            self._decrease(started_ts)
+        elif latency_sec is not None:
+            baseline_latency = self._baseline_latency
+            if baseline_latency is None:
+                baseline_latency = latency_sec
+            if latency_sec > baseline_latency * self._latency_tolerance:
+                # queueing inside the upstream: latency grows before errors start
+                self._decrease(started_ts)
+            elif was_saturated:
+                # additive increase, about one slot per limit of completed calls
+                self._limit = min(self._max_limit, self._limit + 1 / self._limit)
+            self._baseline_latency = baseline_latency + (latency_sec - baseline_latency) * _BASELINE_LATENCY_ALPHA
+
+        self._wake_waiters()
+
+    #####################################################################################################
+
+    def _decrease(self, started_ts: float) -> None:
+        # once per round trip: the calls sent before the last decrease report the load of the old limit
+        if started_ts < self._decreased_ts:
+            return
+        self._limit = max(self._min_limit, self._limit * _LIMIT_DECREASE_RATIO)
+        self._decreased_ts = monotonic()
+
+    #####################################################################################################
+
+    def _wake_waiters(self) -> None:
+        waiters: Final = self._waiters
+        while waiters and self._in_flight_count < self.limit:
+            waiter = waiters.popleft()
+            if waiter.done():
+                continue
+            self._in_flight_count += 1
+            waiter.set_result(None)
+
+#####################################################################################################
+
+@dataclass(frozen=True, kw_only=True)
+class UpstreamHost:
+    # the health belongs to the host and is shared by all of its endpoints
+    breaker: CircuitBreaker
+
+    #####################################################################################################
+
+    @classmethod
+    def from_policy(cls, policy: UpstreamPolicy) -> 'UpstreamHost':
+        return cls(
+            breaker=CircuitBreaker(
+                failures_threshold=policy.breaker_failures_threshold,
+                reset_sec=policy.breaker_reset_sec,
+            ),
+        )
+
+#####################################################################################################
+
+class UpstreamClient:
+    #####################################################################################################
+
+    def __init__(self, name: str, policy: UpstreamPolicy, logger: Logger, *, host: UpstreamHost) -> None:
+        self._name: Final = name
+        self._policy: Final = policy
+        self._logger: Final = logger
+        self._breaker: Final = host.breaker
+        # per endpoint: a 20 ms language list and a 5 min recognition must not share
+        # a hedge percentile or a latency baseline of the limiter
+        self._latencies: Final[deque[float]] = deque(maxlen=_LATENCY_WINDOW_SIZE)
+        self._limiter: Final = AimdConcurrencyLimiter(
+            initial_limit=policy.concurrency_initial,
+            min_limit=policy.concurrency_min,
+            max_limit=policy.concurrency_max,
+            latency_tolerance=policy.concurrency_latency_tolerance,
+        )
+
+    #####################################################################################################
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    #####################################################################################################
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        return self._breaker
+
+    #####################################################################################################
+
+    @property
+    def limiter(self) -> AimdConcurrencyLimiter:
+        return self._limiter
+
+    #####################################################################################################
+
+    async def call(self, send_request: Callable[[], Awaitable[_T]], *, idempotent: bool = True, hedge: bool = False) -> _T:
+        policy: Final = self._policy
+        attempts_count: Final = policy.max_attempts if idempotent else 1
+        attempt = 1
+        while True:
+            if not self._breaker.allow_request():
+                raise UpstreamUnavailableError(f'Upstream "{self._name}" is unavailable, circuit is {self._breaker.state}')
+
+            try:
+                if hedge and idempotent:
+                    call_result = await self._send_hedged(send_request)
+                else:
+                    call_result = await self._send_timed(send_request)
+            except (ClientError, AsyncTimeoutError, UpstreamTransportError, RetryableStatusError) as err:
+                self._breaker.record_failure()
+                if attempt >= attempts_count:
+                    raise UpstreamError(f'Upstream "{self._name}" failed after {attempt} attempts: {err!r}') from err
+                backoff_sec = self._get_backoff_sec(attempt)
+                self._logger.warning(f'Upstream "{self._name}" attempt {attempt} failed: {err!r}, retry in {backoff_sec:.3f} sec')
+                await sleep(backoff_sec)
+                attempt += 1
+                continue
+            except CancelledError:
+                self._breaker.release_probe()
+                raise
+            except Exception:
+                # not a transient error: the upstream answered, so its health is not affected
+                self._breaker.record_success()
+                raise
+
+            self._breaker.record_success()
+            return call_result
+
+    #####################################################################################################
+
+    def _get_backoff_sec(self, attempt: int) -> float:
+        policy: Final = self._policy
+        # full jitter, so workers retrying after the same outage do not come back in sync
+        return uniform(0, min(policy.backoff_max_sec, policy.backoff_base_sec * (2 ** (attempt - 1))))  # noqa: S311
+
+    #####################################################################################################
+
+    def _get_hedge_delay_sec(self) -> float | None:
+        hedge_percentile: Final = self._policy.hedge_percentile
+        latencies: Final = self._latencies
+        if hedge_percentile <= 0 or len(latencies) < _HEDGE_MIN_SAMPLES:
+            return None
+        sorted_latencies: Final = sorted(latencies)
+        percentile_index: Final = min(int(len(sorted_latencies) * hedge_percentile / 100), len(sorted_latencies) - 1)
+        return sorted_latencies[percentile_index]
+
+    #####################################################################################################
+
+    async def _send_timed(self, send_request: Callable[[], Awaitable[_T]]) -> _T:
+        await self._limiter.acquire()
+        start_ts: Final = monotonic()
+        try:
+            call_result: Final = await send_request()
+        except (ClientError, AsyncTimeoutError, UpstreamTransportError, RetryableStatusError):
+            self._limiter.release(start_ts, None, dropped=True)
+            raise
+        except BaseException:
+            # a lost hedge race or an answer that is not about load: the limit is kept as is
+            self._limiter.release(start_ts, None, dropped=False)
+            raise
+
+        latency_sec: Final = monotonic() - start_ts
+        self._limiter.release(start_ts, latency_sec, dropped=False)
+        self._latencies.append(latency_sec)
+        return call_result
+
+    #####################################################################################################
+
+    async def _send_hedged(self, send_request: Callable[[], Awaitable[_T]]) -> _T:
+        hedge_delay_sec: Final = self._get_hedge_delay_sec()
+        if hedge_delay_sec is None:
+            return await self._send_timed(send_request)
+
+        primary_task: Final[Task[_T]] = create_task(self._send_timed(send_request))
+        pending_tasks: set[Task[_T]] = {primary_task}
+        try:
+            done_tasks, pending_tasks = await wait(pending_tasks, timeout=hedge_delay_sec)
+            if not done_tasks:
+                # slower than the usual tail latency: race a second copy, the first answer wins
+                self._logger.debug(f'Upstream "{self._name}" hedged after {hedge_delay_sec:.3f} sec')
+                pending_tasks.add(create_task(self._send_timed(send_request)))
+
+            # replaced by the first failure, every task is awaited before the loop ends
+            last_error: BaseException = UpstreamError(f'Upstream "{self._name}" hedged request has no result')
+            while pending_tasks or done_tasks:
+                for done_task in done_tasks:
+                    task_error = done_task.exception()
+                    if task_error is None:
+                        return done_task.result()
+                    last_error = task_error
+                done_tasks = set()
+                if pending_tasks:
+                    done_tasks, pending_tasks = await wait(pending_tasks, return_when=FIRST_COMPLETED)
+
+            raise last_error
+        finally:
+            for pending_task in pending_tasks:
+                pending_task.cancel()
+            for pending_task in pending_tasks:
+                try:
+                    await pending_task
+                except (CancelledError, Exception):  # noqa: PIE786 # pylint: disable=broad-except
+                    pass
+
+#####################################################################################################
+
+_upstream_hosts: Final[dict[str, UpstreamHost]] = {}
+_upstream_clients: Final[dict[str, UpstreamClient]] = {}
+
+#####################################################################################################
+
+def get_upstream_client(url: str, app_settings: AppSettings, logger: Logger) -> UpstreamClient:
+    url_parts: Final = urlsplit(url)
+    # one client per endpoint for the latency stats and the limiter, the breaker is shared by all endpoints of the host
+    host_name: Final = f'{url_parts.scheme}://{url_parts.netloc}'
+    upstream_name: Final = f'{host_name}{url_parts.path}'
+    upstream_client = _upstream_clients.get(upstream_name)
+    if upstream_client is None:
+        policy = UpstreamPolicy.from_settings(app_settings)
+        upstream_host = _upstream_hosts.get(host_name)
+        if upstream_host is None:
+            upstream_host = UpstreamHost.from_policy(policy)
+            _upstream_hosts[host_name] = upstream_host
+        upstream_client = UpstreamClient(upstream_name, policy, logger, host=upstream_host)
+        _upstream_clients[upstream_name] = upstream_client
+    return upstream_client
+
+#####################################################################################################
+
+def get_upstream_clients() -> Mapping[str, UpstreamClient]:
+    return MappingProxyType(_upstream_clients)
+
+#####################################################################################################
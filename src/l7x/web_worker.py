@@ -1,7 +1,8 @@
 #####################################################################################################
 
 from asyncio import sleep
-from dataclasses import dataclass
+from collections.abc import Mapping
+from dataclasses import dataclass, field
 from functools import partial
 from logging import Logger
 from multiprocessing.managers import SyncManager
@@ -19,6 +20,7 @@
 from l7x.listeners import APP_LISTENERS_REGISTRARS
 from l7x.utils.cmd_manager_utils import WorkerParams
 from l7x.utils.loop_utils import CreateEventLoopParams, EventLoopFuncParams, ShutdownEvent, create_event_loop
+from l7x.utils.shared_catalog_utils import SharedCatalogRef
 from l7x.utils.worker_utils import StartedEvent
 
 #####################################################################################################
@@ -29,6 +31,8 @@ class WebWorkerParams(WorkerParams):
     sockets: Sockets
     hypercorn_config: _HypercornConfig
     cmd_manager: SyncManager | None = None
+    lang_catalog_refs: Mapping[str, SharedCatalogRef] = field(default_factory=dict)
+    is_lang_catalog_publisher: bool = False
 
 #####################################################################################################
 
@@ -37,6 +41,8 @@ class _ExtParams:
     loop_name: str
     sockets: Sockets
     hypercorn_config: _HypercornConfig
+    lang_catalog_refs: Mapping[str, SharedCatalogRef]
+    is_lang_catalog_publisher: bool
 
 #####################################################################################################
 
@@ -65,6 +71,8 @@ async def _web_work(elp_params: EventLoopFuncParams[_ExtParams], /) -> None:
         app_settings=app_settings,
         func_after_all_started=elp_params.func_after_all_started,
         cmd_manager=elp_params.cmd_manager,
+        lang_catalog_refs=ext.lang_catalog_refs,
+        is_lang_catalog_publisher=ext.is_lang_catalog_publisher,
     )
 
     for registrar in APP_LISTENERS_REGISTRARS:
@@ -113,6 +121,8 @@ def after_all_started(logger: Logger) -> None:
             loop_name=worker_name,
             sockets=sockets,
             hypercorn_config=hypercorn_config,
+            lang_catalog_refs=wp_params.lang_catalog_refs,
+            is_lang_catalog_publisher=wp_params.is_lang_catalog_publisher,
         ),
         func_after_all_started=after_all_started,
     ))
@@ -0,0 +1,77 @@
+'use strict';
+
+// Streams microphone audio as base64 encoded 16 kHz mono s16le chunks through the NiceGUI websocket.
+window.l7xLiveAudio = (() => {
+    const SAMPLE_RATE = 16000;
+    const CHUNK_SEC = 0.5;
+    const PROCESSOR_BUFFER_SIZE = 4096;
+
+    let stream = null;
+    let audioContext = null;
+    let processor = null;
+    let pending = [];
+    let pendingSamples = 0;
+
+    const encodeChunk = (chunks, samplesCount) => {
+        const pcm = new Int16Array(samplesCount);
+        let offset = 0;
+        for (const chunk of chunks) {
+            for (let i = 0; i < chunk.length; i++) {
+                const sample = Math.max(-1, Math.min(1, chunk[i]));
+                pcm[offset++] = sample < 0 ? sample * 0x8000 : sample * 0x7fff;
+            }
+        }
+        const bytes = new Uint8Array(pcm.buffer);
+        let binary = '';
+        for (let i = 0; i < bytes.length; i += 0x8000) {
+            binary += String.fromCharCode.apply(null, bytes.subarray(i, i + 0x8000));
+        }
+        return btoa(binary);
+    };
+
+    const flush = () => {
+        if (pendingSamples === 0) {
+            return;
+        }
+        emitEvent('live_audio_chunk', {pcm: encodeChunk(pending, pendingSamples)});
+        pending = [];
+        pendingSamples = 0;
+    };
+
+    const start = async () => {
+        if (stream !== null) {
+            return true;
+        }
+        stream = await navigator.mediaDevices.getUserMedia({audio: {channelCount: 1, echoCancellation: true, noiseSuppression: true}});
+        // the browser resamples the microphone to the context rate
+        audioContext = new AudioContext({sampleRate: SAMPLE_RATE});
+        const source = audioContext.createMediaStreamSource(stream);
+        processor = audioContext.createScriptProcessor(PROCESSOR_BUFFER_SIZE, 1, 1);
+        processor.onaudioprocess = (event) => {
+            pending.push(new Float32Array(event.inputBuffer.getChannelData(0)));
+            pendingSamples += event.inputBuffer.length;
+            if (pendingSamples >= SAMPLE_RATE * CHUNK_SEC) {
+                flush();
+            }
+        };
+        source.connect(processor);
+        processor.connect(audioContext.destination);
+        return true;
+    };
+
+    const stop = async () => {
+        if (stream === null) {
+            return true;
+        }
+        flush();
+        processor.disconnect();
+        stream.getTracks().forEach((track) => track.stop());
+        await audioContext.close();
+        stream = null;
+        audioContext = null;
+        processor = null;
+        return true;
+    };
+
+    return {start, stop};
+})();
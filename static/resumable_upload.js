@@ -0,0 +1,152 @@
+'use strict';
+
+// tus-style uploader: the file is sent in chunks, a failed chunk is resent from the offset the server confirmed.
+window.l7xResumableUpload = (() => {
+    const TUS_VERSION = '1.0.0';
+    const DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024;
+    const MAX_RETRIES = 8;
+    const RETRY_BASE_MS = 500;
+    const RETRY_MAX_MS = 15000;
+    const STORAGE_PREFIX = 'l7x-upload:';
+
+    const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+    const toBase64 = (bytes) => {
+        let binary = '';
+        for (let i = 0; i < bytes.length; i += 0x8000) {
+            binary += String.fromCharCode.apply(null, bytes.subarray(i, i + 0x8000));
+        }
+        return btoa(binary);
+    };
+
+    const encodeMetadata = (metadata) => Object.entries(metadata)
+        .map(([key, value]) => `${key} ${toBase64(new TextEncoder().encode(value))}`)
+        .join(',');
+
+    const fileKey = (file) => `${STORAGE_PREFIX}${file.name}:${file.size}:${file.lastModified}`;
+
+    const withRetries = async (action) => {
+        for (let attempt = 0; ; attempt++) {
+            try {
+                return await action();
+            } catch (error) {
+                if (error.fatal || attempt >= MAX_RETRIES) {
+                    throw error;
+                }
+                const delayMs = Math.min(RETRY_MAX_MS, RETRY_BASE_MS * 2 ** attempt) * Math.random();
+                await sleep(delayMs);
+            }
+        }
+    };
+
+    const checkResponse = (response, expectedStatus) => {
+        if (response.status === expectedStatus) {
+            return response;
+        }
+        const error = new Error(`Upload request failed with status ${response.status}`);
+        // client errors will not be fixed by a retry, except the checksum and offset ones
+        error.fatal = response.status >= 400 && response.status < 500 && ![409, 423, 429, 460].includes(response.status);
+        error.status = response.status;
+        throw error;
+    };
+
+    const getChunkSize = async (uploadsUrl) => {
+        const response = await fetch(uploadsUrl, {method: 'OPTIONS'});
+        return parseInt(response.headers.get('L7x-Chunk-Size'), 10) || DEFAULT_CHUNK_SIZE;
+    };
+
+    const createUpload = async (uploadsUrl, file) => {
+        const response = checkResponse(await fetch(uploadsUrl, {
+            method: 'POST',
+            headers: {
+                'Tus-Resumable': TUS_VERSION,
+                'Upload-Length': String(file.size),
+                'Upload-Metadata': encodeMetadata({filename: file.name, filetype: file.type}),
+            },
+            body: '',
+        }), 201);
+        return response.headers.get('Location');
+    };
+
+    const getOffset = async (uploadUrl) => {
+        const response = checkResponse(await fetch(uploadUrl, {method: 'HEAD', headers: {'Tus-Resumable': TUS_VERSION}}), 200);
+        return parseInt(response.headers.get('Upload-Offset'), 10);
+    };
+
+    const sendChunk = async (uploadUrl, file, offset, chunkSize) => {
+        const chunk = new Uint8Array(await file.slice(offset, offset + chunkSize).arrayBuffer());
+        const checksum = toBase64(new Uint8Array(await crypto.subtle.digest('SHA-256', chunk)));
+        const response = checkResponse(await fetch(uploadUrl, {
+            method: 'PATCH',
+            headers: {
+                'Tus-Resumable': TUS_VERSION,
+                'Upload-Offset': String(offset),
+                'Upload-Checksum': `sha256 ${checksum}`,
+                'Content-Type': 'application/offset+octet-stream',
+            },
+            body: chunk,
+        }), 204);
+        return parseInt(response.headers.get('Upload-Offset'), 10);
+    };
+
+    const upload = async (uploadsUrl, file) => {
+        const chunkSize = await withRetries(() => getChunkSize(uploadsUrl));
+        const storageKey = fileKey(file);
+
+        let uploadUrl = localStorage.getItem(storageKey);
+        let offset = 0;
+        if (uploadUrl !== null) {
+            try {
+                // the same file was partly uploaded before, e.g. before a page reload
+                offset = await getOffset(uploadUrl);
+            } catch (error) {
+                uploadUrl = null;
+            }
+        }
+        if (uploadUrl === null) {
+            uploadUrl = await withRetries(() => createUpload(uploadsUrl, file));
+            localStorage.setItem(storageKey, uploadUrl);
+        }
+
+        emitEvent('resumable_upload_progress', {loaded: offset, total: file.size});
+        while (offset < file.size) {
+            offset = await withRetries(async () => {
+                try {
+                    return await sendChunk(uploadUrl, file, offset, chunkSize);
+                } catch (error) {
+                    if (!error.fatal) {
+                        // the server keeps only whole chunks, ask where to continue from
+                        offset = await getOffset(uploadUrl);
+                    }
+                    throw error;
+                }
+            });
+            emitEvent('resumable_upload_progress', {loaded: offset, total: file.size});
+        }
+
+        localStorage.removeItem(storageKey);
+        return uploadUrl.split('/').pop();
+    };
+
+    const pick = (uploadsUrl, accept) => {
+        const input = document.createElement('input');
+        input.type = 'file';
+        input.accept = accept;
+        input.onchange = async () => {
+            const file = input.files[0];
+            if (!file) {
+                return;
+            }
+            try {
+                const uploadId = await upload(uploadsUrl, file);
+                emitEvent('resumable_upload_done', {upload_id: uploadId});
+            } catch (error) {
+                emitEvent('resumable_upload_failed', {error: String(error)});
+            }
+        };
+        input.click();
+        return true;
+    };
+
+    return {pick, upload};
+})();
@@ -0,0 +1,69 @@
+#####################################################################################################
+
+import pytest
+from starlette.testclient import TestClient
+
+from _translation_server import UpstreamSimulatorConfig
+
+#####################################################################################################
+
+def test_speech_to_text_is_deterministic(upstream_simulator: TestClient) -> None:
+    audio_content = b'\0' * 64 * 1024
+    responses = [
+        upstream_simulator.post(
+            '/speech-to-text',
+            data={'lang': 'en', 'output_native': 'false', 'denoise': 'false'},
+            files={'file': ('audio.wav', audio_content, 'audio/wav')},
+        )
+        for _ in range(2)
+    ]
+    assert [response.status_code for response in responses] == [200, 200]
+    assert responses[0].json() == responses[1].json()
+    assert responses[0].json()['result'].startswith('[en] ')
+
+#####################################################################################################
+
+def test_speech_to_text_depends_on_content(upstream_simulator: TestClient) -> None:
+    # same name and size, different audio: a cache keyed by anything but the content would mix them up
+    responses = [
+        upstream_simulator.post(
+            '/speech-to-text',
+            files={'file': ('audio.wav', bytes([audio_byte]) * 64 * 1024, 'audio/wav')},
+        )
+        for audio_byte in (0, 1)
+    ]
+    assert [response.status_code for response in responses] == [200, 200]
+    assert responses[0].json() != responses[1].json()
+
+#####################################################################################################
+
+def test_speech_to_text_languages(upstream_simulator: TestClient) -> None:
+    response = upstream_simulator.get('/get-speech-to-text-languages')
+    assert response.status_code == 200
+    assert {lang['code_alpha_1'] for lang in response.json()} == {'en', 'de', 'ru'}
+
+#####################################################################################################
+
+@pytest.mark.parametrize('upstream_simulator_config', [UpstreamSimulatorConfig(error_rate=1.0, seed=0)])
+def test_error_injection(upstream_simulator: TestClient) -> None:
+    response = upstream_simulator.post('/api/translate', json={'translateMode': 'text', 'q': 'hello', 'target': 'de'})
+    assert response.status_code >= 500
+    assert upstream_simulator.get('/simulator/stats').json()['errors'] == 1
+
+#####################################################################################################
+
+def test_translate_bulk_keeps_order(upstream_simulator: TestClient) -> None:
+    response = upstream_simulator.post('/api/translate-bulk', json={'translateMode': 'text', 'q': ['one', 'two'], 'target': 'de'})
+    assert response.status_code == 200
+    assert [translation['translatedText'] for translation in response.json()['translations']] == ['[de] one', '[de] two']
+
+#####################################################################################################
+
+@pytest.mark.parametrize('upstream_simulator_config', [UpstreamSimulatorConfig(item_error_rate=1.0, seed=0)])
+def test_translate_bulk_item_errors(upstream_simulator: TestClient) -> None:
+    response = upstream_simulator.post('/api/translate-bulk', json={'translateMode': 'text', 'q': ['one', 'two'], 'target': 'de'})
+    assert response.status_code == 200
+    assert all('error' in translation for translation in response.json()['translations'])
+    assert upstream_simulator.get('/simulator/stats').json()['item_errors'] == 2
+
+#####################################################################################################
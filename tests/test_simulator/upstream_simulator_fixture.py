@@ -0,0 +1,23 @@
+#####################################################################################################
+
+from collections.abc import Iterator
+
+import pytest
+from starlette.testclient import TestClient
+
+from _translation_server import UpstreamSimulatorApp, UpstreamSimulatorConfig
+
+#####################################################################################################
+
+@pytest.fixture()
+def upstream_simulator_config() -> UpstreamSimulatorConfig:
+    return UpstreamSimulatorConfig(seed=0)
+
+#####################################################################################################
+
+@pytest.fixture()
+def upstream_simulator(upstream_simulator_config: UpstreamSimulatorConfig) -> Iterator[TestClient]:
+    with TestClient(UpstreamSimulatorApp(upstream_simulator_config)) as test_client:
+        yield test_client
+
+#####################################################################################################
@@ -0,0 +1,55 @@
+#####################################################################################################
+
+from typing import Final
+
+from numpy import int16, zeros
+from numpy.random import default_rng
+
+from l7x.utils.audio_utils import PCM_SAMPLE_RATE, find_segments_by_silence
+
+#####################################################################################################
+
+_SPEECH_SEC: Final = 60
+# (start, end) in seconds: less than 2% of the recording is silent
+_PAUSES_SEC: Final = ((17.0, 17.5), (41.0, 41.5))
+
+#####################################################################################################
+
+def test_sparse_pauses_are_found() -> None:
+    rng = default_rng(7)
+    samples = rng.normal(0, 3000, _SPEECH_SEC * PCM_SAMPLE_RATE)
+    for pause_start, pause_end in _PAUSES_SEC:
+        pause_slice = slice(int(pause_start * PCM_SAMPLE_RATE), int(pause_end * PCM_SAMPLE_RATE))
+        samples[pause_slice] = rng.normal(0, 20, pause_slice.stop - pause_slice.start)
+
+    segments = find_segments_by_silence(samples.astype(int16), min_segment_sec=5, max_segment_sec=25)
+
+    cuts_sec = [segment.end_sample / PCM_SAMPLE_RATE for segment in segments[:-1]]
+    assert len(cuts_sec) == len(_PAUSES_SEC)
+    for cut_sec, (pause_start, pause_end) in zip(cuts_sec, _PAUSES_SEC, strict=True):
+        assert pause_start <= cut_sec <= pause_end
+
+#####################################################################################################
+
+def test_speech_without_pauses_is_cut_at_the_quietest_point() -> None:
+    samples = default_rng(7).normal(0, 3000, _SPEECH_SEC * PCM_SAMPLE_RATE).astype(int16)
+    segments = find_segments_by_silence(samples, min_segment_sec=5, max_segment_sec=25)
+    assert segments[0].start_sample == 0
+    assert segments[-1].end_sample == len(samples)
+    assert all(segment.end_sample - segment.start_sample <= 25 * PCM_SAMPLE_RATE for segment in segments)
+
+#####################################################################################################
+
+def test_tiny_max_segment_is_clamped() -> None:
+    samples = default_rng(7).normal(0, 3000, PCM_SAMPLE_RATE).astype(int16)
+    segments = find_segments_by_silence(samples, min_segment_sec=5, max_segment_sec=0.03)
+    assert segments[0].start_sample == 0
+    assert segments[-1].end_sample == len(samples)
+    assert all(segment.end_sample > segment.start_sample for segment in segments)
+
+#####################################################################################################
+
+def test_empty_audio_has_no_segments() -> None:
+    assert not find_segments_by_silence(zeros(0, dtype=int16), min_segment_sec=5, max_segment_sec=25)
+
+#####################################################################################################
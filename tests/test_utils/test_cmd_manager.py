@@ -0,0 +1,166 @@
+#####################################################################################################
+
+from asyncio import new_event_loop, sleep
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from logging import getLogger
+from queue import Queue
+from threading import Condition, Event, Thread
+from types import SimpleNamespace
+from typing import Any, Final, cast
+from uuid import UUID, uuid4
+
+import pytest
+
+from l7x.configs.settings import AppSettings
+from l7x.utils import cmd_manager_utils
+from l7x.utils.cmd_manager_utils import (
+    BaseCommand,
+    CmdCallState,
+    CmdCancelledException,
+    CmdGlobalContextCreatorReturn,
+    CmdManagerImpl,
+    CmdMiddlewareResults,
+)
+from l7x.utils.loop_utils import EventLoopFuncParams
+
+#####################################################################################################
+
+_WAIT_TIMEOUT_SEC: Final = 5.0
+
+#####################################################################################################
+
+class _ThreadManager:
+    # the worker runs in a thread of the test, so plain thread safe objects stand in for the manager proxies
+    def __init__(self) -> None:
+        self.cancelled_call_ids: dict[UUID, float] = {}
+
+    def Queue(self) -> Queue[Any]:  # noqa: N802
+        return Queue()
+
+    def Condition(self) -> Condition:  # noqa: N802
+        return Condition()
+
+    def list(self) -> list[Any]:  # noqa: WPS125
+        return []
+
+    def dict(self) -> dict[UUID, float]:  # noqa: WPS125
+        return self.cancelled_call_ids
+
+#####################################################################################################
+
+class _RecordCommand(BaseCommand[None, CmdCallState, str]):
+    def __init__(self) -> None:
+        self.started = Event()
+
+    async def execute(self, *, global_context: None, local_context: CmdCallState) -> str:
+        self.started.set()
+        return 'done'
+
+#####################################################################################################
+
+class _WaitCancelCommand(_RecordCommand):
+    async def execute(self, *, global_context: None, local_context: CmdCallState) -> str:
+        self.started.set()
+        # like the stopping criteria of the generation: the command polls the cancel flag while it works
+        for _ in range(int(_WAIT_TIMEOUT_SEC * 100)):
+            if local_context.is_cancelled():
+                raise CmdCancelledException('Cmd cancelled')
+            await sleep(0.01)
+        return 'not cancelled'
+
+#####################################################################################################
+
+async def _create_global_context(logger: Any, app_settings: Any, additional_params: None) -> CmdGlobalContextCreatorReturn[None]:
+    return None, None
+
+#####################################################################################################
+
+async def _create_local_context(global_context: None, middleware_results: CmdMiddlewareResults) -> CmdCallState:
+    return middleware_results.get(CmdCallState)
+
+#####################################################################################################
+
+@pytest.fixture
+def cmd_manager_fixture() -> Iterator[tuple[CmdManagerImpl[None, None, CmdCallState], _ThreadManager]]:
+    thread_manager: Final = _ThreadManager()
+    app_settings: Final = cast(AppSettings, SimpleNamespace(is_dev_mode=False))
+    cmd_manager: Final = CmdManagerImpl(
+        1,
+        _create_global_context,
+        None,
+        _create_local_context,
+        cast(Any, thread_manager),
+        getLogger(__name__),
+        app_settings,
+    )
+    shutdown_event: Final = Event()
+    loop: Final = new_event_loop()
+    worker_description: Final = next(iter(cmd_manager.worker_descriptions))
+    worker_params: Final = EventLoopFuncParams(
+        app_settings=app_settings,
+        logger=getLogger(__name__),
+        ext=cmd_manager_utils._ManagerWorkerExtParams(  # noqa: WPS437
+            loop_name=worker_description.name,
+            worker_params=worker_description.func_params,
+        ),
+        shutdown_event=shutdown_event,
+        loop=loop,
+    )
+    worker_thread: Final = Thread(target=loop.run_until_complete, args=(cmd_manager_utils._cmd_manager_worker(worker_params),))  # noqa: WPS437
+    worker_thread.start()
+
+    yield cmd_manager, thread_manager
+
+    shutdown_event.set()
+    # wakes the worker up, it sees the shutdown after this command
+    cmd_manager.send(_RecordCommand())
+    worker_thread.join(_WAIT_TIMEOUT_SEC)
+    loop.close()
+
+#####################################################################################################
+
+def test_cancelled_call_is_not_executed(cmd_manager_fixture: tuple[CmdManagerImpl[None, None, CmdCallState], _ThreadManager]) -> None:
+    cmd_manager, thread_manager = cmd_manager_fixture
+    call_id = uuid4()
+    cmd = _RecordCommand()
+    cmd_manager.cancel(call_id)
+
+    with pytest.raises(CmdCancelledException):
+        cmd_manager.send_and_wait_result(cmd, call_timeout_sec=_WAIT_TIMEOUT_SEC, call_id=call_id)
+    assert not cmd.started.is_set()
+    assert not thread_manager.cancelled_call_ids
+
+#####################################################################################################
+
+def test_cancel_stops_running_call(cmd_manager_fixture: tuple[CmdManagerImpl[None, None, CmdCallState], _ThreadManager]) -> None:
+    cmd_manager, thread_manager = cmd_manager_fixture
+    call_id = uuid4()
+    cmd = _WaitCancelCommand()
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        result_future = executor.submit(cmd_manager.send_and_wait_result, cmd, call_timeout_sec=_WAIT_TIMEOUT_SEC, call_id=call_id)
+        assert cmd.started.wait(_WAIT_TIMEOUT_SEC)
+        cmd_manager.cancel(call_id)
+        with pytest.raises(CmdCancelledException):
+            result_future.result(_WAIT_TIMEOUT_SEC)
+    assert not thread_manager.cancelled_call_ids
+
+    assert cmd_manager.send_and_wait_result(_RecordCommand(), call_timeout_sec=_WAIT_TIMEOUT_SEC) == 'done'
+
+#####################################################################################################
+
+def test_late_cancel_expires(
+    cmd_manager_fixture: tuple[CmdManagerImpl[None, None, CmdCallState], _ThreadManager],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    cmd_manager, thread_manager = cmd_manager_fixture
+    # the result was already taken: nobody pops this cancel
+    cmd_manager.cancel(uuid4())
+    assert len(thread_manager.cancelled_call_ids) == 1
+
+    monkeypatch.setattr(cmd_manager_utils, '_CANCELLED_CALL_ID_EXPIRE_SEC', 0.0)
+    assert cmd_manager.send_and_wait_result(_RecordCommand(), call_timeout_sec=_WAIT_TIMEOUT_SEC) == 'done'
+    assert not thread_manager.cancelled_call_ids
+
+#####################################################################################################
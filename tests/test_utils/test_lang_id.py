@@ -0,0 +1,50 @@
+#####################################################################################################
+
+from pathlib import Path
+
+from l7x.utils.lang_id_utils import LanguageIdentifier, LanguageProfiles, get_builtin_language_profiles
+
+#####################################################################################################
+
+def test_builtin_profiles_identify_languages() -> None:
+    identifier = LanguageIdentifier(get_builtin_language_profiles())
+    identified_languages = identifier.identify_many([
+        'Guten Tag, wie geht es Ihnen heute? Ich hoffe, das Wetter ist schön.',
+        'Привет, как дела сегодня? Надеюсь, погода хорошая.',
+        '안녕하세요, 오늘 어떻게 지내세요? 날씨가 좋기를 바랍니다.',
+        '',
+    ])
+    assert [None if language is None else language.code for language in identified_languages] == ['de', 'ru', 'ko', None]
+
+#####################################################################################################
+
+def test_short_text_has_low_confidence() -> None:
+    identified_language = LanguageIdentifier(get_builtin_language_profiles()).identify('ok')
+    assert identified_language is not None
+    assert identified_language.confidence < 0.15
+
+#####################################################################################################
+
+def test_language_without_profile_has_low_confidence() -> None:
+    identified_languages = LanguageIdentifier(get_builtin_language_profiles()).identify_many([
+        # japanese shares the han script with chinese, ukrainian the cyrillic one with russian
+        '通話の後でスライドを送っていただけますか？明日の朝に確認します。',
+        'Чи можете ви надіслати мені слайди після дзвінка? Я перегляну їх завтра вранці.',
+    ])
+    for identified_language in identified_languages:
+        assert identified_language is not None
+        assert identified_language.confidence < 0.15
+
+#####################################################################################################
+
+def test_profiles_are_saved_and_loaded(tmp_path: Path) -> None:
+    profiles_path = tmp_path / 'profiles.npz'
+    profiles = LanguageProfiles.build({'en': 'the quick brown fox. it jumps.', 'de': 'der schnelle braune Fuchs'})
+    profiles.save(profiles_path)
+    loaded_profiles = LanguageProfiles.load(profiles_path)
+    assert list(loaded_profiles.fit_floors) == list(profiles.fit_floors)
+    identified_language = LanguageIdentifier(loaded_profiles).identify('the brown fox')
+    assert identified_language is not None
+    assert identified_language.code == 'en'
+
+#####################################################################################################
@@ -0,0 +1,85 @@
+#####################################################################################################
+
+from typing import Final
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from l7x.utils.mapping_utils import (
+    CacheablePropertiesObject,
+    CompiledKeysPath,
+    FindValueByKeysSequenceException,
+    find_value_by_keys_sequence,
+    find_value_or_none_by_keys_sequence,
+)
+from l7x.utils.upstream_response_utils import decode_detected_language, decode_languages, decode_translated_text
+
+#####################################################################################################
+
+_DETECTED_LANG_JSON: Final = {'result': [[{'language_code': 'de', 'confidence': 0.9}]]}
+_DETECTED_LANGUAGE_PATH: Final = CompiledKeysPath('result', 0, 0, 'language_code', ret_type=str)
+
+#####################################################################################################
+
+def test_compiled_path_finds_the_same_values() -> None:
+    sources = (
+        _DETECTED_LANG_JSON,
+        {'result': [[{'language_code': None}]]},
+        {'result': [[]]},
+        {'result': []},
+        {'result': None},
+        {},
+    )
+    for source in sources:
+        expected_value = find_value_or_none_by_keys_sequence(source, 'result', 0, 0, 'language_code', ret_type=str)
+        assert _DETECTED_LANGUAGE_PATH.find_or_none(source) == expected_value
+        assert _DETECTED_LANGUAGE_PATH.find(source, default='') == find_value_by_keys_sequence(
+            source, 'result', 0, 0, 'language_code', default='',
+        )
+
+#####################################################################################################
+
+def test_compiled_path_rejects_wrong_types() -> None:
+    with pytest.raises(FindValueByKeysSequenceException):
+        CompiledKeysPath('result', 0.5, ret_type=str)  # type: ignore[arg-type]
+    with pytest.raises(FindValueByKeysSequenceException):
+        _DETECTED_LANGUAGE_PATH.find_or_none({'result': 1})
+    with pytest.raises(FindValueByKeysSequenceException):
+        _DETECTED_LANGUAGE_PATH.find_or_none({'result': [[{'language_code': 1}]]})
+
+#####################################################################################################
+
+def test_cacheable_object_shares_cache_with_compiled_path() -> None:
+    properties = CacheablePropertiesObject(source=_DETECTED_LANG_JSON)
+    assert properties.get_path_value(_DETECTED_LANGUAGE_PATH, default='') == 'de'
+    assert properties.get_value('result', 0, 0, 'language_code', default='') == 'de'
+    assert properties.get_path_value(CompiledKeysPath('missing', ret_type=str), default='en') == 'en'
+
+#####################################################################################################
+
+def test_upstream_responses_are_decoded() -> None:
+    assert decode_detected_language(_DETECTED_LANG_JSON) == 'de'
+    assert not decode_detected_language(None)
+    assert decode_translated_text({'translatedText': 'Hallo'}) == 'Hallo'
+    assert not decode_translated_text([])
+    assert not decode_translated_text({'translatedText': {'text': 'Hallo'}})
+    assert not decode_detected_language({'result': 'de'})
+
+    languages = decode_languages([{'code_alpha_1': 'de', 'codeName': 'German', 'rtl': False}, {'codeName': 'Broken'}])
+    assert list(languages) == ['de']
+    assert languages['de'].code == 'German'
+    assert not decode_languages(None)
+
+#####################################################################################################
+
+@pytest.mark.benchmark(group='find_value')
+def test_benchmark_find_value_by_keys_sequence(benchmark: BenchmarkFixture) -> None:
+    assert benchmark(find_value_by_keys_sequence, _DETECTED_LANG_JSON, 'result', 0, 0, 'language_code', default='') == 'de'
+
+#####################################################################################################
+
+@pytest.mark.benchmark(group='find_value')
+def test_benchmark_compiled_keys_path(benchmark: BenchmarkFixture) -> None:
+    assert benchmark(_DETECTED_LANGUAGE_PATH.find, _DETECTED_LANG_JSON, default='') == 'de'
+
+#####################################################################################################
@@ -0,0 +1,93 @@
+#####################################################################################################
+
+from logging import getLogger
+from os import utime
+from pathlib import Path
+from time import time
+
+import pytest
+
+from l7x.utils import recognition_cache_utils
+from l7x.utils.recognition_cache_utils import RecognitionCache, make_recognition_cache_key
+
+#####################################################################################################
+
+def _create_cache(tmp_path: Path, *, max_entries: int = 16, ttl_sec: float = 60.0) -> RecognitionCache:
+    return RecognitionCache(
+        logger=getLogger(__name__),
+        max_entries=max_entries,
+        ttl_sec=ttl_sec,
+        disk_dir=tmp_path / 'cache',
+        disk_max_size_in_byte=0,
+    )
+
+#####################################################################################################
+
+def test_key_depends_on_language_and_options() -> None:
+    key = make_recognition_cache_key('hash', 'en', {'punctuation': 'true', 'model': 'large'})
+    assert key == make_recognition_cache_key('hash', 'en', {'model': 'large', 'punctuation': 'true'})
+    assert key != make_recognition_cache_key('hash', 'de', {'model': 'large', 'punctuation': 'true'})
+    assert key != make_recognition_cache_key('hash', 'en', {'model': 'small', 'punctuation': 'true'})
+
+#####################################################################################################
+
+async def test_disk_entry_is_promoted_to_memory(tmp_path: Path) -> None:
+    await _create_cache(tmp_path).put('key', 'hello')
+
+    # another worker: only the disk tier is shared
+    cache = _create_cache(tmp_path)
+    assert await cache.get('key') == 'hello'
+    assert await cache.get('key') == 'hello'
+    assert await cache.get('missing') is None
+
+    stats = cache.stats
+    assert stats.disk_hits == 1
+    assert stats.memory_hits == 1
+    assert stats.misses == 1
+    assert stats.memory_entries == 1
+
+#####################################################################################################
+
+async def test_memory_tier_is_bounded(tmp_path: Path) -> None:
+    cache = _create_cache(tmp_path, max_entries=2)
+    for key in ('first', 'second', 'third'):
+        await cache.put(key, key)
+    assert cache.stats.memory_entries == 2
+
+    # the oldest entry left the memory, but is still on the disk
+    assert await cache.get('first') == 'first'
+    assert cache.stats.disk_hits == 1
+
+#####################################################################################################
+
+async def test_expired_entry_is_missed(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = _create_cache(tmp_path, ttl_sec=10.0)
+    await cache.put('key', 'hello')
+
+    now_ts = time() + 11.0
+    monkeypatch.setattr(recognition_cache_utils, 'time', lambda: now_ts)
+    assert await cache.get('key') is None
+    assert cache.stats.misses == 1
+    assert cache.stats.memory_entries == 0
+    # the expired disk entry is removed on read
+    assert not list((tmp_path / 'cache').glob('*.json'))
+
+#####################################################################################################
+
+def test_trim_removes_stale_temporary_files(tmp_path: Path) -> None:
+    cache = _create_cache(tmp_path)
+    disk_dir = tmp_path / 'cache'
+    stale_tmp_path = disk_dir / 'stale.tmp'
+    stale_tmp_path.write_bytes(b'{')
+    stale_ts = time() - 120.0
+    utime(stale_tmp_path, (stale_ts, stale_ts))
+    live_tmp_path = disk_dir / 'live.tmp'
+    live_tmp_path.write_bytes(b'{')
+
+    cache._trim_disk(disk_dir)  # noqa: WPS437
+
+    assert not stale_tmp_path.exists()
+    # a write in progress is left alone
+    assert live_tmp_path.exists()
+
+#####################################################################################################
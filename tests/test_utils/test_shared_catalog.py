@@ -0,0 +1,82 @@
+#####################################################################################################
+
+from logging import getLogger
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from struct import pack_into
+from typing import Any
+
+import pytest
+
+from l7x.utils.shared_catalog_utils import SharedCatalog, SharedCatalogError, create_shared_catalogs
+
+#####################################################################################################
+
+def _decode(catalog: Any) -> dict[str, Any]:
+    return dict(catalog)
+
+#####################################################################################################
+
+def test_reader_sees_published_catalog(tmp_path: Path) -> None:
+    with create_shared_catalogs(('langs',), capacity_in_byte=1024, persist_dir=tmp_path, logger=getLogger(__name__)) as catalog_refs:
+        publisher = SharedCatalog.attach(catalog_refs['langs'], decode=_decode, is_publisher=True)
+        reader = SharedCatalog.attach(catalog_refs['langs'], decode=_decode, is_publisher=False)
+        assert reader.read() is None
+
+        assert publisher.publish({'en': 'English'})
+        first_read = reader.read()
+        assert first_read == {'en': 'English'}
+        # the same version is not decoded again
+        assert reader.read() is first_read
+
+        # the same catalog does not bump the version
+        assert not publisher.publish({'en': 'English'})
+        assert publisher.publish({'en': 'English', 'ru': 'Russian'})
+        assert reader.read() == {'en': 'English', 'ru': 'Russian'}
+
+        publisher.close()
+        reader.close()
+
+#####################################################################################################
+
+def test_cold_start_serves_persisted_catalog(tmp_path: Path) -> None:
+    logger = getLogger(__name__)
+    with create_shared_catalogs(('langs',), capacity_in_byte=1024, persist_dir=tmp_path, logger=logger) as catalog_refs:
+        publisher = SharedCatalog.attach(catalog_refs['langs'], decode=_decode, is_publisher=True)
+        publisher.publish({'en': 'English'})
+        publisher.close()
+
+    with create_shared_catalogs(('langs',), capacity_in_byte=1024, persist_dir=tmp_path, logger=logger) as catalog_refs:
+        reader = SharedCatalog.attach(catalog_refs['langs'], decode=_decode, is_publisher=False)
+        assert reader.read() == {'en': 'English'}
+        reader.close()
+
+#####################################################################################################
+
+def test_too_large_catalog_is_rejected(tmp_path: Path) -> None:
+    with create_shared_catalogs(('langs',), capacity_in_byte=16, persist_dir=None, logger=getLogger(__name__)) as catalog_refs:
+        publisher = SharedCatalog.attach(catalog_refs['langs'], decode=_decode, is_publisher=True)
+        with pytest.raises(SharedCatalogError):
+            publisher.publish({'en': 'English', 'ru': 'Russian'})
+        assert publisher.read() is None
+        publisher.close()
+
+#####################################################################################################
+
+def test_reader_keeps_last_catalog_during_write(tmp_path: Path) -> None:
+    with create_shared_catalogs(('langs',), capacity_in_byte=1024, persist_dir=None, logger=getLogger(__name__)) as catalog_refs:
+        publisher = SharedCatalog.attach(catalog_refs['langs'], decode=_decode, is_publisher=True)
+        reader = SharedCatalog.attach(catalog_refs['langs'], decode=_decode, is_publisher=False)
+        publisher.publish({'en': 'English'})
+        assert reader.read() == {'en': 'English'}
+
+        # an odd version: the publisher stopped in the middle of the next write
+        shm = SharedMemory(name=catalog_refs['langs'].shm_name)
+        pack_into('<QQ', shm.buf, 0, publisher.version + 1, 0)
+        assert reader.read() == {'en': 'English'}
+        shm.close()
+
+        publisher.close()
+        reader.close()
+
+#####################################################################################################
@@ -0,0 +1,28 @@
+#####################################################################################################
+
+from l7x.utils.translation_batch_utils import pack_segments_into_batches, protect_notranslate_spans, restore_notranslate_spans
+
+#####################################################################################################
+
+def test_notranslate_spans_are_restored() -> None:
+    protected_text = protect_notranslate_spans('Open [@Settings@] and press [@OK@]')
+    assert '[@' not in protected_text.text
+    assert protected_text.notranslate_spans == ('Settings', 'OK')
+
+    translated_text = f'[de] {protected_text.text}'
+    assert restore_notranslate_spans(translated_text, protected_text.notranslate_spans) == '[de] Open Settings and press OK'
+
+#####################################################################################################
+
+def test_lost_placeholder_is_reported() -> None:
+    protected_text = protect_notranslate_spans('Open [@Settings@]')
+    assert restore_notranslate_spans('Open', protected_text.notranslate_spans) is None
+
+#####################################################################################################
+
+def test_segments_are_packed_in_order() -> None:
+    assert pack_segments_into_batches([4, 4, 4, 20, 1], max_batch_size=10, max_batch_segments=10) == ((0, 1), (2,), (3,), (4,))
+    assert pack_segments_into_batches([1, 1, 1], max_batch_size=10, max_batch_segments=2) == ((0, 1), (2,))
+    assert not pack_segments_into_batches([], max_batch_size=10, max_batch_segments=2)
+
+#####################################################################################################
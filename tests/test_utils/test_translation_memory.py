@@ -0,0 +1,49 @@
+#####################################################################################################
+
+from logging import getLogger
+from pathlib import Path
+
+from l7x.utils.translation_memory_utils import (
+    TranslationMemory,
+    get_translation_memory_stats,
+    normalize_segment,
+    split_into_sentences,
+    stitch_sentences,
+)
+
+#####################################################################################################
+
+def test_sentences_are_stitched_back() -> None:
+    text = 'First one.  Second [@Dr. Who@] here!\nThird'
+    sentences = split_into_sentences(text)
+    assert [sentence.text for sentence in sentences] == ['First one.', 'Second [@Dr. Who@] here!', 'Third']
+    assert stitch_sentences(sentences, [sentence.text for sentence in sentences]) == text
+
+#####################################################################################################
+
+def test_segment_is_normalized() -> None:
+    assert normalize_segment('  Hello\t\n world ') == 'Hello world'
+
+#####################################################################################################
+
+async def test_store_outlives_memory(tmp_path: Path) -> None:
+    store_path = tmp_path / 'translation_memory.sqlite3'
+    key = ('en', 'de', 'Hello world')
+    first_memory = TranslationMemory(logger=getLogger(__name__), max_entries=16, store_path=store_path, store_max_entries=0)
+    assert not await first_memory.get_many([key])
+    await first_memory.put_many({key: 'Hallo Welt'})
+    assert await first_memory.get_many([key]) == {key: 'Hallo Welt'}
+    assert first_memory.stats.memory_hits == 1
+
+    second_memory = TranslationMemory(logger=getLogger(__name__), max_entries=16, store_path=store_path, store_max_entries=0)
+    assert await second_memory.get_many([key]) == {key: 'Hallo Welt'}
+    assert second_memory.stats.store_hits == 1
+    assert second_memory.stats.hit_ratio == 1.0
+
+    # the admin metrics sum up every memory of the worker process
+    process_stats = get_translation_memory_stats()
+    assert process_stats is not None
+    assert (process_stats.memory_hits, process_stats.store_hits, process_stats.misses) == (1, 1, 1)
+    assert process_stats.memory_entries == 2
+
+#####################################################################################################
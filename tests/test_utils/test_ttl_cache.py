@@ -0,0 +1,85 @@
+#####################################################################################################
+
+from asyncio import Event, gather, sleep
+from collections.abc import Awaitable, Callable
+from logging import getLogger
+
+from l7x.utils.ttl_cache_utils import AsyncTtlCache
+
+#####################################################################################################
+
+def _create_cache(load: Callable[[], Awaitable[int]]) -> AsyncTtlCache[int]:
+    return AsyncTtlCache(
+        name='test',
+        load=load,
+        default=-1,
+        get_ttl_sec=lambda _: 60.0,
+        error_ttl_sec=60.0,
+        jitter_ratio=0.0,
+        logger=getLogger(__name__),
+    )
+
+#####################################################################################################
+
+async def test_first_load_is_single_flight() -> None:
+    loads_count = 0
+
+    async def _load() -> int:
+        nonlocal loads_count
+        loads_count += 1
+        await sleep(0.01)
+        return loads_count
+
+    cache = _create_cache(_load)
+    assert await gather(*[cache.get() for _ in range(10)]) == [1] * 10
+    assert loads_count == 1
+
+#####################################################################################################
+
+async def test_stale_value_is_returned_while_refreshing() -> None:
+    release_load = Event()
+    loaded_values = iter([1, 2])
+
+    async def _load() -> int:
+        loaded_value = next(loaded_values)
+        if loaded_value > 1:
+            await release_load.wait()
+        return loaded_value
+
+    cache = _create_cache(_load)
+    assert await cache.get() == 1
+    cache.invalidate()
+    # expired: the old value comes back at once, the refresh waits in the background
+    assert await cache.get() == 1
+    release_load.set()
+    await sleep(0)
+    await sleep(0)
+    assert await cache.get() == 2
+
+#####################################################################################################
+
+async def test_failed_refresh_keeps_previous_value() -> None:
+    should_fail = False
+
+    async def _load() -> int:
+        if should_fail:
+            raise RuntimeError('upstream is down')
+        return 1
+
+    cache = _create_cache(_load)
+    assert await cache.get() == 1
+    should_fail = True
+    cache.invalidate()
+    assert await cache.get() == 1
+    await sleep(0)
+    assert await cache.get() == 1
+
+#####################################################################################################
+
+async def test_failed_first_load_returns_default() -> None:
+    async def _load() -> int:
+        raise RuntimeError('upstream is down')
+
+    assert await _create_cache(_load).get() == -1
+
+#####################################################################################################
@@ -0,0 +1,79 @@
+#####################################################################################################
+
+from collections.abc import AsyncIterator, Sequence
+from hashlib import sha256
+from pathlib import Path
+
+import pytest
+
+from l7x.utils.upload_utils import ResumableUploadStore, UploadException
+
+#####################################################################################################
+
+def _create_store(tmp_path: Path, *, max_pending_count: int = 0, max_pending_size_in_byte: int = 0) -> ResumableUploadStore:
+    return ResumableUploadStore(
+        upload_dir=tmp_path / 'uploads',
+        max_size_in_byte=1024,
+        expire_sec=60,
+        spool_dir=tmp_path / 'spool',
+        max_pending_count=max_pending_count,
+        max_pending_size_in_byte=max_pending_size_in_byte,
+    )
+
+#####################################################################################################
+
+async def _iterate_chunks(chunks: Sequence[bytes]) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+
+#####################################################################################################
+
+async def test_upload_is_appended_by_offset(tmp_path: Path) -> None:
+    store = _create_store(tmp_path)
+    upload_info = store.create(length=8, file_name='audio.wav', mime_type='audio/wav')
+
+    upload_info = await store.append(upload_info.upload_id, offset=0, chunks=_iterate_chunks([b'ab', b'cd']), checksum=None)
+    assert upload_info.offset == 4
+    with pytest.raises(UploadException) as err_info:
+        await store.append(upload_info.upload_id, offset=0, chunks=_iterate_chunks([b'ef']), checksum=None)
+    assert err_info.value.status_code == 409
+    with pytest.raises(UploadException):
+        await store.take_completed(upload_info.upload_id)
+
+    await store.append(upload_info.upload_id, offset=4, chunks=_iterate_chunks([b'efgh']), checksum=sha256(b'efgh').digest())
+    completed_upload = await store.take_completed(upload_info.upload_id)
+    assert completed_upload.spooled_file.path.read_bytes() == b'abcdefgh'
+    assert completed_upload.spooled_file.content_hash == sha256(b'abcdefgh').hexdigest()
+    assert completed_upload.spooled_file.path.parent == tmp_path / 'spool'
+
+#####################################################################################################
+
+async def test_failed_chunk_is_truncated(tmp_path: Path) -> None:
+    store = _create_store(tmp_path)
+    upload_id = store.create(length=8, file_name='audio.wav', mime_type='audio/wav').upload_id
+    await store.append(upload_id, offset=0, chunks=_iterate_chunks([b'ab']), checksum=None)
+
+    with pytest.raises(UploadException) as err_info:
+        await store.append(upload_id, offset=2, chunks=_iterate_chunks([b'cd']), checksum=sha256(b'xx').digest())
+    assert err_info.value.err_code == 'CHECKSUM_MISMATCH'
+    assert store.get_info(upload_id).offset == 2
+
+    with pytest.raises(UploadException) as err_info:
+        await store.append(upload_id, offset=2, chunks=_iterate_chunks([b'cdefghij']), checksum=None)
+    assert err_info.value.status_code == 413
+    assert store.get_info(upload_id).offset == 2
+
+#####################################################################################################
+
+def test_pending_uploads_are_capped(tmp_path: Path) -> None:
+    store = _create_store(tmp_path, max_pending_count=2, max_pending_size_in_byte=1000)
+    store.create(length=600, file_name='first.wav', mime_type='audio/wav')
+    with pytest.raises(UploadException) as err_info:
+        store.create(length=600, file_name='second.wav', mime_type='audio/wav')
+    assert err_info.value.status_code == 507
+
+    store.create(length=100, file_name='second.wav', mime_type='audio/wav')
+    with pytest.raises(UploadException):
+        store.create(length=1, file_name='third.wav', mime_type='audio/wav')
+
+#####################################################################################################
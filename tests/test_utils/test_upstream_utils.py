@@ -0,0 +1,242 @@
+#####################################################################################################
+
+from asyncio import Event, sleep
+from dataclasses import replace
+from logging import getLogger
+from typing import Final
+
+import pytest
+
+from l7x.utils import upstream_utils
+from l7x.utils.upstream_utils import (
+    AimdConcurrencyLimiter,
+    CircuitBreaker,
+    CircuitState,
+    RetryableStatusError,
+    UpstreamClient,
+    UpstreamError,
+    UpstreamHost,
+    UpstreamPolicy,
+    UpstreamUnavailableError,
+)
+
+#####################################################################################################
+
+_POLICY: Final = UpstreamPolicy(
+    max_attempts=3,
+    backoff_base_sec=0.0,
+    backoff_max_sec=0.0,
+    hedge_percentile=50.0,
+    breaker_failures_threshold=2,
+    breaker_reset_sec=10.0,
+    concurrency_initial=8,
+    concurrency_min=1,
+    concurrency_max=16,
+    concurrency_latency_tolerance=2.0,
+)
+
+#####################################################################################################
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now_ts = 100.0
+
+    def __call__(self) -> float:
+        return self.now_ts
+
+#####################################################################################################
+
+def _create_limiter(initial_limit: int) -> AimdConcurrencyLimiter:
+    return AimdConcurrencyLimiter(initial_limit=initial_limit, min_limit=1, max_limit=16, latency_tolerance=2.0)
+
+#####################################################################################################
+
+def _create_client(policy: UpstreamPolicy = _POLICY) -> UpstreamClient:
+    return UpstreamClient('test', policy, getLogger(__name__), host=UpstreamHost.from_policy(policy))
+
+#####################################################################################################
+
+def test_open_breaker_lets_one_probe_through_after_cool_down(monkeypatch: pytest.MonkeyPatch) -> None:
+    clock = _Clock()
+    monkeypatch.setattr(upstream_utils, 'monotonic', clock)
+    breaker = CircuitBreaker(failures_threshold=2, reset_sec=10.0)
+
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow_request()
+
+    clock.now_ts += 10.0
+    assert breaker.allow_request()
+    assert breaker.state == CircuitState.HALF_OPEN
+    # the probe is still in flight: nobody else passes
+    assert not breaker.allow_request()
+
+    # a failed probe opens the circuit again for the whole cool-down
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow_request()
+
+    clock.now_ts += 10.0
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.allow_request()
+    assert breaker.allow_request()
+
+#####################################################################################################
+
+async def test_open_breaker_rejects_calls() -> None:
+    client = _create_client()
+    calls_count = 0
+
+    async def _send() -> str:
+        nonlocal calls_count
+        calls_count += 1
+        raise RetryableStatusError(503)
+
+    with pytest.raises(UpstreamError):
+        await client.call(_send)
+    # the second failure opened the circuit, the third attempt is not sent
+    assert calls_count == 2
+    assert client.breaker.state == CircuitState.OPEN
+    with pytest.raises(UpstreamUnavailableError):
+        await client.call(_send)
+    assert calls_count == 2
+
+#####################################################################################################
+
+async def test_retries_stop_on_non_retryable_errors() -> None:
+    client = _create_client()
+    calls_count = 0
+
+    async def _send() -> str:
+        nonlocal calls_count
+        calls_count += 1
+        raise ValueError('bad request')
+
+    with pytest.raises(ValueError, match='bad request'):
+        await client.call(_send)
+    assert calls_count == 1
+    assert client.breaker.state == CircuitState.CLOSED
+
+#####################################################################################################
+
+async def test_retryable_status_is_retried() -> None:
+    client = _create_client(replace(_POLICY, breaker_failures_threshold=5))
+    answers = iter([RetryableStatusError(429), RetryableStatusError(502), None])
+
+    async def _send() -> str:
+        answer = next(answers)
+        if answer is not None:
+            raise answer
+        return 'ok'
+
+    assert await client.call(_send) == 'ok'
+    assert client.breaker.state == CircuitState.CLOSED
+
+    async def _send_once() -> str:
+        raise RetryableStatusError(503)
+
+    # not idempotent: a single attempt
+    client = _create_client()
+    with pytest.raises(UpstreamError):
+        await client.call(_send_once, idempotent=False)
+    assert client.breaker.state == CircuitState.CLOSED
+
+#####################################################################################################
+
+async def test_slow_call_is_hedged() -> None:
+    client = _create_client()
+
+    async def _send_fast() -> str:
+        return 'fast'
+
+    # the usual latency is close to zero, so the hedge delay is tiny
+    for _ in range(upstream_utils._HEDGE_MIN_SAMPLES):  # noqa: WPS437
+        await client.call(_send_fast)
+
+    slow_cancelled = Event()
+    calls_count = 0
+
+    async def _send() -> str:
+        nonlocal calls_count
+        calls_count += 1
+        if calls_count > 1:
+            return 'hedged'
+        try:
+            await sleep(10)
+        finally:
+            slow_cancelled.set()
+        return 'slow'
+
+    assert await client.call(_send, hedge=True) == 'hedged'
+    assert calls_count == 2
+    # the lost copy does not keep running
+    assert slow_cancelled.is_set()
+    assert client.limiter.in_flight_count == 0
+
+#####################################################################################################
+
+async def test_limiter_shrinks_once_per_window(monkeypatch: pytest.MonkeyPatch) -> None:
+    clock = _Clock()
+    monkeypatch.setattr(upstream_utils, 'monotonic', clock)
+    limiter = _create_limiter(8)
+
+    started_ts = clock.now_ts
+    for _ in range(4):
+        await limiter.acquire()
+    clock.now_ts += 1.0
+    # the whole window failed together: one multiplicative decrease, not four
+    for _ in range(4):
+        limiter.release(started_ts, None, dropped=True)
+    assert limiter.limit == 7
+    assert limiter.in_flight_count == 0
+
+    # a call sent after the decrease reports the new limit
+    started_ts = clock.now_ts
+    await limiter.acquire()
+    clock.now_ts += 1.0
+    limiter.release(started_ts, None, dropped=True)
+    assert limiter.limit == 6
+
+#####################################################################################################
+
+async def test_limiter_shrinks_on_slow_calls(monkeypatch: pytest.MonkeyPatch) -> None:
+    clock = _Clock()
+    monkeypatch.setattr(upstream_utils, 'monotonic', clock)
+    limiter = _create_limiter(8)
+
+    await limiter.acquire()
+    limiter.release(clock.now_ts, 0.1, dropped=False)
+    assert limiter.limit == 8
+
+    started_ts = clock.now_ts
+    await limiter.acquire()
+    await limiter.acquire()
+    clock.now_ts += 1.0
+    # far above the baseline times the tolerance, twice in the same window
+    limiter.release(started_ts, 1.0, dropped=False)
+    limiter.release(started_ts, 1.0, dropped=False)
+    assert limiter.limit == 7
+
+#####################################################################################################
+
+async def test_limiter_grows_when_saturated() -> None:
+    limiter = _create_limiter(2)
+
+    await limiter.acquire()
+    # not saturated: the limit is not the bottleneck, so it does not grow
+    limiter.release(0.0, 0.1, dropped=False)
+    assert limiter.limit == 2
+
+    for _ in range(4):
+        await limiter.acquire()
+        await limiter.acquire()
+        assert limiter.in_flight_count == 2
+        limiter.release(0.0, 0.1, dropped=False)
+        limiter.release(0.0, 0.1, dropped=False)
+    assert limiter.limit == 3
+
+#####################################################################################################